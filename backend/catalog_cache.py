@@ -0,0 +1,139 @@
+"""Pre-serialized response cache for the static catalog endpoints.
+
+Catalog payloads (visa types, resources, job platforms, logistics providers...)
+never change while the process is running, so they are built and encoded to
+JSON bytes once, together with a strong ETag, and served as-is afterwards.
+
+Clients that send `Accept: application/x-ndjson` (or `?format=ndjson`) get the
+same catalog as newline-delimited JSON instead, streamed in chunks of at most
+NDJSON_CHUNK_SIZE bytes. Each element of a top-level list becomes one line,
+`{"section": "housing", "item": {...}}`, and every other top-level value is one
+`{"section": ..., "value": ...}` line. Clients can render sections as they arrive.
+The lines are encoded once, on first use, and shared by every request.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+CACHE_CONTROL = "public, no-cache"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 16 * 1024
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode exactly like FastAPI's default JSONResponse."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def ndjson_lines(data: Dict[str, Any]) -> List[bytes]:
+    lines = []
+    for section, value in data.items():
+        if isinstance(value, list) and value:
+            lines.extend(encode_json({"section": section, "item": item}) + b"\n" for item in value)
+        else:
+            lines.append(encode_json({"section": section, "value": value}) + b"\n")
+    return lines
+
+
+def chunk_lines(lines: List[bytes], chunk_size: int = NDJSON_CHUNK_SIZE) -> List[bytes]:
+    """Join lines into chunks of at most chunk_size bytes (a longer line is a chunk of its own)."""
+    chunks, pending, size = [], [], 0
+    for line in lines:
+        if pending and size + len(line) > chunk_size:
+            chunks.append(b"".join(pending))
+            pending, size = [], 0
+        pending.append(line)
+        size += len(line)
+    if pending:
+        chunks.append(b"".join(pending))
+    return chunks
+
+
+def wants_ndjson(request: Request) -> bool:
+    return (request.query_params.get("format") == "ndjson"
+            or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""))
+
+
+class CachedPayload:
+    __slots__ = ("name", "data", "body", "content_hash", "etag", "_ndjson_chunks")
+
+    def __init__(self, name: str, data: Any):
+        self.name = name
+        self.data = data
+        self.body = encode_json(data)
+        self.content_hash = hashlib.sha256(self.body).hexdigest()
+        self.etag = f'"{self.content_hash[:32]}"'
+        self._ndjson_chunks: Optional[List[bytes]] = None
+
+    @property
+    def ndjson_etag(self) -> str:
+        return f'"{self.content_hash[:32]}-ndjson"'
+
+    @property
+    def ndjson_chunks(self) -> List[bytes]:
+        if self._ndjson_chunks is None:
+            self._ndjson_chunks = chunk_lines(ndjson_lines(self.data))
+        return self._ndjson_chunks
+
+    def matches(self, if_none_match: Optional[str], etag: Optional[str] = None) -> bool:
+        """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+        etag = etag or self.etag
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*":
+                return True
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == etag:
+                return True
+        return False
+
+
+class CatalogCache:
+    def __init__(self):
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._payloads: Dict[str, CachedPayload] = {}
+
+    def register(self, name: str, builder: Callable[[], Any]) -> Callable[[], Any]:
+        """Register a builder and build its payload immediately."""
+        self._builders[name] = builder
+        self._payloads[name] = CachedPayload(name, builder())
+        return builder
+
+    def get(self, name: str) -> CachedPayload:
+        payload = self._payloads.get(name)
+        if payload is None:
+            payload = CachedPayload(name, self._builders[name]())
+            self._payloads[name] = payload
+        return payload
+
+    def warm(self):
+        """Rebuild every registered payload."""
+        for name, builder in self._builders.items():
+            self._payloads[name] = CachedPayload(name, builder())
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._payloads for name in self._builders)
+
+    def respond(self, name: str, request: Request) -> Response:
+        payload = self.get(name)
+        stream = wants_ndjson(request)
+        etag = payload.ndjson_etag if stream else payload.etag
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"}
+        if payload.matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if stream:
+            return StreamingResponse(iter(payload.ndjson_chunks), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+        return Response(content=payload.body, media_type="application/json", headers=headers)
@@ -0,0 +1,250 @@
+"""Materialized per-user progress snapshot behind the dashboard endpoints.
+
+The dashboard, analytics, budget and timeline endpoints all report the same
+figures:
+
+- completed steps and completion percentage
+- completed/total counts per category
+- outstanding urgent steps and the current phase
+- the next steps to take
+- estimated spend
+
+The snapshot holds these figures. It is stored on the user document
+(`users.dashboard`) together with the `completed_mask` words it was computed
+from, and loaded with the principal that get_current_user caches. A dashboard
+poll therefore reads one cached document and does no counting.
+
+Progress writes call `advance()` with the mask they produced. The stored
+counts are adjusted for the steps that flipped, and phase and next steps come
+from the user's keyed ProgressState in the timeline engine, which is itself
+diffed. The new snapshot is written back only if the user's mask still equals
+the one it was computed from, so a slow writer cannot overwrite a newer
+snapshot.
+
+A snapshot whose mask does not match the user's (a write still in flight, or
+a user stored before snapshots existed) is never served. `for_user()`
+rebuilds it in memory instead. `check_snapshots()` compares every stored
+snapshot with a fresh build and can rewrite the ones that differ:
+
+    python dashboard_snapshot.py [--rebuild]
+"""
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional
+
+from pymongo import UpdateOne
+
+from progress_mask import has_step, mask_to_steps, mask_to_words, popcount, steps_to_mask, words_to_mask
+
+SNAPSHOT_VERSION = 1
+# Fields that describe the snapshot itself rather than the user's progress
+META_FIELDS = ("version", "mask", "updated_at")
+
+
+def percentage(part: int, whole: int) -> float:
+    return (part / whole) * 100 if whole else 0
+
+
+def stored_mask(user: Dict[str, Any]) -> int:
+    """A user document's completed steps as a mask (falls back to the list for unmigrated users)."""
+    if user.get("completed_mask") or not user.get("completed_steps"):
+        return words_to_mask(user.get("completed_mask") or [])
+    return steps_to_mask(user["completed_steps"])
+
+
+class DashboardSnapshots:
+    def __init__(self, engine, category_masks: Dict[str, int], urgent_mask: int, mask_words: int,
+                 total_budget: float, spend_ratio: float = 0.6, in_progress_limit: int = 3, next_steps: int = 5):
+        self.engine = engine
+        self.category_masks = category_masks
+        self.urgent_mask = urgent_mask
+        self.mask_words = mask_words
+        self.total_budget = total_budget
+        self.spend_ratio = spend_ratio
+        self.in_progress_limit = in_progress_limit
+        self.next_steps = next_steps
+        self.total_steps = len(engine.steps)
+        self.all_steps_mask = steps_to_mask(engine.steps)
+
+    def build(self, mask: int, key: Optional[Hashable] = None) -> Dict[str, Any]:
+        """Snapshot for a completed mask, computed from scratch."""
+        categories = {
+            category: {"total": popcount(category_mask), "completed": popcount(category_mask & mask)}
+            for category, category_mask in self.category_masks.items()
+        }
+        remaining_urgent = popcount(self.urgent_mask & self.all_steps_mask & ~mask)
+        return self._finish(mask, popcount(mask), categories, remaining_urgent, key)
+
+    def advance(self, snapshot: Optional[Dict[str, Any]], mask: int, key: Optional[Hashable] = None) -> Dict[str, Any]:
+        """Snapshot for `mask`, adjusted from an earlier snapshot by the steps that changed."""
+        if not snapshot or snapshot.get("version") != SNAPSHOT_VERSION:
+            return self.build(mask, key)
+        completed = snapshot["completed_steps"]
+        categories = {category: dict(counts) for category, counts in snapshot["categories"].items()}
+        remaining_urgent = snapshot["remaining_urgent"]
+        for step_id in mask_to_steps(words_to_mask(snapshot["mask"]) ^ mask):
+            delta = 1 if has_step(mask, step_id) else -1
+            completed += delta
+            step = self.engine.steps.get(step_id)
+            if step is not None:
+                categories[step["category"]]["completed"] += delta
+            if has_step(self.urgent_mask, step_id):
+                remaining_urgent -= delta
+        return self._finish(mask, completed, categories, remaining_urgent, key)
+
+    def _finish(self, mask: int, completed: int, categories: Dict[str, Dict[str, Any]], remaining_urgent: int,
+                key: Optional[Hashable]) -> Dict[str, Any]:
+        for counts in categories.values():
+            counts["percentage"] = percentage(counts["completed"], counts["total"])
+        state = self.engine.state_for_mask(mask, key=key)
+        estimated_spent = self.total_budget * (completed / self.total_steps) * self.spend_ratio
+        return {
+            "version": SNAPSHOT_VERSION,
+            "mask": mask_to_words(mask, self.mask_words),
+            "completed_steps": completed,
+            "total_steps": self.total_steps,
+            "completion_percentage": percentage(completed, self.total_steps),
+            "categories": categories,
+            "in_progress": min(self.in_progress_limit, popcount(self.all_steps_mask & ~mask)),
+            "remaining_urgent": remaining_urgent,
+            "current_phase": state.current_phase,
+            "next_steps": state.next_actions()[:self.next_steps],
+            "estimated_spent": estimated_spent,
+            "remaining_budget": self.total_budget - estimated_spent,
+            "updated_at": datetime.utcnow(),
+        }
+
+    def is_current(self, snapshot: Optional[Dict[str, Any]], mask: int) -> bool:
+        return (bool(snapshot) and snapshot.get("version") == SNAPSHOT_VERSION
+                and words_to_mask(snapshot["mask"]) == mask)
+
+    def for_user(self, user) -> Dict[str, Any]:
+        """The user's snapshot, rebuilt in memory (and kept on the principal) if the stored one is stale."""
+        mask = user.progress_mask()
+        if not self.is_current(user.dashboard, mask):
+            user.dashboard = self.advance(user.dashboard, mask, key=user.id)
+        return user.dashboard
+
+    def for_document(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """The snapshot of a user document read straight from the database, rebuilt if stale.
+
+        `user` needs the same fields as for `store()`.
+        """
+        mask = stored_mask(user)
+        snapshot = user.get("dashboard")
+        return snapshot if self.is_current(snapshot, mask) else self.advance(snapshot, mask, key=user.get("id"))
+
+    async def store(self, collection, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Advance a freshly written user document's snapshot and save it unless the mask has moved on.
+
+        `user` needs `_id`, `id`, `completed_mask` and `dashboard`, as returned by the progress write.
+        """
+        snapshot = self.advance(user.get("dashboard"), stored_mask(user), key=user.get("id"))
+        await collection.update_one(
+            {"_id": user["_id"], "completed_mask": user.get("completed_mask")},
+            {"$set": {"dashboard": snapshot}},
+        )
+        return snapshot
+
+
+def progress_fields(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in snapshot.items() if name not in META_FIELDS}
+
+
+def snapshot_delta(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress event for the change from `previous` to `current` (see progress_events.py).
+
+    Counts are absolute, so applying an event never depends on having seen the one before it.
+    `at` orders events from concurrent writers. Without a usable previous snapshot the event is a
+    full "snapshot" instead of a "progress" delta.
+    """
+    if not previous or previous.get("version") != SNAPSHOT_VERSION:
+        return {"type": "snapshot", **progress_fields(current), "at": current["updated_at"]}
+    mask = words_to_mask(current["mask"])
+    changed = words_to_mask(previous["mask"]) ^ mask
+    return {
+        "type": "progress",
+        "steps": {str(step_id): has_step(mask, step_id) for step_id in mask_to_steps(changed)},
+        "completed_steps": current["completed_steps"],
+        "total_steps": current["total_steps"],
+        "completion_percentage": current["completion_percentage"],
+        "categories": {
+            category: counts for category, counts in current["categories"].items()
+            if counts != previous["categories"].get(category)
+        },
+        "in_progress": current["in_progress"],
+        "remaining_urgent": current["remaining_urgent"],
+        "current_phase": current["current_phase"],
+        "phase_changed": previous["current_phase"] != current["current_phase"],
+        "next_steps": current["next_steps"],
+        "estimated_spent": current["estimated_spent"],
+        "remaining_budget": current["remaining_budget"],
+        "at": current["updated_at"],
+    }
+
+
+async def check_snapshots(collection, snapshots: DashboardSnapshots, rebuild: bool = False,
+                          query: Optional[Dict[str, Any]] = None, batch_size: int = 500) -> Dict[str, int]:
+    """Compare stored snapshots with fresh builds; with `rebuild`, rewrite the ones that differ.
+
+    missing: no snapshot (or an older version); stale: built from another mask;
+    drifted: built from the right mask but with different figures.
+    """
+    report = {"checked": 0, "consistent": 0, "missing": 0, "stale": 0, "drifted": 0, "rebuilt": 0}
+    projection = {"_id": 1, "id": 1, "completed_mask": 1, "completed_steps": 1, "dashboard": 1}
+    pending: List[UpdateOne] = []
+    async for user in collection.find(query or {}, projection):
+        report["checked"] += 1
+        mask = stored_mask(user)
+        stored = user.get("dashboard")
+        expected = snapshots.build(mask)
+        if not stored or stored.get("version") != SNAPSHOT_VERSION:
+            problem = "missing"
+        elif words_to_mask(stored["mask"]) != mask:
+            problem = "stale"
+        elif progress_fields(stored) != progress_fields(expected):
+            problem = "drifted"
+        else:
+            report["consistent"] += 1
+            continue
+        report[problem] += 1
+        if rebuild:
+            pending.append(UpdateOne(
+                {"_id": user["_id"], "completed_mask": user.get("completed_mask")},
+                {"$set": {"dashboard": expected}},
+            ))
+            if len(pending) >= batch_size:
+                report["rebuilt"] += (await collection.bulk_write(pending, ordered=False)).modified_count
+                pending = []
+    if pending:
+        report["rebuilt"] += (await collection.bulk_write(pending, ordered=False)).modified_count
+    return report
+
+
+def outdated_query() -> Dict[str, Any]:
+    """Users whose snapshot is missing or from an older SNAPSHOT_VERSION."""
+    return {"dashboard.version": {"$ne": SNAPSHOT_VERSION}}
+
+
+async def check_all(rebuild: bool) -> Dict[str, int]:
+    import server
+
+    server.connect_to_mongo()
+    try:
+        return await check_snapshots(server.db.users, server.dashboard_snapshots, rebuild=rebuild)
+    finally:
+        server.close_mongo_connection()
+
+
+def main():
+    import argparse
+    import asyncio
+    import json
+
+    parser = argparse.ArgumentParser(description="Check the stored dashboard snapshots against fresh builds")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite missing, stale and drifted snapshots")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(check_all(args.rebuild)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
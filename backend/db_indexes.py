@@ -0,0 +1,94 @@
+"""Mongo index bootstrap and query-plan checks.
+
+`ensure_indexes` creates every index the API relies on. It is idempotent and
+runs at startup; `create_indexes` is a no-op for indexes that already exist
+with the same options. `find_collection_scans` explains the hot queries and
+reports any whose winning plan still contains a COLLSCAN stage.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "progress_logs": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)], name="user_id_timestamp"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Every search sorts by (posted_date, id) and seeks past the cursor
+        IndexModel([("posted_date", DESCENDING), ("id", DESCENDING)], name="posted_date_id"),
+        IndexModel([("category", ASCENDING), ("posted_date", DESCENDING), ("id", DESCENDING)], name="category_posted_date_id"),
+        IndexModel([("job_type", ASCENDING), ("posted_date", DESCENDING), ("id", DESCENDING)], name="job_type_posted_date_id"),
+        IndexModel([("location_keys", ASCENDING), ("posted_date", DESCENDING), ("id", DESCENDING)], name="location_keys_posted_date_id"),
+        IndexModel([("visa_support", ASCENDING), ("posted_date", DESCENDING), ("id", DESCENDING)], name="visa_support_posted_date_id"),
+        IndexModel([("salary_max", ASCENDING), ("salary_min", ASCENDING)], name="salary_max_salary_min"),
+        IndexModel([("is_hospitality", DESCENDING), ("posted_date", DESCENDING)], name="is_hospitality_posted_date"),
+        IndexModel([("content_hash", ASCENDING)], name="content_hash"),
+    ],
+    "job_imports": [
+        IndexModel([("import_id", ASCENDING)], name="import_id_unique", unique=True),
+    ],
+    "password_resets": [
+        IndexModel(
+            [("username", ASCENDING), ("reset_code", ASCENDING), ("expires_at", DESCENDING)],
+            name="username_reset_code_expires_at",
+        ),
+        # Expired reset codes are removed by Mongo's TTL monitor (it runs about once a minute)
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# (collection, filter, sort) taken from the request paths
+HOT_QUERIES: List[Tuple[str, Dict[str, Any], Optional[Dict[str, int]]]] = [
+    ("users", {"username": "relocate_user"}, None),
+    ("progress_logs", {"user_id": "00000000-0000-0000-0000-000000000000"}, None),
+    ("password_resets", {"username": "relocate_user", "reset_code": "RESET2025"}, {"expires_at": -1}),
+    ("jobs", {}, {"posted_date": -1, "id": -1}),
+    ("jobs", {"category": "Hospitality Management"}, {"posted_date": -1, "id": -1}),
+    ("jobs", {"location_keys": "peak district"}, {"posted_date": -1, "id": -1}),
+    ("jobs", {"salary_max": {"$gte": 25000}}, None),
+    ("jobs", {"is_hospitality": True}, {"is_hospitality": -1, "posted_date": -1}),
+]
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        try:
+            created[collection_name] = await db[collection_name].create_indexes(indexes)
+        except OperationFailure as exc:
+            # e.g. duplicate usernames blocking the unique index - keep serving, but say so
+            print(f"Could not create indexes on {collection_name}: {exc}")
+            created[collection_name] = []
+    return created
+
+
+def _plan_stages(plan: Dict[str, Any]):
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def explain_find(db, collection_name: str, query: Dict[str, Any], sort: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    find = {"find": collection_name, "filter": query}
+    if sort:
+        find["sort"] = sort
+    return await db.command({"explain": find, "verbosity": "queryPlanner"})
+
+
+async def find_collection_scans(db, queries=HOT_QUERIES) -> List[Tuple[str, Dict[str, Any]]]:
+    """Hot queries whose winning plan scans the whole collection."""
+    scans = []
+    for collection_name, query, sort in queries:
+        explanation = await explain_find(db, collection_name, query, sort)
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            scans.append((collection_name, query))
+    return scans
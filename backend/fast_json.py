@@ -0,0 +1,88 @@
+"""orjson-based JSON responses, bypassing jsonable_encoder.
+
+FastAPI serializes a handler's return value in two passes: `jsonable_encoder`
+copies it into plain JSON types, and the response class then runs stdlib
+`json.dumps` over the copy. For the dashboard and listing payloads the first
+pass costs as much as the second. Here both passes are replaced by a single
+orjson call:
+
+- `FastJSONResponse` renders with orjson. It is the app's default response
+  class.
+- `FastJSONRoute` is the router's route class. Handlers without a
+  `response_model` have their return value wrapped in a FastJSONResponse
+  directly, so FastAPI never runs jsonable_encoder over it. Routes with a
+  response_model still validate through it as before.
+
+Output matches the stdlib path. Naive datetimes (User.created_at,
+ProgressItem.created_at/due_date) are ISO 8601 without an offset, exactly as
+`datetime.isoformat()` writes them. Pydantic models are dumped by
+`default()`, or in one step by pydantic's serializer when returned as the
+whole response. Non-string dict keys become strings, and numpy scalars and
+arrays are encoded natively.
+
+Handlers that need to set headers or cookies should return a Response,
+because values set on an injected `Response` parameter are not merged into
+a response the handler returned itself.
+"""
+import functools
+import inspect
+from typing import Any, Callable
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    # Anything else orjson does not know (Decimal, ObjectId, ...): defer to FastAPI's rules
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, default=default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        if self.response_field is None and issubclass(response_class, FastJSONResponse):
+            self.dependant.call = self._encode_directly(self.dependant.call, response_class)
+        return super().get_route_handler()
+
+    def _encode_directly(self, call: Callable, response_class) -> Callable:
+        status_code = self.status_code
+
+        def respond(content: Any) -> Any:
+            if isinstance(content, Response):
+                return content
+            if status_code is None:
+                return response_class(content)
+            return response_class(content, status_code=status_code)
+
+        if inspect.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(*args, **kwargs):
+                return respond(await call(*args, **kwargs))
+        else:
+            @functools.wraps(call)
+            def endpoint(*args, **kwargs):
+                return respond(call(*args, **kwargs))
+        return endpoint
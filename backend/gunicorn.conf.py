@@ -0,0 +1,84 @@
+"""Gunicorn settings for the multi-worker deployment (used by entrypoint.sh).
+
+    gunicorn -c gunicorn.conf.py server:app
+
+The app module is imported once in the master (`preload_app`), so the static
+catalogs, their pre-serialized bodies, the search index and the timeline
+engine are built before forking and shared copy-on-write by every worker.
+`gc.freeze()` moves them out of the collector's reach so garbage collections
+in the workers don't touch (and copy) those pages.
+
+Each worker keeps its own metrics; with more than one worker they are summed
+through METRICS_MULTIPROC_DIR (a fresh temporary directory unless set), so
+any worker can answer a /metrics scrape for all of them.
+
+One-time database setup (indexes, default user, mask migration) runs in the
+master before the workers start; workers only open their own Mongo client.
+
+Worker count is WEB_CONCURRENCY, or one worker per available CPU (cgroup quota
+and CPU affinity respected). `kill -HUP <master pid>` replaces the workers
+gracefully. The master keeps the code it preloaded, so deploying new code
+needs a restart (or USR2 followed by QUIT to the old master).
+"""
+import asyncio
+import gc
+import glob
+import math
+import os
+import tempfile
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+bind = os.environ.get("BACKEND_BIND", "0.0.0.0:8001")
+# Async workers: one event loop per core is enough, unlike the 2n+1 rule for sync workers
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cpus())
+# Progress events published in one worker must reach streams held open by the others (see progress_events.py)
+if workers > 1:
+    os.environ.setdefault("PROGRESS_EVENTS_BACKEND", "mongo")
+    # Read by server.py at import, which preload_app does after this file is loaded
+    os.environ.setdefault("METRICS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="relocateme-metrics-"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT_SECONDS", "60"))
+keepalive = 5
+
+
+def on_starting(arbiter):
+    import server
+
+    metrics_dir = os.environ.get("METRICS_MULTIPROC_DIR")
+    if metrics_dir:
+        # Snapshots left by the workers of an earlier master would be added to this one's totals
+        for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+            os.remove(path)
+
+    if os.environ.get(server.DB_BOOTSTRAPPED_ENV) != "1":
+        asyncio.run(server.bootstrap_before_fork())
+        server.export_bootstrap_result()
+    # Imported lazily by server.py; load them here so the workers share them too
+    server.load_auth_libraries()
+    gc.collect()
+    gc.freeze()
+
+
+def child_exit(arbiter, worker):
+    metrics_dir = os.environ.get("METRICS_MULTIPROC_DIR")
+    if metrics_dir:
+        from metrics import SharedMetrics
+
+        SharedMetrics.mark_process_dead(metrics_dir, worker.pid)
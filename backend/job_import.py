@@ -0,0 +1,333 @@
+"""Streaming bulk import of job listings from NDJSON or CSV feeds.
+
+The input is consumed as a stream of byte chunks: the request body for
+POST /api/jobs/import, or a file for the CLI below. It is split into lines
+and rows, and handled `batch_size` rows at a time:
+
+1. each row is validated against JobListing; invalid rows are counted, and a
+   capped number of error samples are kept
+2. duplicates are dropped: within the batch by id and content hash, and
+   across the collection by content hash (one indexed `$in` query per batch)
+3. the rest are upserted by id with one unordered `bulk_write`
+
+Only the current batch is held in memory, so memory use does not grow with the
+feed. Lines are capped at MAX_LINE_CHARS, and CSV records spanning several
+lines at MAX_RECORD_LINES lines and MAX_RECORD_CHARS characters. A body
+without newlines or with an unbalanced quote fails the import with
+ImportFormatError instead of being buffered whole. Progress counters are reported after every batch. Rows without an id
+get one derived from their content hash, so re-importing the same feed is
+idempotent.
+
+CSV feeds need a header row naming JobListing fields. List fields
+(requirements, benefits) are either a JSON array or "|"-separated values.
+
+CLI:
+
+    python job_import.py feed.ndjson [--format csv] [--batch-size 1000] [--dry-run]
+"""
+import asyncio
+import codecs
+import csv
+import json
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from job_search import job_document, write_job_documents
+
+FORMATS = ("ndjson", "csv")
+LIST_FIELDS = ("requirements", "benefits")
+BOOLEAN_FIELDS = ("visa_support",)
+TRUE_VALUES = {"1", "true", "yes", "y"}
+MAX_LINE_CHARS = 1 << 20
+MAX_RECORD_LINES = 1000
+MAX_RECORD_CHARS = 1 << 20
+
+Record = Tuple[int, Any]  # (line number, row dict or the error that made it unreadable)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes], max_line_chars: int = MAX_LINE_CHARS) -> AsyncIterator[str]:
+    """UTF-8 lines from a stream of byte chunks, without line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if len(line) > max_line_chars:
+                raise ImportFormatError(f"line longer than {max_line_chars} characters")
+            yield line.rstrip("\r")
+        if len(pending) > max_line_chars:
+            raise ImportFormatError(f"line longer than {max_line_chars} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def aiter_file(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            chunk = await asyncio.to_thread(handle.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def ndjson_records(lines: AsyncIterable[str]) -> AsyncIterator[Record]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, row if isinstance(row, dict) else ImportFormatError("row is not a JSON object")
+
+
+def _csv_value(field: str, value: str) -> Any:
+    if field in LIST_FIELDS:
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split("|") if item.strip()]
+    if field in BOOLEAN_FIELDS:
+        return value.strip().lower() in TRUE_VALUES
+    return value
+
+
+async def csv_records(lines: AsyncIterable[str], max_record_lines: int = MAX_RECORD_LINES,
+                      max_record_chars: int = MAX_RECORD_CHARS) -> AsyncIterator[Record]:
+    header: Optional[List[str]] = None
+    line_number = 0
+    record_start = 0
+    pending: List[str] = []
+    pending_chars = 0
+    open_quote = False
+    async for line in lines:
+        line_number += 1
+        pending.append(line)
+        pending_chars += len(line)
+        # A quoted field may contain newlines; the record ends once its quotes balance
+        open_quote ^= line.count('"') % 2 == 1
+        if open_quote:
+            if len(pending) >= max_record_lines or pending_chars > max_record_chars:
+                raise ImportFormatError(
+                    f"record starting at line {record_start + 1} is longer than {max_record_lines} lines "
+                    f"or {max_record_chars} characters (unbalanced quote?)"
+                )
+            continue
+        text, pending, pending_chars = "\n".join(pending), [], 0
+        start, record_start = record_start + 1, line_number
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, ImportFormatError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        try:
+            yield start, {
+                field: _csv_value(field, value) for field, value in zip(header, values)
+                if value != "" or field in LIST_FIELDS
+            }
+        except ValueError as exc:
+            yield start, exc
+    if pending:
+        yield record_start + 1, ImportFormatError("unterminated quoted field")
+
+
+def parse_records(chunks: AsyncIterable[bytes], file_format: str) -> AsyncIterator[Record]:
+    if file_format not in FORMATS:
+        raise ImportFormatError(f"unsupported format {file_format!r}")
+    lines = aiter_lines(chunks)
+    return csv_records(lines) if file_format == "csv" else ndjson_records(lines)
+
+
+class ImportProgress:
+    def __init__(self, max_error_samples: int = 50):
+        self.max_error_samples = max_error_samples
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.failure: Optional[str] = None
+
+    def reject(self, line_number: int, error: Exception):
+        self.invalid += 1
+        if len(self.errors) < self.max_error_samples:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+            ) if isinstance(error, ValidationError) else str(error)
+            self.errors.append({"line": line_number, "error": message})
+
+    def count_writes(self, upserted: int, matched: int, modified: int):
+        self.inserted += upserted
+        self.updated += modified
+        self.unchanged += matched - modified
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "invalid": self.invalid,
+            "duplicates": self.duplicates,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "batches": self.batches,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": self.rows / elapsed if elapsed else 0.0,
+            "errors": list(self.errors),
+            "failure": self.failure,
+        }
+
+
+class JobImporter:
+    def __init__(self, collection, model, batch_size: int = 1000, salary_index=None,
+                 on_progress: Optional[Callable[[ImportProgress], Any]] = None, dry_run: bool = False,
+                 max_error_samples: int = 50):
+        self.collection = collection
+        self.model = model
+        self.batch_size = batch_size
+        self.salary_index = salary_index
+        self.on_progress = on_progress
+        self.dry_run = dry_run
+        self.progress = ImportProgress(max_error_samples)
+
+    async def run(self, records: AsyncIterable[Record]) -> ImportProgress:
+        batch: List[Record] = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self._process(batch)
+                batch = []
+        if batch:
+            await self._process(batch)
+        return self.progress
+
+    def _validate(self, batch: List[Record]) -> List[Dict[str, Any]]:
+        documents: Dict[str, Dict[str, Any]] = {}
+        hashes = set()
+        for line_number, row in batch:
+            if isinstance(row, Exception):
+                self.progress.reject(line_number, row)
+                continue
+            if isinstance(row.get("id"), int):
+                row["id"] = str(row["id"])
+            try:
+                listing = self.model(**{"id": "", **row}).dict()
+            except ValidationError as exc:
+                self.progress.reject(line_number, exc)
+                continue
+            document = job_document(listing)
+            if not document["id"]:
+                document["id"] = f"hash-{document['content_hash'][:24]}"
+            if document["content_hash"] in hashes and document["id"] not in documents:
+                self.progress.duplicates += 1
+                continue
+            if document["id"] in documents:
+                # Same id twice in a batch: the later row wins, as it would across batches
+                self.progress.duplicates += 1
+            hashes.add(document["content_hash"])
+            documents[document["id"]] = document
+        return list(documents.values())
+
+    async def _drop_known_content(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop postings whose content is already stored under a different id."""
+        known = {}
+        cursor = self.collection.find(
+            {"content_hash": {"$in": [document["content_hash"] for document in documents]}},
+            {"_id": 0, "id": 1, "content_hash": 1},
+        )
+        async for existing in cursor:
+            known.setdefault(existing["content_hash"], set()).add(existing["id"])
+        fresh = []
+        for document in documents:
+            owners = known.get(document["content_hash"])
+            if owners and document["id"] not in owners:
+                self.progress.duplicates += 1
+            else:
+                fresh.append(document)
+        return fresh
+
+    async def _process(self, batch: List[Record]):
+        self.progress.rows += len(batch)
+        self.progress.batches += 1
+        documents = self._validate(batch)
+        if documents and not self.dry_run:
+            documents = await self._drop_known_content(documents)
+            try:
+                result = await write_job_documents(self.collection, documents, self.salary_index)
+            except BulkWriteError as exc:
+                # Unordered: the operations that did not fail were still applied
+                details = exc.details
+                self.progress.count_writes(details.get("nUpserted", 0), details.get("nMatched", 0),
+                                           details.get("nModified", 0))
+                write_errors = details.get("writeErrors", [])
+                first = write_errors[0].get("errmsg", "") if write_errors else str(exc)
+                self.progress.failure = f"bulk write failed for {len(write_errors)} documents: {first}"
+                raise
+            if result is not None:
+                self.progress.count_writes(result.upserted_count, result.matched_count, result.modified_count)
+        if self.on_progress is not None:
+            outcome = self.on_progress(self.progress)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+
+
+async def import_file(path: str, file_format: str, batch_size: int = 1000, dry_run: bool = False,
+                      on_progress=None) -> Dict[str, Any]:
+    import server
+
+    server.connect_to_mongo()
+    try:
+        importer = JobImporter(server.db.jobs, server.JobListing, batch_size=batch_size,
+                               on_progress=on_progress, dry_run=dry_run)
+        progress = await importer.run(parse_records(aiter_file(path), file_format))
+        return progress.to_dict()
+    finally:
+        server.close_mongo_connection()
+
+
+def main():
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="Import job listings from an NDJSON or CSV feed")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="validate and dedupe without writing")
+    args = parser.parse_args()
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    def report(progress: ImportProgress):
+        stats = progress.to_dict()
+        print(f"{stats['rows']} rows  {stats['rows_per_second']:.0f} rows/s  inserted {stats['inserted']}  "
+              f"updated {stats['updated']}  duplicates {stats['duplicates']}  invalid {stats['invalid']}",
+              file=sys.stderr)
+
+    if not os.path.exists(args.path):
+        parser.error(f"no such file: {args.path}")
+    summary = asyncio.run(import_file(args.path, file_format, args.batch_size, args.dry_run, report))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
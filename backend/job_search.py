@@ -0,0 +1,190 @@
+"""Job listings stored in Mongo, with filtered, cursor-paginated search.
+
+Listings live in the `jobs` collection. Next to the JobListing fields each
+document carries a few derived, indexed fields:
+
+- `salary_min` / `salary_max` / `salary_currency` / `salary_period` /
+  `salary_extras`: the parsed salary, annualized (see salary_parser.py)
+- `location_keys`: the lower-cased location and each comma-separated part of it
+- `is_hospitality`: drives the featured ordering and the hospitality counts
+- `content_hash`: identifies the same posting under different ids (imports dedupe on it)
+
+Pages are ordered newest first by (posted_date, id). The cursor is the sort key
+of the last listing returned, so fetching a page is an index seek, not a
+skip over every earlier page. Facet counts for the filtered set come from one
+`$facet` aggregation. They are cached for a short TTL, because with 100k+
+listings they are the expensive part of a search. Each facet keeps its
+FACET_BUCKET_LIMIT largest buckets: free-text locations alone can run to tens
+of thousands of values.
+"""
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import DESCENDING, UpdateOne
+
+from salary_parser import parse_salary
+
+SORT = [("posted_date", DESCENDING), ("id", DESCENDING)]
+FACET_BUCKET_LIMIT = 50
+# Derived fields used only for filtering; the parsed salary fields are returned with the listing
+DERIVED_FIELDS = ("location_keys", "is_hospitality", "content_hash")
+CONTENT_HASH_FIELDS = ("title", "company", "location", "salary_range", "job_type", "category", "description")
+LISTING_PROJECTION = {"_id": 0, **{field: 0 for field in DERIVED_FIELDS}}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def location_keys(location: str) -> List[str]:
+    parts = [part.strip().lower() for part in (location or "").split(",")]
+    keys = [(location or "").strip().lower()] + [part for part in parts if part]
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def content_hash(listing: Dict[str, Any]) -> str:
+    """Hash of what the posting says, ignoring its id and dates; whitespace and case are normalized."""
+    normalized = [" ".join(str(listing.get(field) or "").lower().split()) for field in CONTENT_HASH_FIELDS]
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode()).hexdigest()
+
+
+def job_document(listing: Dict[str, Any]) -> Dict[str, Any]:
+    """A validated listing plus the derived fields the search indexes."""
+    return {
+        **listing,
+        **parse_salary(listing.get("salary_range")),
+        "location_keys": location_keys(listing.get("location", "")),
+        "is_hospitality": "Hospitality" in listing.get("category", ""),
+        "content_hash": content_hash(listing),
+    }
+
+
+async def write_job_documents(collection, documents: List[Dict[str, Any]], salary_index=None):
+    """Upsert documents built by job_document by id. Returns the BulkWriteResult (None when empty)."""
+    if not documents:
+        return None
+    operations = [UpdateOne({"id": document["id"]}, {"$set": document}, upsert=True) for document in documents]
+    result = await collection.bulk_write(operations, ordered=False)
+    if salary_index is not None:
+        for document in documents:
+            salary_index.upsert(document)
+    return result
+
+
+async def upsert_jobs(collection, listings: Iterable[Dict[str, Any]], salary_index=None):
+    return await write_job_documents(collection, [job_document(listing) for listing in listings], salary_index)
+
+
+def build_job_filter(category: Optional[str] = None, job_type: Optional[str] = None,
+                     location: Optional[str] = None, visa_support: Optional[bool] = None,
+                     min_salary: Optional[float] = None, max_salary: Optional[float] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if category:
+        query["category"] = category
+    if job_type:
+        query["job_type"] = job_type
+    if location:
+        query["location_keys"] = location.strip().lower()
+    if visa_support is not None:
+        query["visa_support"] = visa_support
+    # Ranges overlap: the listing pays at least min_salary at the top and at most max_salary at the bottom
+    if min_salary is not None:
+        query["salary_max"] = {"$gte": min_salary}
+    if max_salary is not None:
+        query["salary_min"] = {"$lte": max_salary}
+    return query
+
+
+def encode_cursor(listing: Dict[str, Any]) -> str:
+    raw = json.dumps([listing["posted_date"], listing["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Filter selecting the listings after the cursor in SORT order."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        posted_date, listing_id = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if not isinstance(posted_date, str) or not isinstance(listing_id, str):
+        raise InvalidCursor(cursor)
+    return {"$or": [
+        {"posted_date": {"$lt": posted_date}},
+        {"posted_date": posted_date, "id": {"$lt": listing_id}},
+    ]}
+
+
+def _count_by(field: str) -> List[Dict[str, Any]]:
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_BUCKET_LIMIT},
+    ]
+
+
+def facet_pipeline(query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "category": _count_by("category"),
+            "job_type": _count_by("job_type"),
+            "location": _count_by("location"),
+            "visa_support": _count_by("visa_support"),
+        }},
+    ]
+
+
+def _facet_counts(result: Dict[str, Any]) -> Dict[str, Any]:
+    total = result["total"][0]["count"] if result["total"] else 0
+    facets = {
+        name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in buckets]
+        for name, buckets in result.items() if name != "total"
+    }
+    return {"total": total, "facets": facets}
+
+
+class FacetCache:
+    """Facet counts per filter, kept for `ttl_seconds` or until `invalidate()`."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, collection, query: Dict[str, Any]) -> Dict[str, Any]:
+        key = json.dumps(query, sort_keys=True, default=str)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        results = await collection.aggregate(facet_pipeline(query)).to_list(length=1)
+        counts = _facet_counts(results[0])
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, counts)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return counts
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+async def find_page(collection, query: Dict[str, Any], limit: int, cursor: Optional[str] = None):
+    """One page of listings after `cursor`, and the cursor for the next page (None on the last)."""
+    page_query = {"$and": [query, decode_cursor(cursor)]} if cursor else query
+    listings = await collection.find(page_query, LISTING_PROJECTION).sort(SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(listings[limit - 1]) if len(listings) > limit else None
+    return listings[:limit], next_cursor
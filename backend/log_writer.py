@@ -0,0 +1,163 @@
+"""Write-behind buffer for append-only log collections.
+
+Progress toggles used to pay for a `progress_logs.insert_one` on the request
+path. Events are now queued in memory and flushed with `insert_many` once
+`batch_size` events are waiting or `flush_interval` seconds have passed. The
+queue is bounded: when it is full, `enqueue` waits for room, which applies
+backpressure to the handlers instead of growing without limit. `stop()`
+flushes whatever is left, so a clean shutdown loses nothing.
+
+A failed flush is retried `max_retries` times with exponential backoff. While
+it retries, the queue keeps filling, and a full queue blocks handlers as
+usual. insert_many gives each document an `_id` on the first attempt. A
+retried document that already landed therefore fails with a duplicate key
+error and counts as written, not as written twice. Events that still fail
+after the last retry are counted in `dropped`.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+_STOP = object()
+DUPLICATE_KEY = 11000
+
+
+class BufferedLogWriter:
+    def __init__(self, collection, batch_size: int = 100, flush_interval: float = 1.0, max_queue: int = 10000,
+                 max_retries: int = 3, retry_backoff: float = 0.5):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.retries = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, document: Dict[str, Any]):
+        if not self.running or self._stopping:
+            # Not started (e.g. scripts importing the app) or shutting down - write directly
+            await self.collection.insert_one(document)
+            return
+        await self._queue.put(document)
+        self.enqueued += 1
+
+    async def enqueue_many(self, documents: List[Dict[str, Any]]):
+        for document in documents:
+            await self.enqueue(document)
+
+    async def drain(self):
+        """Wait until everything queued so far has been written."""
+        if self.running:
+            await self._queue.join()
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                await self._flush(batch)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert a batch; returns the documents that did not make it."""
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            self.written += len(batch)
+            return []
+        except BulkWriteError as exc:
+            failed = [error["index"] for error in exc.details.get("writeErrors", [])
+                      if error.get("code") != DUPLICATE_KEY]
+            self.written += len(batch) - len(failed)
+            return [batch[index] for index in failed]
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.retries += 1
+                    await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                try:
+                    batch = await self._insert(batch)
+                    error = None
+                except Exception as exc:
+                    error = exc
+                if not batch:
+                    return
+            self.failed_flushes += 1
+            self.dropped += len(batch)
+            print(f"Dropped {len(batch)} log events after {self.max_retries} retries: {error or 'write errors'}")
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+
+    async def stop(self):
+        """Flush everything still queued, then stop the flusher."""
+        if not self.running:
+            return
+        self._stopping = True
+        # The queue is FIFO, so the sentinel is only seen after every queued event
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._stopping = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": (self.total_flush_ms / self.flushes) if self.flushes else 0.0,
+        }
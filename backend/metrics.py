@@ -0,0 +1,396 @@
+"""Request and Mongo metrics in the Prometheus text exposition format.
+
+`MetricsMiddleware` is a plain ASGI middleware (so streaming responses keep
+streaming). It records per-route latency histograms, in-flight gauges,
+response sizes and request counts. Routes are labelled with their template
+(`/api/visa/requirements/{visa_type}`), never with the raw path, and requests
+that match no route share one `unmatched` label, so label cardinality is
+bounded by the number of routes. Streaming routes (server-sent events) stay
+open for minutes, so they are only counted: they would swamp the latency
+histogram and the in-flight gauge. `CommandMetrics` is a pymongo command
+listener that times every Mongo command by collection and operation.
+
+Metrics are kept per process. Under gunicorn a scrape reaches one worker, so
+with `METRICS_MULTIPROC_DIR` set each worker writes a snapshot of its
+registry to `<dir>/<pid>.json` every `METRICS_WRITE_INTERVAL_SECONDS`, and
+`SharedMetrics.render()` adds the other workers' snapshots to its own live
+values. Counters and histograms of workers that exited are kept, so totals
+never go backwards; their gauges are dropped (`mark_process_dead`).
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+LabelValues = Tuple[str, ...]
+# A metric's series as JSON: [[label values, value], ...]
+Snapshot = List[List[Any]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self, others: Iterable[Snapshot] = ()) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        for snapshot in others:
+            for labels, value in snapshot:
+                values[tuple(labels)] = values.get(tuple(labels), 0.0) + value
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+                for labels, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            return [[list(labels), list(series)] for labels, series in self._values.items()]
+
+    def render(self, others: Iterable[Snapshot] = ()) -> List[str]:
+        with self._lock:
+            values = {labels: list(series) for labels, series in self._values.items()}
+        for snapshot in others:
+            for labels, series in snapshot:
+                current = values.get(tuple(labels))
+                if current is None:
+                    values[tuple(labels)] = list(series)
+                else:
+                    values[tuple(labels)] = [mine + theirs for mine, theirs in zip(current, series)]
+        lines = []
+        for labels, series in sorted(values.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += observed
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {metric.name: {"kind": metric.kind, "series": metric.snapshot()} for metric in self._metrics}
+
+    def render(self, others: Iterable[Dict[str, Dict[str, Any]]] = ()) -> str:
+        """The registry in text format, with the series of other processes' snapshots added in."""
+        others = list(others)
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render(other[metric.name]["series"] for other in others if metric.name in other))
+        return "\n".join(lines) + "\n"
+
+
+class SharedMetrics:
+    """One registry per worker, rendered as the sum over every worker sharing `directory`.
+
+    Without a directory this is just the local registry.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Optional[str] = None, interval: float = 1.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.write_failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, registry: MetricsRegistry) -> "SharedMetrics":
+        return cls(
+            registry,
+            directory=os.environ.get("METRICS_MULTIPROC_DIR") or None,
+            interval=float(os.environ.get("METRICS_WRITE_INTERVAL_SECONDS", "1")),
+        )
+
+    @staticmethod
+    def path(directory: str, pid: int) -> str:
+        return os.path.join(directory, f"{pid}.json")
+
+    def write(self):
+        """Replace this process's snapshot file atomically, so readers never see half of it."""
+        path = self.path(self.directory, os.getpid())
+        try:
+            with open(path + ".tmp", "w") as handle:
+                json.dump(self.registry.snapshot(), handle)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            self.write_failures += 1
+
+    def others(self) -> List[Dict[str, Dict[str, Any]]]:
+        if self.directory is None:
+            return []
+        own = f"{os.getpid()}.json"
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue  # removed or replaced while listing
+        return snapshots
+
+    def render(self) -> str:
+        return self.registry.render(self.others())
+
+    async def _write_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.write()
+
+    def start(self):
+        if self.directory is not None and self._task is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.write()
+            self._task = asyncio.get_running_loop().create_task(self._write_periodically())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.write()
+
+    @staticmethod
+    def mark_process_dead(directory: str, pid: int):
+        """Drop an exited worker's gauges; its counters and histograms keep counting towards the totals."""
+        path = SharedMetrics.path(directory, pid)
+        try:
+            with open(path) as handle:
+                snapshot = json.load(handle)
+        except (OSError, ValueError):
+            return
+        kept = {name: metric for name, metric in snapshot.items() if metric["kind"] != Gauge.kind}
+        with open(path + ".tmp", "w") as handle:
+            json.dump(kept, handle)
+        os.replace(path + ".tmp", path)
+
+
+class HttpMetrics:
+    def __init__(self, registry: MetricsRegistry):
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "Time spent handling HTTP requests.", ("method", "route"))
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "HTTP requests currently being handled.", ("method", "route"))
+        self.response_size = registry.histogram(
+            "http_response_size_bytes", "Size of HTTP response bodies.", ("method", "route"), SIZE_BUCKETS)
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: HttpMetrics, streaming_routes: Iterable[str] = ()):
+        self.app = app
+        self.metrics = metrics
+        self.streaming_routes = frozenset(streaming_routes)
+        # Paths of routes without path parameters resolve to themselves; cached to skip the route scan
+        self._static_routes: Dict[Tuple[str, str], str] = {}
+
+    def route_template(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        cached = self._static_routes.get(key)
+        if cached is not None:
+            return cached
+        router = scope["app"].router
+        partial: Optional[str] = None
+        for route in router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                if not getattr(route, "param_convertors", None):
+                    self._static_routes[key] = route.path
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                # Path matched but the method did not (405)
+                partial = route.path
+        return partial or UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_template(scope)
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        if route in self.streaming_routes:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self.metrics.requests.inc(method, route, str(status_code))
+            return
+
+        self.metrics.in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.latency.observe(time.perf_counter() - started, method, route)
+            self.metrics.in_flight.dec(method, route)
+            self.metrics.response_size.observe(body_bytes, method, route)
+            self.metrics.requests.inc(method, route, str(status_code))
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Mongo command latency by collection and operation.
+
+    Only the started event carries the command document, so the collection is
+    remembered per (connection, request id) until the command finishes.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.duration = registry.histogram(
+            "mongo_command_duration_seconds", "Time spent in Mongo commands.",
+            ("collection", "operation"), MONGO_BUCKETS)
+        self.failures = registry.counter(
+            "mongo_command_failures_total", "Mongo commands that failed.", ("collection", "operation"))
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore names its collection separately; admin commands have none
+        return event.command.get("collection", "")
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), "")
+        self.duration.observe(event.duration_micros / 1_000_000, collection, event.command_name)
+        return collection
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        self.failures.inc(collection, event.command_name)
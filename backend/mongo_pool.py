@@ -0,0 +1,124 @@
+"""Motor client configuration and connection-pool metrics.
+
+Pool sizing, idle time, server selection timeout and wire compression are read
+from the environment so they can be tuned per deployment (e.g. smaller pools
+per worker when running several uvicorn workers against one mongod).
+`PoolMetrics` is a pymongo connection-pool listener that tracks checked-out
+connections and how long operations wait for a connection.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import motor.motor_asyncio
+from pymongo import monitoring
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else None
+
+
+def client_options_from_env() -> Dict[str, Any]:
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS"),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    }
+    # e.g. "zstd,snappy,zlib" - zstd and snappy need the zstandard / python-snappy packages
+    compressors = os.environ.get("MONGO_COMPRESSORS", "").strip()
+    if compressors:
+        options["compressors"] = compressors
+    return {key: value for key, value in options.items() if value is not None}
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Checked-out connections and wait-queue time, aggregated across pools.
+
+    pymongo checks connections out synchronously on the executor thread that
+    runs the operation, so a thread-local start time pairs each
+    checkout-started event with its checked-out/failed event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _waited_ms(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited_ms = self._waited_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def connection_check_out_failed(self, event):
+        waited_ms = self._waited_ms()
+        with self._lock:
+            self.checkout_failures += 1
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_failures
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": (self.total_wait_ms / attempts) if attempts else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+            }
+
+
+def create_client(mongo_url: str, *listeners, **overrides) -> motor.motor_asyncio.AsyncIOMotorClient:
+    options = {**client_options_from_env(), **overrides}
+    return motor.motor_asyncio.AsyncIOMotorClient(mongo_url, event_listeners=list(listeners), **options)
@@ -0,0 +1,108 @@
+"""Bounded TTL/LRU cache of authenticated principals.
+
+`get_current_user` would otherwise hit `db.users` on every authenticated
+request. Entries are keyed by (username, token iat), so a fresh login gets a
+fresh entry, and every write path that changes the user document must call
+`invalidate(username)`.
+
+A request that read the user just before a write could otherwise put the old
+document back after the write invalidated it. So readers take `version()`
+before going to the database and hand it to `put()`, which drops the
+principal if the user was invalidated since. Invalidation stamps are kept for
+the `max_entries` most recently invalidated users. Reads older than a
+forgotten stamp are not cached, whoever they are for.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self._writes = 0
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten_at = 0
+
+    def version(self) -> int:
+        """Stamp to take before reading a principal from the database, for `put()`."""
+        return self._writes
+
+    def get(self, username: str, issued_at: Hashable) -> Optional[Any]:
+        key = (username, issued_at)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return principal
+
+    def put(self, username: str, issued_at: Hashable, principal: Any, version: int):
+        """Cache a principal read at `version`, unless its user has been invalidated since."""
+        if self._invalidated_at.get(username, self._forgotten_at) > version:
+            self.stale_puts += 1
+            return
+        key = (username, issued_at)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(username, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate(self, username: str):
+        """Drop every cached principal for a user, whatever token they came from."""
+        self._writes += 1
+        self._invalidated_at[username] = self._writes
+        self._invalidated_at.move_to_end(username)
+        if len(self._invalidated_at) > self.max_entries:
+            _, self._forgotten_at = self._invalidated_at.popitem(last=False)
+        keys = self._keys_by_user.pop(username, ())
+        for key in keys:
+            self._entries.pop(key, None)
+        if keys:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self._writes += 1
+        self._invalidated_at.clear()
+        self._forgotten_at = self._writes
+
+    def _discard(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
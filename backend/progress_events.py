@@ -0,0 +1,270 @@
+"""Per-user progress events, pushed to clients as server-sent events.
+
+Each progress write publishes one small event to the user's channel
+(`dashboard_snapshot.snapshot_delta`). The event carries the steps that
+changed, the new counts, the changed categories and any phase change.
+Clients hold one stream open at GET /api/progress/events and apply the
+deltas, instead of re-fetching the dashboard after every toggle.
+
+`ProgressBroker` fans events out to the subscriptions in this process, one
+bounded queue per open stream. Events published in other workers arrive
+through a backend:
+
+- `LocalBackend`: a single process, so there is nothing to relay.
+- `MongoBackend`: every worker appends its events to a capped collection and
+  tails it with a tailable cursor, skipping its own events. This works on a
+  standalone mongod and needs no extra service.
+
+PROGRESS_EVENTS_BACKEND picks one (local/mongo). gunicorn.conf.py defaults
+it to mongo when it runs more than one worker.
+
+The same relay keeps the per-process caches of the workers coherent. A
+write calls `invalidate(cache, key)`, which runs the handler registered for
+that cache with `on_invalidate()` in this worker, then in every other worker.
+Invalidations and events share one ordered channel. So a worker always drops
+a user's cached principal before it delivers the event of the write that
+made it stale.
+
+A subscriber that falls `max_queue` events behind stops receiving events.
+Its stream then sends `resync`, and the client re-fetches its state. Streams
+send a keepalive comment every `heartbeat_seconds`, so proxies keep them
+open. They end after `max_stream_seconds`, and EventSource reconnects
+(`retry`), so deploys and worker restarts are not held up by old streams.
+"""
+import asyncio
+import os
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from fast_json import dumps
+
+Deliver = Callable[[str, Dict[str, Any]], None]
+Invalidate = Callable[[str, Optional[str]], None]
+
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(event_type: str, data: Any) -> bytes:
+    return b"event: " + event_type.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    def __init__(self, broker: "ProgressBroker", user_id: str, max_queue: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def deliver(self, event: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.lagged = True
+            return False
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """The next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBackend:
+    name = "local"
+
+    async def start(self, deliver: Deliver, invalidate: Invalidate):
+        pass
+
+    async def publish(self, user_id: str, event: Dict[str, Any]):
+        pass
+
+    async def invalidate(self, cache: str, key: Optional[str]):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class MongoBackend:
+    """Relays events between workers through a capped collection that every worker tails."""
+
+    name = "mongo"
+
+    def __init__(self, database, collection_name: str = "progress_events", size_bytes: int = 16 * 1024 * 1024,
+                 retry_seconds: float = 1.0):
+        self.database = database
+        self.collection = database[collection_name]
+        self.collection_name = collection_name
+        self.size_bytes = size_bytes
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver, invalidate: Invalidate):
+        from bson import ObjectId
+        from pymongo.errors import CollectionInvalid
+
+        try:
+            await self.database.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass  # another worker created it first
+        # Only events published from now on; ObjectIds are ordered by creation time
+        self._task = asyncio.create_task(self._tail(deliver, invalidate, ObjectId()))
+
+    async def publish(self, user_id: str, event: Dict[str, Any]):
+        await self.collection.insert_one({"origin": self.origin, "user_id": user_id, "event": event})
+
+    async def invalidate(self, cache: str, key: Optional[str]):
+        await self.collection.insert_one({"origin": self.origin, "cache": cache, "key": key})
+
+    async def _tail(self, deliver: Deliver, invalidate: Invalidate, last_id):
+        from pymongo import CursorType
+
+        while True:
+            try:
+                cursor = self.collection.find({"_id": {"$gt": last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for document in cursor:
+                        last_id = document["_id"]
+                        if document["origin"] == self.origin:
+                            continue
+                        if "cache" in document:
+                            invalidate(document["cache"], document["key"])
+                        else:
+                            deliver(document["user_id"], document["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"Progress event relay failed, retrying: {exc}")
+            # A tailable cursor on an empty (or just emptied) capped collection dies at once
+            await asyncio.sleep(self.retry_seconds)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_backend(name: str, database):
+    if name == "local":
+        return LocalBackend()
+    if name == "mongo":
+        return MongoBackend(database)
+    raise ValueError(f"Unknown progress events backend {name!r} (expected local or mongo)")
+
+
+class ProgressBroker:
+    def __init__(self, max_queue: int = 100, heartbeat_seconds: float = 15.0, max_stream_seconds: float = 300.0):
+        self.max_queue = max_queue
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_stream_seconds = max_stream_seconds
+        self.backend = LocalBackend()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._invalidators: Dict[str, Callable[[Optional[str]], None]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.invalidations = 0
+        self.relayed_invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "ProgressBroker":
+        return cls(
+            max_queue=int(os.environ.get("PROGRESS_EVENTS_MAX_QUEUE", "100")),
+            heartbeat_seconds=float(os.environ.get("PROGRESS_EVENTS_HEARTBEAT_SECONDS", "15")),
+            max_stream_seconds=float(os.environ.get("PROGRESS_EVENTS_MAX_STREAM_SECONDS", "300")),
+        )
+
+    async def start(self, backend):
+        self.backend = backend
+        await backend.start(self._deliver, self._relayed_invalidation)
+
+    async def stop(self):
+        await self.backend.stop()
+        self.backend = LocalBackend()
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id, self.max_queue)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    async def publish(self, user_id: str, event: Dict[str, Any]):
+        """Deliver to this process's subscribers, then relay to the other workers."""
+        self.published += 1
+        self._deliver(user_id, event)
+        await self.backend.publish(user_id, event)
+
+    def on_invalidate(self, cache: str, handler: Callable[[Optional[str]], None]):
+        """Run `handler(key)` whenever any worker invalidates `key` (None: everything) in `cache`."""
+        self._invalidators[cache] = handler
+
+    async def invalidate(self, cache: str, key: Optional[str] = None):
+        """Invalidate in this process, then relay to the other workers."""
+        self.invalidations += 1
+        self._invalidators[cache](key)
+        await self.backend.invalidate(cache, key)
+
+    def _relayed_invalidation(self, cache: str, key: Optional[str]):
+        handler = self._invalidators.get(cache)
+        if handler is not None:
+            self.relayed_invalidations += 1
+            handler(key)
+
+    def _deliver(self, user_id: str, event: Dict[str, Any]):
+        for subscription in tuple(self._subscribers.get(user_id, ())):
+            if subscription.deliver(event):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    async def stream(self, subscription: Subscription, initial: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """SSE body: the initial snapshot, then events as they arrive, until max_stream_seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_stream_seconds
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n".encode() + format_event("snapshot", initial)
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                event = await subscription.next(min(self.heartbeat_seconds, remaining))
+                if subscription.lagged:
+                    # Events were dropped: the client re-fetches rather than applying a gap
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.lagged = False
+                    yield format_event("resync", {})
+                elif event is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield format_event(event["type"], event)
+        finally:
+            subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "users": len(self._subscribers),
+            "subscriptions": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "invalidations": self.invalidations,
+            "relayed_invalidations": self.relayed_invalidations,
+        }
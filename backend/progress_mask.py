@@ -0,0 +1,90 @@
+"""Bitset representation of a user's completed timeline steps.
+
+Bit `n` of the mask is set when step `n` is completed, so membership is a
+shift-and-and and category counts are popcounts of `mask & category_mask`.
+In Mongo the mask is stored as a list of 63-bit words (`completed_mask`) next
+to `completed_steps`, which keeps every word a positive int64 and lets the
+words be updated server-side with `$bit`.
+"""
+from typing import Dict, Iterable, List
+
+from bson import Int64
+
+WORD_BITS = 63
+WORD_MASK = (1 << WORD_BITS) - 1
+
+
+def steps_to_mask(step_ids: Iterable[int]) -> int:
+    mask = 0
+    for step_id in step_ids:
+        mask |= 1 << step_id
+    return mask
+
+
+def mask_to_steps(mask: int) -> List[int]:
+    steps = []
+    while mask:
+        low_bit = mask & -mask
+        steps.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return steps
+
+
+def has_step(mask: int, step_id: int) -> bool:
+    return (mask >> step_id) & 1 == 1
+
+
+def popcount(mask: int) -> int:
+    return mask.bit_count()
+
+
+def mask_to_words(mask: int, width: int = 0) -> List[int]:
+    """Split a mask into stored words, padded with zeros to at least `width` words."""
+    words = []
+    while mask or len(words) < width:
+        words.append(mask & WORD_MASK)
+        mask >>= WORD_BITS
+    return words
+
+
+def words_to_mask(words: Iterable[int]) -> int:
+    mask = 0
+    for index, word in enumerate(words):
+        mask |= int(word) << (index * WORD_BITS)
+    return mask
+
+
+def word_position(step_id: int):
+    """(word index, bit within word) of a step in the stored mask."""
+    return divmod(step_id, WORD_BITS)
+
+
+def category_masks(steps: Iterable[dict]) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for step in steps:
+        masks[step["category"]] = masks.get(step["category"], 0) | (1 << step["id"])
+    return masks
+
+
+def mask_words_expression(steps_field: str, width: int) -> List[dict]:
+    """Aggregation expression rebuilding the stored mask words from a steps array.
+
+    Used in pipeline-style updates, where `$bit` is not available. Each word is
+    the sum of 2**(step - word offset) over the steps that fall into it.
+    """
+    words = []
+    for index in range(width):
+        low = index * WORD_BITS
+        words.append({
+            "$reduce": {
+                "input": {
+                    "$filter": {
+                        "input": steps_field,
+                        "cond": {"$and": [{"$gte": ["$$this", low]}, {"$lt": ["$$this", low + WORD_BITS]}]},
+                    }
+                },
+                "initialValue": Int64(0),
+                "in": {"$add": ["$$value", {"$toLong": {"$pow": [2, {"$subtract": ["$$this", low]}]}}]},
+            }
+        })
+    return words
@@ -0,0 +1,118 @@
+"""Opt-in sampling profiler for individual requests.
+
+A request is profiled when it carries the admin header
+(`X-Profile-Token: <PROFILE_ADMIN_TOKEN>`) or is picked by
+`PROFILE_SAMPLE_RATE` (0.0-1.0). Both are off by default, and the middleware
+then passes requests straight through without importing the profiler.
+
+Profiles are taken with pyinstrument in async mode, so time a handler spends
+awaiting Motor shows up under the awaiting coroutine as `[await]` rather
+than vanishing into the event loop. Each profile is written to
+`PROFILE_OUTPUT_DIR` as folded stacks (`frame;frame;frame <microseconds>`),
+which flamegraph.pl, inferno and speedscope all read. The file name is
+returned to the caller in the `X-Profile-Id` response header.
+"""
+import asyncio
+import os
+import random
+import re
+import secrets
+import time
+import uuid
+from typing import List, Optional
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def _frame_name(frame) -> str:
+    if frame.is_synthetic:
+        return frame.identifier
+    return f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+
+
+def folded_stacks(root_frame) -> List[str]:
+    """Collapse a pyinstrument frame tree into folded stack lines."""
+    lines = []
+    stack = [(root_frame, [])]
+    while stack:
+        frame, parents = stack.pop()
+        path = parents + [_frame_name(frame).replace(";", ":")]
+        self_time = frame.time - sum(child.time for child in frame.children)
+        weight = round(self_time * 1_000_000)
+        if weight > 0:
+            lines.append(f"{';'.join(path)} {weight}")
+        stack.extend((child, path) for child in frame.children)
+    return lines
+
+
+class RequestProfiler:
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, admin_token: Optional[str] = None,
+                 interval: float = 0.001):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token.encode() if admin_token else None
+        self.interval = interval
+        self.profiles_written = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            output_dir=os.environ.get("PROFILE_OUTPUT_DIR", "/tmp/relocateme-profiles"),
+            sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+            admin_token=os.environ.get("PROFILE_ADMIN_TOKEN") or None,
+            interval=float(os.environ.get("PROFILE_INTERVAL_SECONDS", "0.001")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.admin_token is not None
+
+    def should_profile(self, scope) -> bool:
+        if self.admin_token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return secrets.compare_digest(value, self.admin_token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def profile_id(self, scope) -> str:
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        return f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{path}-{uuid.uuid4().hex[:8]}"
+
+    def write(self, profile_id: str, lines: List[str]) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{profile_id}.folded")
+        with open(path, "w") as handle:
+            handle.write("\n".join(lines) + "\n")
+        self.profiles_written += 1
+        return path
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        profile_id = self.profiler.profile_id(scope)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        sampler = Profiler(interval=self.profiler.interval, async_mode="enabled")
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session = sampler.stop()
+            root_frame = session.root_frame()
+            if root_frame is not None:
+                await asyncio.to_thread(self.profiler.write, profile_id, folded_stacks(root_frame))
@@ -0,0 +1,149 @@
+"""Sorted in-memory index of listing salaries.
+
+Each listing with a GBP salary contributes the midpoint of its annualized
+range. Midpoints are kept in a sorted list, with a running total next to it:
+
+- the average is O(1)
+- percentiles are an index into the list
+- range counts and histogram buckets are bisections, so a histogram costs
+  O(buckets * log n), however many listings there are
+
+Upserts and removals keep the list sorted (a bisect plus a memmove) and
+adjust the total, so the stats follow listing changes without a rescan.
+
+Other workers' writes only reach this process through `refresh()`, which
+reloads the index from the jobs collection. Readers call `refresh_if_stale()`,
+which schedules that reload in the background once the index is older than
+`refresh_seconds`. A worker told that the listings changed elsewhere forces
+one; if a reload is already running, another follows it, so the change is
+not missed by a read that started before it.
+"""
+import asyncio
+import math
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional
+
+INDEXED_CURRENCY = "GBP"
+
+
+def salary_midpoint(listing: Dict[str, Any]) -> Optional[float]:
+    low, high = listing.get("salary_min"), listing.get("salary_max")
+    if low is None or high is None or listing.get("salary_currency") != INDEXED_CURRENCY:
+        return None
+    return (low + high) / 2
+
+
+class SalaryIndex:
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = refresh_seconds
+        self._by_id: Dict[str, float] = {}
+        self._sorted: List[float] = []
+        self._total = 0.0
+        self.loaded_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_again = False
+
+    def __len__(self):
+        return len(self._sorted)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self, listings: Iterable[Dict[str, Any]]):
+        by_id = {}
+        for listing in listings:
+            midpoint = salary_midpoint(listing)
+            if midpoint is not None:
+                by_id[listing["id"]] = midpoint
+        self._by_id = by_id
+        self._sorted = sorted(by_id.values())
+        self._total = math.fsum(self._sorted)
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, listing: Dict[str, Any]):
+        self.remove(listing["id"])
+        midpoint = salary_midpoint(listing)
+        if midpoint is not None:
+            self._by_id[listing["id"]] = midpoint
+            insort(self._sorted, midpoint)
+            self._total += midpoint
+
+    def remove(self, listing_id: str):
+        midpoint = self._by_id.pop(listing_id, None)
+        if midpoint is not None:
+            del self._sorted[bisect_left(self._sorted, midpoint)]
+            self._total -= midpoint
+
+    def average(self) -> Optional[float]:
+        return self._total / len(self._sorted) if self._sorted else None
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100)."""
+        if not self._sorted:
+            return None
+        rank = max(1, math.ceil(pct / 100 * len(self._sorted)))
+        return self._sorted[min(rank, len(self._sorted)) - 1]
+
+    def count_between(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        start = bisect_left(self._sorted, low) if low is not None else 0
+        end = bisect_right(self._sorted, high) if high is not None else len(self._sorted)
+        return max(0, end - start)
+
+    def histogram(self, bucket_width: float, low: Optional[float] = None, high: Optional[float] = None,
+                  max_buckets: int = 200) -> List[Dict[str, float]]:
+        """Counts per [min, max) bucket of `bucket_width`, covering low..high (inclusive)."""
+        if not self._sorted:
+            return []
+        low = self._sorted[0] if low is None else low
+        high = self._sorted[-1] if high is None else high
+        start = math.floor(low / bucket_width) * bucket_width
+        if math.floor((high - start) / bucket_width) + 1 > max_buckets:
+            raise ValueError(f"more than {max_buckets} buckets")
+        buckets = []
+        edge = start
+        while edge <= high:
+            upper = edge + bucket_width
+            end = bisect_left(self._sorted, upper) if upper <= high else bisect_right(self._sorted, high)
+            buckets.append({"min": edge, "max": upper, "count": end - bisect_left(self._sorted, max(edge, low))})
+            edge = upper
+        return buckets
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": len(self._sorted),
+            "currency": INDEXED_CURRENCY,
+            "average": self.average(),
+            "min": self._sorted[0] if self._sorted else None,
+            "max": self._sorted[-1] if self._sorted else None,
+            "p25": self.percentile(25),
+            "p50": self.percentile(50),
+            "p75": self.percentile(75),
+            "p90": self.percentile(90),
+        }
+
+    async def refresh(self, collection):
+        projection = {"_id": 0, "id": 1, "salary_min": 1, "salary_max": 1, "salary_currency": 1}
+        self.load([listing async for listing in collection.find({"salary_currency": INDEXED_CURRENCY}, projection)])
+
+    async def _refresh_in_background(self, collection):
+        while True:
+            self._refresh_again = False
+            try:
+                await self.refresh(collection)
+            except Exception as exc:
+                # Keep serving the previous snapshot; the next reader retries
+                print(f"Failed to refresh salary index: {exc}")
+                return
+            if not self._refresh_again:
+                return
+
+    def refresh_if_stale(self, collection, force: bool = False):
+        stale = force or self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_seconds
+        if not stale:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_in_background(collection))
+        elif force:
+            self._refresh_again = True
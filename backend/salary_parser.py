@@ -0,0 +1,61 @@
+"""Structured salaries from free-text salary strings.
+
+Job boards write salaries as text: "£22,000 - £26,000 + tips",
+"£11.50/hour + £200-400 weekly tips", "£25k - £30k". `parse_salary` splits
+off the extras after the first "+", reads the amounts and pay period of the
+base pay, and annualizes them. Every listing can then be filtered, sorted and
+averaged on the same numeric scale.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+CURRENCIES = {"£": "GBP", "$": "USD", "€": "EUR"}
+
+# Full-time hours used to annualize hourly, daily, weekly and monthly pay
+HOURS_PER_WEEK = 37.5
+ANNUAL_MULTIPLIERS = {
+    "year": 1,
+    "month": 12,
+    "week": 52,
+    "day": 5 * 52,
+    "hour": HOURS_PER_WEEK * 52,
+}
+
+AMOUNT_RE = re.compile(r"([£$€])?\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.IGNORECASE)
+PERIOD_PATTERNS = [
+    ("hour", re.compile(r"(/\s*h(ou)?r|per\s+hour|hourly|\bph\b|p/h)", re.IGNORECASE)),
+    ("day", re.compile(r"(/\s*day|per\s+day|daily)", re.IGNORECASE)),
+    ("week", re.compile(r"(/\s*w(ee)?k|per\s+week|weekly|\bpw\b)", re.IGNORECASE)),
+    ("month", re.compile(r"(/\s*month|per\s+month|monthly|\bpcm\b)", re.IGNORECASE)),
+]
+
+
+def _period(text: str) -> str:
+    for period, pattern in PERIOD_PATTERNS:
+        if pattern.search(text):
+            return period
+    return "year"
+
+
+def parse_salary(text: Optional[str]) -> Dict[str, Any]:
+    """Annualized {salary_min, salary_max, salary_currency, salary_period, salary_extras}.
+
+    Amounts are None when the base pay has no number in it ("Competitive").
+    """
+    base, *extras = (text or "").split("+")
+    amounts: List[float] = []
+    currency = None
+    for symbol, number, thousands in AMOUNT_RE.findall(base):
+        amount = float(number.replace(",", ""))
+        amounts.append(amount * 1000 if thousands else amount)
+        currency = currency or CURRENCIES.get(symbol)
+
+    period = _period(base)
+    multiplier = ANNUAL_MULTIPLIERS[period]
+    return {
+        "salary_min": round(min(amounts) * multiplier, 2) if amounts else None,
+        "salary_max": round(max(amounts) * multiplier, 2) if amounts else None,
+        "salary_currency": currency or ("GBP" if amounts else None),
+        "salary_period": period,
+        "salary_extras": [extra.strip() for extra in extras if extra.strip()],
+    }
@@ -0,0 +1,149 @@
+"""Inverted-index full-text search over the resource catalog.
+
+The index is built once from the resource catalog. Every term maps to its
+postings (doc id -> precomputed BM25F weight), and a sorted vocabulary lets
+query tokens expand to every indexed term they prefix, which is what the
+type-ahead search box needs. A query is a handful of dict lookups plus a
+top-k selection, independent of how many resources are indexed.
+
+A short prefix can match a large part of the vocabulary. It is then expanded
+to the MAX_PREFIX_EXPANSIONS terms found in the most documents. The search
+reports that it was truncated, because its total is then a lower bound.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+URL_STOPWORDS = {"http", "https", "www"}
+
+# BM25F parameters - name matches count more than description or url matches
+FIELD_BOOSTS = {"name": 3.0, "description": 1.0, "url": 0.5}
+K1 = 1.2
+B = 0.75
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 64
+PREFIX_PENALTY = 0.7
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class ResourceSearchIndex:
+    def __init__(self, resources_by_category: Dict[str, List[dict]]):
+        self.documents: List[dict] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.vocabulary: List[str] = []
+        self._build(resources_by_category)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _build(self, resources_by_category):
+        field_tfs: List[Dict[str, float]] = []
+        lengths: List[float] = []
+
+        for category, resources in resources_by_category.items():
+            label = category.replace("_", " ").title()
+            for resource in resources:
+                tfs: Dict[str, float] = {}
+                length = 0.0
+                for field, boost in FIELD_BOOSTS.items():
+                    tokens = tokenize(resource.get(field, ""))
+                    if field == "url":
+                        tokens = [t for t in tokens if t not in URL_STOPWORDS]
+                    for token in tokens:
+                        tfs[token] = tfs.get(token, 0.0) + boost
+                    length += boost * len(tokens)
+                self.documents.append({**resource, "category": label})
+                field_tfs.append(tfs)
+                lengths.append(length)
+
+        n_docs = len(self.documents)
+        avg_length = (sum(lengths) / n_docs) if n_docs else 0.0
+
+        doc_freq: Dict[str, int] = {}
+        for tfs in field_tfs:
+            for term in tfs:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+
+        for doc_id, tfs in enumerate(field_tfs):
+            norm = K1 * (1 - B + B * lengths[doc_id] / avg_length) if avg_length else K1
+            for term, tf in tfs.items():
+                df = doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                weight = idf * tf * (K1 + 1) / (tf + norm)
+                self.postings.setdefault(term, {})[doc_id] = weight
+
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, token: str) -> Tuple[List[Tuple[str, float]], bool]:
+        """Indexed terms matched by a query token with their score factor, and whether prefix matches were capped."""
+        matches = []
+        if token in self.postings:
+            matches.append((token, 1.0))
+        if len(token) < MIN_PREFIX_LENGTH:
+            return matches, False
+
+        # Tokens are [a-z0-9], so "{" sorts after every term that starts with the prefix
+        start, end = bisect_left(self.vocabulary, token), bisect_left(self.vocabulary, token + "{")
+        terms = [term for term in self.vocabulary[start:end] if term != token]
+        truncated = len(terms) > MAX_PREFIX_EXPANSIONS
+        if truncated:
+            terms = heapq.nsmallest(MAX_PREFIX_EXPANSIONS, terms, key=lambda term: (-len(self.postings[term]), term))
+        matches.extend((term, PREFIX_PENALTY) for term in terms)
+        return matches, truncated
+
+    def _token_scores(self, token: str) -> Tuple[Dict[int, float], bool]:
+        expansions, truncated = self._expand(token)
+        if len(expansions) == 1 and expansions[0][1] == 1.0:
+            return self.postings[token], truncated
+
+        scores: Dict[int, float] = {}
+        for term, factor in expansions:
+            for doc_id, weight in self.postings[term].items():
+                weighted = weight * factor
+                if weighted > scores.get(doc_id, 0.0):
+                    scores[doc_id] = weighted
+        return scores, truncated
+
+    def search(self, query: str, limit: int = 50, offset: int = 0) -> Tuple[List[dict], int, bool]:
+        """Return one page of ranked results, the total number of matches, and whether a prefix was truncated.
+
+        Every query token has to match (directly or as a prefix). Ties are
+        broken by catalog order so paging is stable. When truncated is true,
+        the total counts only the matches of the expanded terms.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return [], 0, False
+
+        expanded = [self._token_scores(token) for token in tokens]
+        truncated = any(token_truncated for _, token_truncated in expanded)
+        per_token = sorted((scores for scores, _ in expanded), key=len)
+        if not per_token[0]:
+            return [], 0, truncated
+
+        smallest, rest = per_token[0], per_token[1:]
+        scored: Dict[int, float] = {}
+        for doc_id, score in smallest.items():
+            for scores in rest:
+                other = scores.get(doc_id)
+                if other is None:
+                    break
+                score += other
+            else:
+                scored[doc_id] = score
+
+        page_end = offset + limit
+        ranked = heapq.nsmallest(page_end, scored.items(), key=lambda item: (-item[1], item[0]))
+        results = [
+            {**self.documents[doc_id], "score": round(score, 4)}
+            for doc_id, score in ranked[offset:page_end]
+        ]
+        return results, len(scored), truncated
+
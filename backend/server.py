@@ -1,18 +1,53 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Optional, List, Dict, Any
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
-import motor.motor_asyncio
+from functools import lru_cache
+from contextlib import asynccontextmanager
+import asyncio
 import os
+import secrets
 import uuid
 from pydantic import BaseModel
 
+from catalog_cache import CatalogCache
+from search_index import ResourceSearchIndex
+from principal_cache import PrincipalCache
+from password_pool import PasswordHasherPool
+from timeline_engine import TimelineEngine
+from progress_mask import (
+    WORD_MASK, steps_to_mask, mask_to_words, words_to_mask, word_position, has_step, popcount,
+    category_masks, mask_words_expression
+)
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from log_writer import BufferedLogWriter
+from db_indexes import ensure_indexes
+from mongo_pool import PoolMetrics, create_client
+from salary_index import SalaryIndex
+from salary_parser import parse_salary
+from job_import import FORMATS as JOB_IMPORT_FORMATS, ImportFormatError, JobImporter, parse_records
+from job_search import FacetCache, InvalidCursor, build_job_filter, find_page, upsert_jobs, LISTING_PROJECTION, SORT as JOB_SORT
+from request_profiler import ProfilingMiddleware, RequestProfiler
+from metrics import CONTENT_TYPE, CommandMetrics, HttpMetrics, MetricsMiddleware, MetricsRegistry, SharedMetrics
+from fast_json import FastJSONResponse, FastJSONRoute
+from dashboard_snapshot import DashboardSnapshots, check_snapshots, outdated_query, snapshot_delta
+from progress_events import ProgressBroker, create_backend as create_progress_events_backend
+from budget_scenarios import BudgetScenarioEngine, BudgetScenarioError
+from timeline_forecast import ForecastParameterError, TimelineForecaster
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_event()
+    yield
+    await shutdown_event()
+
 # CORS and Security Configuration
-app = FastAPI(title="RelocateMe API", description="Phoenix to Peak District Relocation Platform", version="2.6.0")
+app = FastAPI(title="RelocateMe API", description="Phoenix to Peak District Relocation Platform", version="2.6.0", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
 
 origins = [
     "http://localhost:3000",
@@ -29,22 +64,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling (PROFILE_ADMIN_TOKEN / PROFILE_SAMPLE_RATE), off by default
+request_profiler = RequestProfiler.from_env()
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+# Prometheus metrics, served on /metrics (summed over the gunicorn workers when METRICS_MULTIPROC_DIR is set)
+metrics_registry = MetricsRegistry()
+shared_metrics = SharedMetrics.from_env(metrics_registry)
+app.add_middleware(MetricsMiddleware, metrics=HttpMetrics(metrics_registry), streaming_routes=("/api/progress/events",))
+
 # Security
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Operator token (OPS_TOKEN, or PROFILE_ADMIN_TOKEN), sent as `Authorization: Bearer <token>` -
+# Prometheus sends it with `authorization: {credentials: ...}` in its scrape config
+OPS_TOKEN = os.environ.get("OPS_TOKEN") or os.environ.get("PROFILE_ADMIN_TOKEN") or None
+
+def ops_token_matches(credentials: Optional[HTTPAuthorizationCredentials]) -> bool:
+    return (OPS_TOKEN is not None and credentials is not None
+            and secrets.compare_digest(credentials.credentials.encode(), OPS_TOKEN.encode()))
 
-# MongoDB Connection
+async def require_ops_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Metrics and stats: open while no token is configured (they are not routed publicly)"""
+    if OPS_TOKEN is not None and not ops_token_matches(credentials):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+async def require_admin_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Writes to data every user shares: always need the ops token, and are off while none is configured"""
+    if OPS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Disabled: no OPS_TOKEN is configured")
+    if not ops_token_matches(credentials):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+# passlib and jose are imported on first use - together they are ~90ms of import time.
+# Pre-fork servers call load_auth_libraries() in the master so workers share them.
+@lru_cache(maxsize=None)
+def password_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def load_auth_libraries():
+    password_context()
+    import jose.jwt  # noqa: F401
+
+# Authenticated principal cache - saves the users lookup on every authenticated request
+principal_cache = PrincipalCache(
+    max_entries=int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+)
+
+# MongoDB Connection - the client is opened and closed by the app lifespan (see connect_to_mongo)
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
-db = client.relocateme
+mongo_pool_metrics = PoolMetrics()
+mongo_command_metrics = CommandMetrics(metrics_registry)
+client = None
+db = None
+
+def connect_to_mongo():
+    global client, db
+    if client is None:
+        client = create_client(MONGO_URL, mongo_pool_metrics, mongo_command_metrics)
+        db = client.relocateme
+        progress_log_writer.collection = db.progress_logs
+    return db
+
+def close_mongo_connection():
+    global client, db
+    if client is not None:
+        client.close()
+        client, db = None, None
+
+# Progress logs are written behind the request in batches
+progress_log_writer = BufferedLogWriter(
+    None,
+    batch_size=int(os.environ.get("PROGRESS_LOG_BATCH_SIZE", "100")),
+    flush_interval=float(os.environ.get("PROGRESS_LOG_FLUSH_SECONDS", "1.0")),
+    max_queue=int(os.environ.get("PROGRESS_LOG_MAX_QUEUE", "10000")),
+    max_retries=int(os.environ.get("PROGRESS_LOG_MAX_RETRIES", "3")),
+)
+
+# Progress deltas pushed to /api/progress/events streams (see progress_events.py)
+progress_events = ProgressBroker.from_env()
+# Principals cached by other workers are dropped through the same relay as the progress events
+progress_events.on_invalidate("principal", principal_cache.invalidate)
 
 # Create API router with the /api prefix
 from fastapi import APIRouter
-api_router = APIRouter(prefix="/api")
+# Handlers' return values are encoded with orjson directly, see fast_json.py
+api_router = APIRouter(prefix="/api", route_class=FastJSONRoute)
 
 # Add a simple root endpoint
 @api_router.get("/")
@@ -59,8 +171,20 @@ class User(BaseModel):
     hashed_password: str
     current_step: int = 1
     completed_steps: List[int] = []
+    completed_mask: List[int] = []  # bitset of completed_steps, see progress_mask.py
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    dashboard: Optional[Dict[str, Any]] = Field(default=None, exclude=True)  # progress snapshot, see dashboard_snapshot.py
+    _progress_mask: Optional[int] = PrivateAttr(default=None)
+
+    def progress_mask(self) -> int:
+        """Completed steps as an int bitset (falls back to the list for unmigrated users)"""
+        if self._progress_mask is None:
+            if self.completed_mask or not self.completed_steps:
+                self._progress_mask = words_to_mask(self.completed_mask)
+            else:
+                self._progress_mask = steps_to_mask(self.completed_steps)
+        return self._progress_mask
 
 class UserLogin(BaseModel):
     username: str
@@ -92,6 +216,7 @@ class JobListing(BaseModel):
     posted_date: str
     application_url: str
     contact_email: Optional[str] = None
+    visa_support: bool = False  # employer sponsors a UK work visa
 
 class VisaRequirement(BaseModel):
     visa_type: str
@@ -108,6 +233,9 @@ class TimelineProgressUpdate(BaseModel):
     completed: bool
     notes: Optional[str] = None
 
+class TimelineProgressBatch(BaseModel):
+    updates: List[TimelineProgressUpdate]
+
 class ProgressItem(BaseModel):
     id: str
     title: str
@@ -128,6 +256,35 @@ class BudgetAnalysis(BaseModel):
     emergency_fund: float = 50000.0
     remaining_budget: float = 195000.0
 
+class BudgetScenarioRequest(BaseModel):
+    scenarios: int = Field(10000, ge=1, le=100000)
+    seed: Optional[int] = None  # random when omitted; echoed back so a run can be reproduced
+    budget_levels: List[float] = Field(default_factory=lambda: [400000.0], min_length=1, max_length=20)
+    category_weights: Optional[Dict[str, float]] = None  # moving/visa/housing/living/emergency share of the budget
+    fx_rate: Optional[float] = Field(None, gt=0)  # USD per GBP; defaults to REFERENCE_USD_PER_GBP
+    fx_volatility: float = Field(0.08, ge=0, le=1)
+    fx_rates: Optional[List[float]] = Field(None, max_length=10000)  # sampled instead of fx_rate/fx_volatility
+    step_costs: Dict[int, float] = {}  # absolute cost per timeline step, in its line's currency
+    cost_uncertainty: float = Field(0.15, ge=0, le=2)
+    percentiles: List[float] = Field(default_factory=lambda: [5, 25, 50, 75, 95], min_length=1, max_length=11)
+    interval_days: int = Field(30, ge=1, le=365)
+
+class DurationDistribution(BaseModel):
+    # Multipliers of a step's estimated_days; which fields apply depends on the distribution
+    distribution: str = "triangular"  # triangular, lognormal, uniform or fixed
+    low: float = Field(0.8, gt=0)
+    mode: float = Field(1.0, gt=0)
+    high: float = Field(1.5, gt=0)
+    sigma: float = Field(0.3, ge=0, le=3)
+
+class TimelineForecastRequest(BaseModel):
+    simulations: int = Field(10000, ge=100, le=100000)
+    seed: int = 0  # fixed by default so repeated views hit the forecast cache
+    default: DurationDistribution = Field(default_factory=DurationDistribution)
+    categories: Dict[str, DurationDistribution] = {}
+    steps: Dict[int, DurationDistribution] = {}
+    percentiles: List[float] = Field(default_factory=lambda: [50, 80, 95], min_length=1, max_length=11)
+
 # Enhanced Sample Jobs - Focus on Hospitality/Waitressing
 SAMPLE_JOBS = [
     {
@@ -427,6 +584,17 @@ RELOCATION_TIMELINE = [
     {"id": 39, "title": "Enjoy your new life in Peak District", "description": "Celebrate successful relocation and embrace your new lifestyle", "category": "UK Integration", "estimated_days": 365, "dependencies": [38], "resources": ["Lifestyle Guides", "Local Recommendations"], "is_completed": False}
 ]
 
+timeline_engine = TimelineEngine(RELOCATION_TIMELINE)
+CATEGORY_MASKS = category_masks(RELOCATION_TIMELINE)
+ALL_STEPS_MASK = steps_to_mask(step["id"] for step in RELOCATION_TIMELINE)
+MASK_WORDS = len(mask_to_words(ALL_STEPS_MASK))
+URGENT_STEPS_MASK = CATEGORY_MASKS.get("Visa & Legal", 0) | CATEGORY_MASKS.get("Employment", 0)
+
+# Monte Carlo completion forecasts, cached per (completed mask, parameters) (see timeline_forecast.py)
+timeline_forecaster = TimelineForecaster(
+    timeline_engine, max_entries=int(os.environ.get("TIMELINE_FORECAST_CACHE_MAX_ENTRIES", "256"))
+)
+
 # Enhanced Budget Calculator for $400k
 def calculate_relocation_budget(total_budget: float = 400000.0) -> BudgetAnalysis:
     """Calculate comprehensive budget breakdown for $400k relocation"""
@@ -448,24 +616,70 @@ def calculate_relocation_budget(total_budget: float = 400000.0) -> BudgetAnalysi
         remaining_budget=remaining_budget
     )
 
+# What-if runs over the budget (see budget_scenarios.py): each line is spread over the timeline steps of
+# its categories. Moving is paid from the US; the other lines are paid in the UK in GBP.
+REFERENCE_USD_PER_GBP = 1.27
+BUDGET_LINE_BY_CATEGORY = {
+    "Planning": "living",
+    "US Exit": "moving",
+    "Logistics": "moving",
+    "Travel": "moving",
+    "Visa & Legal": "visa",
+    "Documentation": "visa",
+    "Housing": "housing",
+    "UK Settlement": "housing",
+    "UK Registration": "living",
+    "UK Integration": "living",
+    "Financial": "living",
+}
+BUDGET_LINE_CURRENCY = {"moving": "USD", "visa": "GBP", "housing": "GBP", "living": "GBP", "emergency": "GBP"}
+
+def default_budget_weights() -> Dict[str, float]:
+    shares = calculate_relocation_budget(1.0)
+    return {
+        "moving": shares.moving_costs,
+        "visa": shares.visa_fees,
+        "housing": shares.initial_housing,
+        "living": shares.living_expenses,
+        "emergency": shares.emergency_fund,
+    }
+
+budget_scenarios = BudgetScenarioEngine(
+    RELOCATION_TIMELINE, BUDGET_LINE_BY_CATEGORY, BUDGET_LINE_CURRENCY, default_budget_weights(), REFERENCE_USD_PER_GBP
+)
+
+# Per-user progress figures, maintained on every progress write (see dashboard_snapshot.py)
+dashboard_snapshots = DashboardSnapshots(
+    timeline_engine, CATEGORY_MASKS, URGENT_STEPS_MASK, MASK_WORDS, calculate_relocation_budget().total_budget
+)
+
 # Authentication functions
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_context().hash(password)
+
+# bcrypt runs on a bounded thread pool so logins don't block the event loop
+password_hasher = PasswordHasherPool(
+    get_password_hash,
+    verify_password,
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    from jose import JWTError, jwt
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -476,42 +690,69 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-    except jwt.PyJWTError:
+    except JWTError:
         raise credentials_exception
     
+    issued_at = payload.get("iat")
+    cached_user = principal_cache.get(username, issued_at)
+    if cached_user is not None:
+        return cached_user
+    
+    version = principal_cache.version()
     user = await db.users.find_one({"username": username})
     if user is None:
         raise credentials_exception
-    return User(**user)
+    current_user = User(**user)
+    principal_cache.put(username, issued_at, current_user, version)
+    return current_user
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """The current user when a bearer token is sent, None for anonymous requests"""
+    if credentials is None:
+        return None
+    return await get_current_user(credentials)
 
 # Initialize default user on startup
 async def create_default_user():
     existing_user = await db.users.find_one({"username": "relocate_user"})
     if not existing_user:
-        hashed_password = get_password_hash("SecurePass2025!")
+        hashed_password = await password_hasher.hash("SecurePass2025!")
         default_user = User(
             username="relocate_user",
             email="relocate@example.com",
             hashed_password=hashed_password,
             current_step=1,
-            completed_steps=[]  # Start with no completed steps
+            completed_steps=[],  # Start with no completed steps
+            completed_mask=mask_to_words(0, MASK_WORDS)
+        )
+        # Upsert so two processes starting together cannot both insert the user
+        result = await db.users.update_one(
+            {"username": "relocate_user"},
+            {"$setOnInsert": {**default_user.dict(), "dashboard": dashboard_snapshots.build(0)}},
+            upsert=True
         )
-        await db.users.insert_one(default_user.dict())
-        print("Default user created successfully")
+        if result.upserted_id is not None:
+            print("Default user created successfully")
 
 @api_router.post("/analytics/reset")
 async def reset_analytics(current_user: User = Depends(get_current_user)):
     """Reset all user progress and analytics to clean state"""
+    reset_snapshot = dashboard_snapshots.build(0, key=current_user.id)
     # Reset user progress
     await db.users.update_one(
         {"username": current_user.username},
         {"$set": {
             "completed_steps": [],
-            "current_step": 1
+            "completed_mask": mask_to_words(0, MASK_WORDS),
+            "current_step": 1,
+            "dashboard": reset_snapshot
         }}
     )
+    await progress_events.invalidate("principal", current_user.username)
+    await progress_events.publish(current_user.id, snapshot_delta(None, reset_snapshot))
     
-    # Clear progress logs
+    # Clear progress logs - including any still waiting in the write buffer
+    await progress_log_writer.drain()
     await db.progress_logs.delete_many({"user_id": current_user.id})
     
     return {
@@ -521,6 +762,29 @@ async def reset_analytics(current_user: User = Depends(get_current_user)):
         "current_phase": "Planning"
     }
 
+async def migrate_progress_masks():
+    """Backfill completed_mask for users stored before the bitset was introduced"""
+    migrated = 0
+    # Progress updates flip bits in place, so every user needs all MASK_WORDS words present
+    needs_migration = {"$or": [
+        {"completed_mask": {"$exists": False}},
+        {f"completed_mask.{MASK_WORDS - 1}": {"$exists": False}}
+    ]}
+    async for user in db.users.find(needs_migration, {"username": 1, "completed_steps": 1}):
+        await db.users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"completed_mask": mask_to_words(steps_to_mask(user.get("completed_steps", [])), MASK_WORDS)}}
+        )
+        migrated += 1
+    if migrated:
+        print(f"Migrated progress masks for {migrated} users")
+
+async def rebuild_dashboard_snapshots():
+    """Build dashboard snapshots for users stored without one (or with an older snapshot version)"""
+    report = await check_snapshots(db.users, dashboard_snapshots, rebuild=True, query=outdated_query())
+    if report["rebuilt"]:
+        print(f"Rebuilt dashboard snapshots for {report['rebuilt']} users")
+
 # Password reset endpoints
 @api_router.post("/auth/reset-password")
 async def request_password_reset(reset_request: PasswordReset):
@@ -544,10 +808,10 @@ async def request_password_reset(reset_request: PasswordReset):
 
 @api_router.post("/auth/complete-password-reset")
 async def complete_password_reset(reset_data: PasswordResetComplete):
-    reset_record = await db.password_resets.find_one({
-        "username": reset_data.username,
-        "reset_code": reset_data.reset_code
-    })
+    reset_record = await db.password_resets.find_one(
+        {"username": reset_data.username, "reset_code": reset_data.reset_code},
+        sort=[("expires_at", -1)]
+    )
     
     if not reset_record:
         raise HTTPException(
@@ -555,18 +819,19 @@ async def complete_password_reset(reset_data: PasswordResetComplete):
             detail="Invalid reset code"
         )
     
+    # Expired records are purged by the TTL index, but the monitor only runs about once a minute
     if datetime.utcnow() > reset_record["expires_at"]:
-        await db.password_resets.delete_one({"_id": reset_record["_id"]})
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Reset code has expired"
         )
     
-    hashed_password = get_password_hash(reset_data.new_password)
+    hashed_password = await password_hasher.hash(reset_data.new_password)
     await db.users.update_one(
         {"username": reset_data.username},
         {"$set": {"hashed_password": hashed_password}}
     )
+    await progress_events.invalidate("principal", reset_data.username)
     
     await db.password_resets.delete_one({"_id": reset_record["_id"]})
     return {"message": "Password reset successfully"}
@@ -574,7 +839,7 @@ async def complete_password_reset(reset_data: PasswordResetComplete):
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_credentials: UserLogin):
     user = await db.users.find_one({"username": user_credentials.username})
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await password_hasher.verify(user_credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -594,22 +859,17 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 @api_router.get("/analytics/budget")
 async def get_budget_analysis(current_user: User = Depends(get_current_user)):
     budget_breakdown = calculate_relocation_budget()
+    snapshot = dashboard_snapshots.for_user(current_user)
     
-    # Calculate progress-based spending
-    completed_steps = len(current_user.completed_steps)
-    total_steps = len(RELOCATION_TIMELINE)
-    progress_percentage = (completed_steps / total_steps) * 100
-    
-    estimated_spent = budget_breakdown.total_budget * (completed_steps / total_steps) * 0.6  # 60% of progress spent
-    
+    # Progress-based spending (60% of progress spent) comes from the dashboard snapshot
     return {
         "budget_analysis": budget_breakdown.dict(),
         "progress_spending": {
-            "completed_steps": completed_steps,
-            "total_steps": total_steps,
-            "progress_percentage": progress_percentage,
-            "estimated_spent": estimated_spent,
-            "remaining_budget": budget_breakdown.total_budget - estimated_spent
+            "completed_steps": snapshot["completed_steps"],
+            "total_steps": snapshot["total_steps"],
+            "progress_percentage": snapshot["completion_percentage"],
+            "estimated_spent": snapshot["estimated_spent"],
+            "remaining_budget": snapshot["remaining_budget"]
         },
         "spending_recommendations": {
             "next_phase_budget": budget_breakdown.total_budget * 0.15,  # 15% for next phase
@@ -622,40 +882,51 @@ async def get_budget_analysis(current_user: User = Depends(get_current_user)):
         }
     }
 
+@api_router.post("/analytics/budget/scenarios")
+async def run_budget_scenarios(request: BudgetScenarioRequest, current_user: User = Depends(get_current_user)):
+    """Percentile bands of cost and cash flow over simulated budget, FX and cost scenarios"""
+    state = timeline_engine.state_for_mask(current_user.progress_mask(), key=current_user.id)
+    # The keyed state is updated in place by this user's other requests: hand the thread copies
+    completed = frozenset(state.completed)
+    finish_days = dict(state.projection()["finish_days"])
+    seed = request.seed if request.seed is not None else int.from_bytes(os.urandom(4), "little")
+    try:
+        # Tens of milliseconds of numpy for 10k scenarios: keep it off the event loop
+        return await asyncio.to_thread(
+            budget_scenarios.run,
+            finish_days,
+            completed,
+            budget_levels=request.budget_levels,
+            scenarios=request.scenarios,
+            seed=seed,
+            category_weights=request.category_weights,
+            fx_rate=request.fx_rate,
+            fx_volatility=request.fx_volatility,
+            fx_rates=request.fx_rates,
+            step_costs=request.step_costs,
+            cost_uncertainty=request.cost_uncertainty,
+            percentiles=request.percentiles,
+            interval_days=request.interval_days,
+            start_date=datetime.utcnow().date(),
+        )
+    except BudgetScenarioError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
 @api_router.get("/analytics/overview")  
 async def get_analytics_overview(current_user: User = Depends(get_current_user)):
-    completed_steps = len(current_user.completed_steps)
-    total_steps = len(RELOCATION_TIMELINE)
-    
-    # Calculate category progress
-    category_progress = {}
-    for step in RELOCATION_TIMELINE:
-        category = step["category"]
-        if category not in category_progress:
-            category_progress[category] = {"total": 0, "completed": 0}
-        category_progress[category]["total"] += 1
-        if step["id"] in current_user.completed_steps:
-            category_progress[category]["completed"] += 1
-    
-    # Add completion percentages
-    for category in category_progress:
-        if category_progress[category]["total"] > 0:
-            category_progress[category]["percentage"] = (
-                category_progress[category]["completed"] / category_progress[category]["total"] * 100
-            )
-        else:
-            category_progress[category]["percentage"] = 0
-    
+    snapshot = dashboard_snapshots.for_user(current_user)
     budget_analysis = calculate_relocation_budget()
+    salary_index.refresh_if_stale(db.jobs)
+    salary_stats = salary_index.stats()
     
     return {
         "user_progress": {
-            "completed_steps": completed_steps,
-            "total_steps": total_steps,
-            "completion_percentage": (completed_steps / total_steps) * 100,
-            "current_phase": get_current_phase(current_user.completed_steps)
+            "completed_steps": snapshot["completed_steps"],
+            "total_steps": snapshot["total_steps"],
+            "completion_percentage": snapshot["completion_percentage"],
+            "current_phase": snapshot["current_phase"]
         },
-        "category_breakdown": category_progress,
+        "category_breakdown": snapshot["categories"],
         "budget_overview": {
             "total_budget": budget_analysis.total_budget,
             "allocated_funds": {
@@ -668,56 +939,172 @@ async def get_analytics_overview(current_user: User = Depends(get_current_user))
             "available_for_investment": budget_analysis.remaining_budget
         },
         "hospitality_focus": {
-            "jobs_available": len([j for j in SAMPLE_JOBS if "Hospitality" in j["category"]]),
-            "salary_range": "£18,000 - £35,000",
+            "jobs_available": await count_hospitality_jobs(),
+            # Lowest and highest salary midpoints of the GBP listings
+            "salary_range": (f"{format_salary(salary_stats['min'])} - {format_salary(salary_stats['max'])}"
+                             if salary_stats["count"] else None),
             "peak_district_opportunities": 8
         }
     }
 
 # Job listings endpoints - Enhanced for hospitality
+# Listings live in the jobs collection (seeded from SAMPLE_JOBS, see job_search.py)
+job_facet_cache = FacetCache(
+    max_entries=int(os.environ.get("JOB_FACET_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.environ.get("JOB_FACET_CACHE_TTL_SECONDS", "30")),
+)
+
+async def count_hospitality_jobs():
+    """Hospitality listing count for the dashboards, from the facet cache rather than a count per poll"""
+    return (await job_facet_cache.get(db.jobs, {"is_hospitality": True}))["total"]
+
+# Sorted salary midpoints for stats, percentiles and histograms (see salary_index.py)
+salary_index = SalaryIndex(refresh_seconds=float(os.environ.get("SALARY_INDEX_REFRESH_SECONDS", "60")))
+
+def forget_job_aggregates(key=None):
+    """Listings changed, in this worker or another: recount facets and reload salary stats"""
+    job_facet_cache.invalidate()
+    salary_index.refresh_if_stale(db.jobs, force=True)
+
+progress_events.on_invalidate("jobs", forget_job_aggregates)
+
+async def seed_sample_jobs():
+    await upsert_jobs(db.jobs, (JobListing(**job).dict() for job in SAMPLE_JOBS), salary_index)
+    job_facet_cache.invalidate()
+
+def format_salary(amount: Optional[float]) -> Optional[str]:
+    return f"£{amount:,.0f}" if amount is not None else None
+
 @api_router.get("/jobs/listings")
-async def get_job_listings(category: Optional[str] = None, job_type: Optional[str] = None):
-    jobs = []
-    for job_data in SAMPLE_JOBS:
-        job = JobListing(**job_data)
-        if category and job.category != category:
-            continue
-        if job_type and job.job_type != job_type:
-            continue
-        jobs.append(job.dict())
+async def get_job_listings(
+    category: Optional[str] = None,
+    job_type: Optional[str] = None,
+    location: Optional[str] = None,
+    visa_support: Optional[bool] = None,
+    min_salary: Optional[float] = Query(None, ge=0),
+    max_salary: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    query = build_job_filter(category, job_type, location, visa_support, min_salary, max_salary)
+    try:
+        (jobs, next_cursor), counts = await asyncio.gather(
+            find_page(db.jobs, query, limit, cursor),
+            job_facet_cache.get(db.jobs, query),
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    facets = counts["facets"]
+    salary_index.refresh_if_stale(db.jobs)
     
     return {
         "jobs": jobs,
-        "total": len(jobs),
-        "categories": list(set([job["category"] for job in [JobListing(**j).dict() for j in SAMPLE_JOBS]])),
-        "job_types": list(set([job["job_type"] for job in [JobListing(**j).dict() for j in SAMPLE_JOBS]])),
+        "total": counts["total"],
+        "next_cursor": next_cursor,
+        "facets": facets,
+        "categories": [bucket["value"] for bucket in facets["category"]],
+        "job_types": [bucket["value"] for bucket in facets["job_type"]],
         "hospitality_focus": {
-            "total_hospitality_jobs": len([j for j in jobs if "Hospitality" in j.get("category", "")]),
-            "average_salary": "£23,500",
+            "total_hospitality_jobs": sum(bucket["count"] for bucket in facets["category"] if "Hospitality" in bucket["value"]),
+            "average_salary": format_salary(salary_index.average()),
             "peak_district_locations": ["Rowsley", "Chatsworth", "Edale", "Baslow", "Bakewell", "Beeley", "Castleton"]
         }
     }
 
+@api_router.get("/jobs/salary-stats")
+async def get_salary_stats(
+    bucket_width: float = Query(2000, ge=100),
+    min_salary: Optional[float] = Query(None, ge=0),
+    max_salary: Optional[float] = Query(None, ge=0)
+):
+    if min_salary is not None and max_salary is not None and min_salary > max_salary:
+        raise HTTPException(status_code=400, detail="min_salary must not exceed max_salary")
+    salary_index.refresh_if_stale(db.jobs)
+    try:
+        histogram = salary_index.histogram(bucket_width, min_salary, max_salary)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Too many histogram buckets: {exc}")
+    return {
+        "stats": salary_index.stats(),
+        "in_range": salary_index.count_between(min_salary, max_salary),
+        "histogram": histogram
+    }
+
+# Bulk import - streams the request body through job_import.JobImporter
+JOB_IMPORT_BATCH_SIZE = int(os.environ.get("JOB_IMPORT_BATCH_SIZE", "1000"))
+
+async def record_import_progress(import_id: str, progress, status_value: str = "running"):
+    await db.job_imports.update_one(
+        {"import_id": import_id},
+        {"$set": {**progress.to_dict(), "status": status_value, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+@api_router.post("/jobs/import")
+async def import_jobs(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format"),
+    import_id: Optional[str] = None,
+    _: None = Depends(require_admin_token)
+):
+    """Import an NDJSON or CSV feed into the shared listings (ops token only); poll /jobs/imports/{import_id} while it runs"""
+    if file_format is None:
+        file_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if file_format not in JOB_IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(JOB_IMPORT_FORMATS)}")
+    import_id = import_id or str(uuid.uuid4())
+    
+    importer = JobImporter(
+        db.jobs,
+        JobListing,
+        batch_size=JOB_IMPORT_BATCH_SIZE,
+        salary_index=salary_index,
+        on_progress=lambda progress: record_import_progress(import_id, progress),
+    )
+    try:
+        await importer.run(parse_records(request.stream(), file_format))
+    except ImportFormatError as exc:
+        importer.progress.failure = str(exc)
+        await record_import_progress(import_id, importer.progress, "failed")
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        # Never leave the record "running": pollers would wait on it forever
+        importer.progress.failure = importer.progress.failure or f"{type(exc).__name__}: {exc}"
+        await record_import_progress(import_id, importer.progress, "failed")
+        if isinstance(exc, BulkWriteError):
+            raise HTTPException(status_code=500, detail=f"Import {import_id} failed: {importer.progress.failure}")
+        raise
+    finally:
+        await progress_events.invalidate("jobs")
+    await record_import_progress(import_id, importer.progress, "completed")
+    
+    return {"import_id": import_id, "status": "completed", **importer.progress.to_dict()}
+
+@api_router.get("/jobs/imports/{import_id}")
+async def get_job_import(import_id: str, _: None = Depends(require_admin_token)):
+    job_import = await db.job_imports.find_one({"import_id": import_id}, {"_id": 0})
+    if job_import is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job_import
+
 @api_router.get("/jobs/featured")
 async def get_featured_jobs():
     # Return top hospitality jobs first
-    featured = sorted(SAMPLE_JOBS, key=lambda x: ("Hospitality" in x["category"], x["posted_date"]), reverse=True)[:6]
-    return {"featured_jobs": [JobListing(**job).dict() for job in featured]}
+    featured = await db.jobs.find({}, LISTING_PROJECTION).sort([("is_hospitality", -1), ("posted_date", -1)]).limit(6).to_list(length=6)
+    return {"featured_jobs": featured}
 
 @api_router.get("/jobs/categories")
-async def get_job_categories():
-    categories = {}
-    for job_data in SAMPLE_JOBS:
-        job = JobListing(**job_data)
-        if job.category not in categories:
-            categories[job.category] = []
-        categories[job.category].append(job.dict())
-    
-    return categories
+async def get_job_categories(limit_per_category: int = Query(50, ge=1, le=500)):
+    # One index-backed query per category (there are only a handful), newest first
+    names = sorted(await db.jobs.distinct("category"))
+    pages = await asyncio.gather(*(
+        db.jobs.find({"category": name}, LISTING_PROJECTION).sort(JOB_SORT).to_list(length=limit_per_category)
+        for name in names
+    ))
+    return dict(zip(names, pages))
 
 # Visa requirements endpoints
-@api_router.get("/visa/requirements")
-async def get_visa_requirements():
+def build_visa_requirements():
     return {"visa_types": [VisaRequirement(**req).dict() for req in VISA_REQUIREMENTS]}
 
 @api_router.get("/visa/requirements/{visa_type}")
@@ -727,8 +1114,7 @@ async def get_visa_requirement_details(visa_type: str):
             return VisaRequirement(**req).dict()
     raise HTTPException(status_code=404, detail="Visa type not found")
 
-@api_router.get("/visa/checklist")
-async def get_visa_checklist():
+def build_visa_checklist():
     return {
         "general_documents": [
             "Valid passport (6+ months remaining)",
@@ -761,11 +1147,12 @@ async def get_visa_checklist():
 @api_router.get("/timeline/full")
 async def get_full_timeline(current_user: User = Depends(get_current_user)):
     user_completed_steps = current_user.completed_steps
+    completed_mask = current_user.progress_mask()
     timeline_with_status = []
     
     for step in RELOCATION_TIMELINE:
         step_copy = step.copy()
-        step_copy["is_completed"] = step["id"] in user_completed_steps
+        step_copy["is_completed"] = has_step(completed_mask, step["id"])
         timeline_with_status.append(step_copy)
     
     return {
@@ -773,7 +1160,7 @@ async def get_full_timeline(current_user: User = Depends(get_current_user)):
         "total_steps": len(RELOCATION_TIMELINE),
         "completed_steps": len(user_completed_steps),
         "completion_percentage": (len(user_completed_steps) / len(RELOCATION_TIMELINE)) * 100,
-        "current_phase": get_current_phase(user_completed_steps),
+        "current_phase": get_current_phase(completed_mask, current_user.id),
         "budget_for_phase": calculate_relocation_budget().total_budget / 8  # Budget per phase
     }
 
@@ -797,53 +1184,78 @@ async def get_public_timeline():
 
 @api_router.get("/timeline/by-category")
 async def get_timeline_by_category(current_user: User = Depends(get_current_user)):
-    user_completed_steps = current_user.completed_steps
+    completed_mask = current_user.progress_mask()
+    snapshot = dashboard_snapshots.for_user(current_user)
     categories = {}
     
+    for category, counts in snapshot["categories"].items():
+        categories[category] = {
+            "name": category,
+            "steps": [],
+            "total_steps": counts["total"],
+            "completed_steps": counts["completed"]
+        }
+    
     for step in RELOCATION_TIMELINE:
-        category = step["category"]
-        if category not in categories:
-            categories[category] = {
-                "name": category,
-                "steps": [],
-                "total_steps": 0,
-                "completed_steps": 0
-            }
-        
         step_copy = step.copy()
-        step_copy["is_completed"] = step["id"] in user_completed_steps
-        categories[category]["steps"].append(step_copy)
-        categories[category]["total_steps"] += 1
-        
-        if step["id"] in user_completed_steps:
-            categories[category]["completed_steps"] += 1
+        step_copy["is_completed"] = has_step(completed_mask, step["id"])
+        categories[step["category"]]["steps"].append(step_copy)
     
-    # Calculate completion percentage for each category
     for category in categories.values():
-        if category["total_steps"] > 0:
-            category["completion_percentage"] = (category["completed_steps"] / category["total_steps"]) * 100
-        else:
-            category["completion_percentage"] = 0
+        category["completion_percentage"] = snapshot["categories"][category["name"]]["percentage"]
     
     return categories
 
+def step_progress_update(step_id, completed):
+    """Atomic update document that adds or removes one step from both the list and the mask"""
+    word, bit = word_position(step_id)
+    if completed:
+        return {
+            "$addToSet": {"completed_steps": step_id},
+            "$bit": {f"completed_mask.{word}": {"or": 1 << bit}}
+        }
+    return {
+        "$pull": {"completed_steps": step_id},
+        "$bit": {f"completed_mask.{word}": {"and": WORD_MASK ^ (1 << bit)}}
+    }
+
+def ensure_timeline_step(step_id):
+    if step_id not in timeline_engine.steps:
+        raise HTTPException(status_code=404, detail=f"Timeline step {step_id} not found")
+
+# What a progress write needs back to advance the user's dashboard snapshot
+PROGRESS_WRITE_PROJECTION = {"id": 1, "completed_steps": 1, "completed_mask": 1, "dashboard": 1}
+
+async def store_progress_snapshot(username, updated_user):
+    """Bring the dashboard snapshot in line with a progress write, drop the cached principals and publish the change"""
+    try:
+        if updated_user is None:
+            return
+        snapshot = await dashboard_snapshots.store(db.users, updated_user)
+    finally:
+        await progress_events.invalidate("principal", username)
+    event = snapshot_delta(updated_user.get("dashboard"), snapshot)
+    if event["type"] == "snapshot" or event["steps"]:
+        await progress_events.publish(updated_user["id"], event)
+
+async def apply_step_progress(username, step_id, completed):
+    """Apply one step change server-side and return the user's completed steps afterwards"""
+    updated_user = await db.users.find_one_and_update(
+        {"username": username},
+        step_progress_update(step_id, completed),
+        projection=PROGRESS_WRITE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    await store_progress_snapshot(username, updated_user)
+    return (updated_user or {}).get("completed_steps", [])
+
 @api_router.post("/timeline/update-progress")
 async def update_step_progress(progress: TimelineProgressUpdate, current_user: User = Depends(get_current_user)):
-    user_completed_steps = current_user.completed_steps.copy()
-    
-    if progress.completed and progress.step_id not in user_completed_steps:
-        user_completed_steps.append(progress.step_id)
-    elif not progress.completed and progress.step_id in user_completed_steps:
-        user_completed_steps.remove(progress.step_id)
-    
-    # Update user in database
-    await db.users.update_one(
-        {"username": current_user.username},
-        {"$set": {"completed_steps": user_completed_steps}}
-    )
+    ensure_timeline_step(progress.step_id)
+    user_completed_steps = await apply_step_progress(current_user.username, progress.step_id, progress.completed)
     
     # Log progress update
-    await db.progress_logs.insert_one({
+    await progress_log_writer.enqueue({
         "user_id": current_user.id,
         "step_id": progress.step_id,
         "completed": progress.completed,
@@ -857,34 +1269,138 @@ async def update_step_progress(progress: TimelineProgressUpdate, current_user: U
         "completion_percentage": (len(user_completed_steps) / len(RELOCATION_TIMELINE)) * 100
     }
 
-def get_current_phase(completed_steps):
-    """Determine current phase based on completed steps"""
-    if not completed_steps:
-        return "Planning"
+@api_router.post("/timeline/update-progress/batch")
+async def update_step_progress_batch(batch: TimelineProgressBatch, current_user: User = Depends(get_current_user)):
+    """Apply many step changes in one atomic write - the last change for a step wins"""
+    final_state = {}
+    for progress in batch.updates:
+        ensure_timeline_step(progress.step_id)
+        final_state[progress.step_id] = progress.completed
     
-    max_completed = max(completed_steps)
+    added = [step_id for step_id, completed in final_state.items() if completed]
+    removed = [step_id for step_id, completed in final_state.items() if not completed]
     
-    if max_completed <= 5:
-        return "Planning"
-    elif max_completed <= 11:
-        return "Visa & Legal"
-    elif max_completed <= 18:
-        return "Employment"
-    elif max_completed <= 23:
-        return "Housing"
-    elif max_completed <= 28:
-        return "Financial"
-    elif max_completed <= 33:
-        return "Logistics"
-    elif max_completed <= 36:
-        return "US Exit"
-    elif max_completed <= 39:
-        return "UK Arrival"
-    else:
-        return "Settlement"
+    # $addToSet and $pull can't touch the same array in one update, so use a pipeline update
+    updated_user = await db.users.find_one_and_update(
+        {"username": current_user.username},
+        [
+            {"$set": {"completed_steps": {"$setUnion": [
+                {"$setDifference": [{"$ifNull": ["$completed_steps", []]}, removed]},
+                added
+            ]}}},
+            {"$set": {"completed_mask": mask_words_expression("$completed_steps", MASK_WORDS)}}
+        ],
+        projection=PROGRESS_WRITE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    await store_progress_snapshot(current_user.username, updated_user)
+    user_completed_steps = (updated_user or {}).get("completed_steps", [])
+    
+    if batch.updates:
+        now = datetime.utcnow()
+        await progress_log_writer.enqueue_many([{
+            "user_id": current_user.id,
+            "step_id": progress.step_id,
+            "completed": progress.completed,
+            "notes": progress.notes,
+            "timestamp": now
+        } for progress in batch.updates])
+    
+    return {
+        "message": "Progress updated successfully",
+        "applied": len(final_state),
+        "total_completed": len(user_completed_steps),
+        "completion_percentage": (len(user_completed_steps) / len(RELOCATION_TIMELINE)) * 100
+    }
 
-@api_router.get("/jobs/search-platforms")
-async def get_job_search_platforms():
+def get_current_phase(completed_mask, user_key=None):
+    """Determine current phase - category of the earliest step not yet completed"""
+    return timeline_engine.state_for_mask(completed_mask, key=user_key).current_phase
+
+def timeline_step_summary(step_id):
+    step = timeline_engine.steps[step_id]
+    return {
+        "id": step_id,
+        "title": step["title"],
+        "category": step["category"],
+        "estimated_days": step["estimated_days"],
+        "dependencies": step["dependencies"],
+        "critical_path_days": timeline_engine.tail_days[step_id]
+    }
+
+@api_router.get("/timeline/next-actions")
+async def get_timeline_next_actions(current_user: User = Depends(get_current_user), limit: int = Query(5, ge=1, le=50)):
+    """Steps whose dependencies are all completed, most critical first"""
+    state = timeline_engine.state_for_mask(current_user.progress_mask(), key=current_user.id)
+    next_actions = state.next_actions()
+    
+    return {
+        "next_actions": [timeline_step_summary(step_id) for step_id in next_actions[:limit]],
+        "unblocked_count": len(next_actions),
+        "blocked_count": len(RELOCATION_TIMELINE) - len(state.completed) - len(next_actions),
+        "current_phase": state.current_phase
+    }
+
+@api_router.get("/timeline/projection")
+async def get_timeline_projection(current_user: User = Depends(get_current_user)):
+    """Projected completion date along the remaining critical path"""
+    state = timeline_engine.state_for_mask(current_user.progress_mask(), key=current_user.id)
+    projection = state.projection()
+    start_date = datetime.utcnow().date()
+    
+    return {
+        "start_date": start_date.isoformat(),
+        "projected_completion_date": (start_date + timedelta(days=projection["remaining_days"])).isoformat(),
+        "remaining_days": projection["remaining_days"],
+        "total_days": timeline_engine.total_days,
+        "critical_path": [timeline_step_summary(step_id) for step_id in projection["critical_path"]],
+        "completed_steps": len(state.completed),
+        "total_steps": len(RELOCATION_TIMELINE),
+        "current_phase": state.current_phase
+    }
+
+async def timeline_forecast(current_user: User, request: TimelineForecastRequest):
+    try:
+        forecast, cached = await timeline_forecaster.forecast(current_user.progress_mask(), request.dict())
+    except ForecastParameterError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    start_date = datetime.utcnow().date()
+    
+    return {
+        "start_date": start_date.isoformat(),
+        "deterministic_completion_date": (start_date + timedelta(days=forecast["deterministic_days"])).isoformat(),
+        "completion": {
+            name: {"days": days, "date": (start_date + timedelta(days=days)).isoformat()}
+            for name, days in forecast["percentiles"].items()
+        },
+        "mean_days": forecast["mean_days"],
+        "std_days": forecast["std_days"],
+        "probability_on_time": forecast["probability_on_time"],
+        "criticality": [
+            {**timeline_step_summary(step["id"]), "criticality": step["criticality"]}
+            for step in forecast["criticality"]
+        ],
+        "simulations": forecast["simulations"],
+        "seed": forecast["seed"],
+        "params_hash": forecast["params_hash"],
+        "cached": cached,
+        "elapsed_ms": forecast["elapsed_ms"]
+    }
+
+@api_router.get("/timeline/forecast")
+async def get_timeline_forecast(
+    simulations: int = Query(10000, ge=100, le=100000),
+    current_user: User = Depends(get_current_user)
+):
+    """Completion-date distribution and step criticality under the default duration distributions"""
+    return await timeline_forecast(current_user, TimelineForecastRequest(simulations=simulations))
+
+@api_router.post("/timeline/forecast")
+async def run_timeline_forecast(request: TimelineForecastRequest, current_user: User = Depends(get_current_user)):
+    """Completion-date distribution and step criticality under custom duration distributions"""
+    return await timeline_forecast(current_user, request)
+
+def build_job_search_platforms():
     return {
         "platforms": [
             {
@@ -964,9 +1480,8 @@ async def get_job_search_platforms():
     }
 
 # Enhanced Jobs endpoints - Hospitality, Travel & Tourism with Visa Support
-@api_router.get("/jobs/hospitality")
-async def get_hospitality_jobs():
-    return {
+def build_hospitality_jobs():
+    catalog = {
         "featured_jobs": [
             {
                 "id": 1,
@@ -1273,10 +1788,12 @@ async def get_hospitality_jobs():
             "Digital Marketing & Content"
         ]
     }
+    for job in catalog["featured_jobs"]:
+        job["salary_details"] = parse_salary(job["salary"])
+    return catalog
 
 # Enhanced Resources endpoints - All links for 39 steps with user provided comprehensive list
-@api_router.get("/resources/all")
-async def get_all_resources():
+def build_all_resources():
     return {
         "visa_legal": [
             {"name": "UK Gov Visa & Immigration", "url": "https://www.gov.uk/browse/visas-immigration", "description": "Official UK visa information portal"},
@@ -1442,30 +1959,20 @@ async def get_all_resources():
     }
 
 @api_router.get("/resources/search")
-async def search_resources(q: str = ""):
+async def search_resources(q: str = "", limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
     """Search across all resources"""
     if not q or len(q.strip()) < 2:
-        return {"results": [], "total": 0, "query": q}
+        return {"results": [], "total": 0, "truncated": False, "query": q, "limit": limit, "offset": offset}
     
-    query = q.lower().strip()
-    all_resources = await get_all_resources()
-    results = []
-    
-    for category, resources in all_resources.items():
-        for resource in resources:
-            # Search in name, description, and URL
-            if (query in resource["name"].lower() or 
-                query in resource["description"].lower() or 
-                query in resource["url"].lower()):
-                results.append({
-                    **resource,
-                    "category": category.replace("_", " ").title()
-                })
+    results, total, truncated = resource_index.search(q, limit=limit, offset=offset)
     
     return {
         "results": results,
-        "total": len(results),
-        "query": q
+        "total": total,
+        "truncated": truncated,  # a short prefix matched too many terms; total is a lower bound
+        "query": q,
+        "limit": limit,
+        "offset": offset
     }
     return {
         "visa_legal": [
@@ -1652,32 +2159,20 @@ async def search_resources(q: str = ""):
 # Dashboard overview with enhanced stats
 @api_router.get("/dashboard/overview")
 async def get_dashboard_overview(current_user: User = Depends(get_current_user)):
-    total_steps = len(RELOCATION_TIMELINE)
-    completed_steps = len(current_user.completed_steps)
-    
-    # Calculate in progress tasks (next 3 uncompleted steps)
-    in_progress = 0
-    urgent_tasks = 0
-    
-    for step in RELOCATION_TIMELINE:
-        if step["id"] not in current_user.completed_steps:
-            if in_progress < 3:
-                in_progress += 1
-            if step["category"] in ["Visa & Legal", "Employment"]:
-                urgent_tasks += 1
+    snapshot = dashboard_snapshots.for_user(current_user)
     
     return {
-        "total_steps": total_steps,
-        "completed_steps": completed_steps,
-        "in_progress": in_progress,
-        "urgent_tasks": urgent_tasks,
-        "current_phase": get_current_phase(current_user.completed_steps),
+        "total_steps": snapshot["total_steps"],
+        "completed_steps": snapshot["completed_steps"],
+        "in_progress": snapshot["in_progress"],  # next 3 uncompleted steps
+        "urgent_tasks": snapshot["remaining_urgent"],
+        "current_phase": snapshot["current_phase"],
         "budget_summary": {
             "total_budget": 400000,
             "allocated": 205000,
             "remaining": 195000
         },
-        "hospitality_jobs": len([j for j in SAMPLE_JOBS if "Hospitality" in j["category"]])
+        "hospitality_jobs": await count_hospitality_jobs()
     }
 
 # Progress tracking endpoints
@@ -1685,12 +2180,13 @@ async def get_dashboard_overview(current_user: User = Depends(get_current_user))
 async def get_progress_items(current_user: User = Depends(get_current_user), category: Optional[str] = None, status: Optional[str] = None):
     # Generate progress items based on timeline and completion status
     items = []
+    completed_mask = current_user.progress_mask()
+    steps = RELOCATION_TIMELINE
+    if category:
+        steps = [timeline_engine.steps[step_id] for step_id in timeline_engine.categories.get(category, [])]
     
-    for step in RELOCATION_TIMELINE:
-        if category and step["category"] != category:
-            continue
-            
-        status_value = "completed" if step["id"] in current_user.completed_steps else "pending"
+    for step in steps:
+        status_value = "completed" if has_step(completed_mask, step["id"]) else "pending"
         
         if status and status_value != status:
             continue
@@ -1716,29 +2212,48 @@ async def get_progress_items(current_user: User = Depends(get_current_user), cat
 async def update_progress_item(item_id: str, current_user: User = Depends(get_current_user), status: Optional[str] = None, notes: Optional[str] = None):
     # Update step completion status
     step_id = int(item_id)
-    user_completed_steps = current_user.completed_steps.copy()
+    ensure_timeline_step(step_id)
     
-    if status == "completed" and step_id not in user_completed_steps:
-        user_completed_steps.append(step_id)
-    elif status == "pending" and step_id in user_completed_steps:
-        user_completed_steps.remove(step_id)
-    
-    # Update user in database
-    await db.users.update_one(
-        {"username": current_user.username},
-        {"$set": {"completed_steps": user_completed_steps}}
-    )
+    if status in ("completed", "pending"):
+        await apply_step_progress(current_user.username, step_id, status == "completed")
     
     return {"message": "Progress item updated successfully"}
 
+async def get_stream_user(access_token: Optional[str] = Query(None, description="For EventSource, which cannot send headers"),
+                          credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    if credentials is None and access_token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return await get_current_user(credentials)
+
+@api_router.get("/progress/events")
+async def stream_progress_events(current_user: User = Depends(get_stream_user)):
+    """Server-sent events: the user's progress snapshot, then a delta for every progress change"""
+    # Subscribe before reading the snapshot so no change can fall in between. The snapshot is read
+    # from the database, not the cached principal: a write relayed from another worker may be newer.
+    subscription = progress_events.subscribe(current_user.id)
+    try:
+        user = await db.users.find_one({"username": current_user.username}, PROGRESS_WRITE_PROJECTION)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    except BaseException:
+        subscription.close()
+        raise
+    initial = snapshot_delta(None, dashboard_snapshots.for_document(user))
+    return StreamingResponse(
+        progress_events.stream(subscription, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @api_router.post("/progress/items/{item_id}/subtasks/{subtask_index}/toggle")
 async def toggle_subtask(item_id: str, subtask_index: int, current_user: User = Depends(get_current_user)):
     # For now, just return success - subtasks are auto-completed based on main task status
     return {"message": "Subtask toggled successfully"}
 
 # Logistics providers endpoints
-@api_router.get("/logistics/providers")
-async def get_logistics_providers():
+def build_logistics_providers():
     providers = [
         {
             "id": "crown001",
@@ -1822,6 +2337,126 @@ async def get_logistics_providers():
     
     return {"providers": providers}
 
+# Static catalog endpoints - payloads are built and serialized once, served with ETags (JSON, or NDJSON on request)
+catalog_cache = CatalogCache()
+catalog_cache.register("visa_requirements", build_visa_requirements)
+catalog_cache.register("visa_checklist", build_visa_checklist)
+catalog_cache.register("job_search_platforms", build_job_search_platforms)
+catalog_cache.register("hospitality_jobs", build_hospitality_jobs)
+catalog_cache.register("resources", build_all_resources)
+catalog_cache.register("logistics_providers", build_logistics_providers)
+resource_index = ResourceSearchIndex(catalog_cache.get("resources").data)
+
+@api_router.get("/visa/requirements")
+async def get_visa_requirements(request: Request):
+    return catalog_cache.respond("visa_requirements", request)
+
+@api_router.get("/visa/checklist")
+async def get_visa_checklist(request: Request):
+    return catalog_cache.respond("visa_checklist", request)
+
+@api_router.get("/jobs/search-platforms")
+async def get_job_search_platforms(request: Request):
+    return catalog_cache.respond("job_search_platforms", request)
+
+@api_router.get("/jobs/hospitality")
+async def get_hospitality_jobs(request: Request):
+    return catalog_cache.respond("hospitality_jobs", request)
+
+@api_router.get("/resources/all")
+async def get_all_resources(request: Request):
+    return catalog_cache.respond("resources", request)
+
+@api_router.get("/logistics/providers")
+async def get_logistics_providers(request: Request):
+    return catalog_cache.respond("logistics_providers", request)
+
+# Combined startup payload for the SPA: one request, one JWT decode and user lookup, sections built concurrently
+BOOTSTRAP_SECTIONS = ("user", "dashboard", "timeline", "progress", "jobs", "visa")
+BOOTSTRAP_USER_SECTIONS = {"user", "dashboard", "progress"}
+
+async def catalog_section(name):
+    return catalog_cache.get(name).data
+
+async def user_profile(user):
+    return user.dict(exclude={"hashed_password"})
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(
+    sections: Optional[str] = Query(None, description="Comma-separated sections, default: all available to the caller"),
+    jobs_limit: int = Query(50, ge=1, le=200),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """User, dashboard, timeline, progress items, job listings and visa types in one response.
+
+    The timeline is the user's when signed in and the public one otherwise. A section that fails is
+    reported under "errors" with its status code instead of failing the other sections.
+    """
+    if sections:
+        requested = list(dict.fromkeys(name.strip() for name in sections.split(",") if name.strip()))
+    else:
+        requested = [name for name in BOOTSTRAP_SECTIONS if current_user or name not in BOOTSTRAP_USER_SECTIONS]
+    unknown = [name for name in requested if name not in BOOTSTRAP_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)} (available: {', '.join(BOOTSTRAP_SECTIONS)})")
+    if current_user is None and BOOTSTRAP_USER_SECTIONS.intersection(requested):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    builders = {
+        "user": lambda: user_profile(current_user),
+        "dashboard": lambda: get_dashboard_overview(current_user=current_user),
+        "timeline": lambda: get_full_timeline(current_user=current_user) if current_user else get_public_timeline(),
+        "progress": lambda: get_progress_items(current_user=current_user, category=None, status=None),
+        "jobs": lambda: get_job_listings(category=None, job_type=None, location=None, visa_support=None,
+                                         min_salary=None, max_salary=None, limit=jobs_limit, cursor=None),
+        "visa": lambda: catalog_section("visa_requirements"),
+    }
+    results = await asyncio.gather(*(builders[name]() for name in requested), return_exceptions=True)
+    
+    response = {}
+    errors = {}
+    for name, result in zip(requested, results):
+        if isinstance(result, HTTPException):
+            errors[name] = {"status_code": result.status_code, "detail": result.detail}
+        elif isinstance(result, Exception):
+            print(f"Bootstrap section {name} failed: {result!r}")
+            errors[name] = {"status_code": 500, "detail": "Internal server error"}
+        else:
+            response[name] = result
+    if errors:
+        response["errors"] = errors
+    return response
+
+# Health probes: live = the process is serving requests, ready = it can serve them properly
+HEALTH_MONGO_TIMEOUT_SECONDS = float(os.environ.get("HEALTH_MONGO_TIMEOUT_SECONDS", "1.0"))
+
+@api_router.get("/health/live")
+async def health_live():
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    try:
+        await asyncio.wait_for(db.command("ping"), HEALTH_MONGO_TIMEOUT_SECONDS)
+        mongo_ok = True
+    except Exception:
+        mongo_ok = False
+    checks = {
+        "mongo": mongo_ok,
+        "catalog_cache": catalog_cache.ready,
+        "salary_index": salary_index.loaded,
+        "progress_log_writer": progress_log_writer.running,
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "not_ready", "checks": checks, "index_failures": index_failures},
+    )
+
 # Include API router in main app
 app.include_router(api_router)
 
@@ -1830,12 +2465,96 @@ app.include_router(api_router)
 async def root():
     return {"message": "RelocateMe API v2.6 - Phoenix to Peak District Relocation Platform"}
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
+# Operational endpoints live outside /api, so the public ingress never routes them
+ops_router = APIRouter(dependencies=[Depends(require_ops_token)], include_in_schema=False)
+
+@ops_router.get("/metrics")
+async def metrics():
+    return Response(content=shared_metrics.render(), media_type=CONTENT_TYPE)
+
+@ops_router.get("/stats/principal-cache")
+async def get_cache_stats():
+    return {"principal_cache": principal_cache.stats()}
+
+@ops_router.get("/stats/password-hashing")
+async def get_password_hashing_stats():
+    return password_hasher.stats()
+
+@ops_router.get("/stats/progress-logs")
+async def get_progress_log_stats():
+    return progress_log_writer.stats()
+
+@ops_router.get("/stats/progress-events")
+async def get_progress_event_stats():
+    return progress_events.stats()
+
+@ops_router.get("/stats/timeline-forecast")
+async def get_timeline_forecast_stats():
+    return timeline_forecaster.stats()
+
+@ops_router.get("/stats/mongo-pool")
+async def get_mongo_pool_stats():
+    return mongo_pool_metrics.stats()
+
+app.include_router(ops_router)
+
+# One-time database setup. Under gunicorn the master runs it before forking
+# (see gunicorn.conf.py) and sets DB_BOOTSTRAPPED_ENV so the workers skip it,
+# passing on the collections whose indexes failed in INDEX_FAILURES_ENV.
+DB_BOOTSTRAPPED_ENV = "RELOCATEME_DB_BOOTSTRAPPED"
+INDEX_FAILURES_ENV = "RELOCATEME_INDEX_FAILURES"
+
+# Collections whose indexes could not be created. /api/health/ready reports them without
+# failing: the API still serves without them, and no restart would make them succeed.
+index_failures: List[str] = []
+
+async def bootstrap_database():
+    global index_failures
+    created = await ensure_indexes(db)
+    index_failures = sorted(name for name, indexes in created.items() if not indexes)
     await create_default_user()
+    await migrate_progress_masks()
+    await rebuild_dashboard_snapshots()
+    await seed_sample_jobs()
+
+def export_bootstrap_result():
+    """Mark the database as set up for the processes forked from here on (including after HUP)."""
+    os.environ[DB_BOOTSTRAPPED_ENV] = "1"
+    os.environ[INDEX_FAILURES_ENV] = ",".join(index_failures)
+
+def inherit_bootstrap_result():
+    global index_failures
+    index_failures = [name for name in os.environ.get(INDEX_FAILURES_ENV, "").split(",") if name]
+
+async def bootstrap_before_fork():
+    """Run the one-time setup on a throwaway client, leaving no sockets or threads behind."""
+    connect_to_mongo()
+    try:
+        await bootstrap_database()
+    finally:
+        password_hasher.shutdown()
+        close_mongo_connection()
+
+# Startup and shutdown - run from the app lifespan
+async def startup_event():
+    connect_to_mongo()
+    progress_log_writer.start()
+    shared_metrics.start()
+    if os.environ.get(DB_BOOTSTRAPPED_ENV) != "1":
+        await bootstrap_database()
+    else:
+        inherit_bootstrap_result()
+    await salary_index.refresh(db.jobs)
+    await progress_events.start(create_progress_events_backend(os.environ.get("PROGRESS_EVENTS_BACKEND", "local"), db))
     print("RelocateMe API started successfully!")
 
+async def shutdown_event():
+    await progress_events.stop()
+    await progress_log_writer.stop()
+    await shared_metrics.stop()
+    password_hasher.shutdown()
+    close_mongo_connection()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Dependency-graph engine for the relocation timeline.
+
+RELOCATION_TIMELINE is compiled once into a DAG: topological order, children
+lists, category indexes and critical-path lengths from `estimated_days`.
+Per-user progress is kept as a `ProgressState` that is updated by diffing the
+user's completed mask against the last one seen (`mask ^ new_mask`), so a
+toggle costs O(changed steps x out-degree) instead of a rescan of the whole
+timeline. A request whose user has not changed costs one int comparison.
+"""
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from progress_mask import has_step, mask_to_steps, steps_to_mask
+
+COMPLETED_PHASE = "Settlement"
+
+
+class TimelineCycleError(ValueError):
+    pass
+
+
+class ProgressState:
+    __slots__ = ("engine", "completed", "mask", "unmet", "unblocked", "_projection")
+
+    def __init__(self, engine: "TimelineEngine"):
+        self.engine = engine
+        self.completed: Set[int] = set()
+        self.mask = 0
+        self.unmet: Dict[int, int] = {step_id: len(deps) for step_id, deps in engine.dependencies.items()}
+        self.unblocked: Set[int] = {step_id for step_id, count in self.unmet.items() if count == 0}
+        self._projection: Optional[Dict[str, Any]] = None
+
+    def mark(self, step_id: int, completed: bool):
+        if step_id not in self.engine.steps or (step_id in self.completed) == completed:
+            return
+        self._projection = None
+        self.mask ^= 1 << step_id
+        delta = -1 if completed else 1
+        if completed:
+            self.completed.add(step_id)
+            self.unblocked.discard(step_id)
+        else:
+            self.completed.discard(step_id)
+            if self.unmet[step_id] == 0:
+                self.unblocked.add(step_id)
+        for child in self.engine.children[step_id]:
+            self.unmet[child] += delta
+            if child in self.completed:
+                continue
+            if self.unmet[child] == 0:
+                self.unblocked.add(child)
+            else:
+                self.unblocked.discard(child)
+
+    def sync_mask(self, mask: int):
+        """Bring the state in line with a user's completed mask, touching only the steps that flipped."""
+        changed = self.mask ^ mask
+        if not changed:
+            return
+        for step_id in mask_to_steps(changed):
+            self.mark(step_id, has_step(mask, step_id))
+        # Bits of steps outside the timeline are kept too, so they are not diffed again
+        self.mask = mask
+
+    def sync(self, completed_steps: Iterable[int]):
+        """Bring the state in line with a user's completed steps."""
+        self.sync_mask(steps_to_mask(completed_steps))
+
+    @property
+    def current_phase(self) -> str:
+        # The first incomplete step in topological order always has all its
+        # dependencies met, so it is the earliest unblocked step.
+        if not self.unblocked:
+            return COMPLETED_PHASE
+        first = min(self.unblocked, key=self.engine.position.__getitem__)
+        return self.engine.steps[first]["category"]
+
+    def next_actions(self) -> List[int]:
+        """Unblocked steps, most critical (longest remaining chain) first."""
+        engine = self.engine
+        return sorted(self.unblocked, key=lambda step_id: (-engine.tail_days[step_id], engine.position[step_id]))
+
+    def projection(self) -> Dict[str, Any]:
+        """Remaining critical path over the incomplete steps (memoized per state)."""
+        if self._projection is not None:
+            return self._projection
+
+        engine = self.engine
+        finish: Dict[int, int] = {}
+        via: Dict[int, Optional[int]] = {}
+        for step_id in engine.order:
+            if step_id in self.completed:
+                continue
+            start, previous = 0, None
+            for dep in engine.dependencies[step_id]:
+                if dep in finish and finish[dep] > start:
+                    start, previous = finish[dep], dep
+            finish[step_id] = start + engine.steps[step_id]["estimated_days"]
+            via[step_id] = previous
+
+        critical_path: List[int] = []
+        remaining_days = 0
+        if finish:
+            last = max(finish, key=lambda step_id: (finish[step_id], -engine.position[step_id]))
+            remaining_days = finish[last]
+            while last is not None:
+                critical_path.append(last)
+                last = via[last]
+            critical_path.reverse()
+
+        self._projection = {"remaining_days": remaining_days, "finish_days": finish, "critical_path": critical_path}
+        return self._projection
+
+
+class TimelineEngine:
+    def __init__(self, steps: List[Dict[str, Any]], max_states: int = 1024):
+        self.steps: Dict[int, Dict[str, Any]] = {step["id"]: step for step in steps}
+        self.dependencies: Dict[int, List[int]] = {
+            step["id"]: [dep for dep in step.get("dependencies", []) if dep in self.steps] for step in steps
+        }
+        self.children: Dict[int, List[int]] = {step_id: [] for step_id in self.steps}
+        for step_id, deps in self.dependencies.items():
+            for dep in deps:
+                self.children[dep].append(step_id)
+
+        self.order = self._topological_order()
+        self.position = {step_id: index for index, step_id in enumerate(self.order)}
+
+        self.categories: Dict[str, List[int]] = {}
+        for step_id in self.order:
+            self.categories.setdefault(self.steps[step_id]["category"], []).append(step_id)
+
+        # head_days: earliest finish from a standing start; tail_days: longest chain from a step to the end
+        self.head_days: Dict[int, int] = {}
+        for step_id in self.order:
+            before = max((self.head_days[dep] for dep in self.dependencies[step_id]), default=0)
+            self.head_days[step_id] = before + self.steps[step_id]["estimated_days"]
+        self.tail_days: Dict[int, int] = {}
+        for step_id in reversed(self.order):
+            after = max((self.tail_days[child] for child in self.children[step_id]), default=0)
+            self.tail_days[step_id] = after + self.steps[step_id]["estimated_days"]
+        self.total_days = max(self.head_days.values(), default=0)
+
+        self.max_states = max_states
+        self._states: "OrderedDict[Hashable, ProgressState]" = OrderedDict()
+
+    def _topological_order(self) -> List[int]:
+        indegree = {step_id: len(deps) for step_id, deps in self.dependencies.items()}
+        ready = sorted(step_id for step_id, count in indegree.items() if count == 0)
+        order: List[int] = []
+        while ready:
+            step_id = ready.pop(0)
+            order.append(step_id)
+            for child in self.children[step_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+            ready.sort()
+        if len(order) != len(self.steps):
+            raise TimelineCycleError("Timeline dependencies contain a cycle")
+        return order
+
+    def state(self, completed_steps: Iterable[int], key: Optional[Hashable] = None) -> ProgressState:
+        """Progress state for a completed set; keyed states are reused and diffed."""
+        return self.state_for_mask(steps_to_mask(completed_steps), key)
+
+    def state_for_mask(self, mask: int, key: Optional[Hashable] = None) -> ProgressState:
+        """Progress state for a completed mask (see progress_mask.py); keyed states are reused and diffed."""
+        state = self._keyed_state(key)
+        state.sync_mask(mask)
+        return state
+
+    def _keyed_state(self, key: Optional[Hashable]) -> ProgressState:
+        if key is None:
+            return ProgressState(self)
+        state = self._states.get(key)
+        if state is None:
+            state = ProgressState(self)
+            self._states[key] = state
+            if len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return state
+
+    def forget(self, key: Hashable):
+        self._states.pop(key, None)
+
+    def current_phase(self, completed_steps: Iterable[int], key: Optional[Hashable] = None) -> str:
+        return self.state(completed_steps, key).current_phase
+
+    def projected_completion(self, completed_steps: Iterable[int], start: Optional[date] = None, key: Optional[Hashable] = None) -> date:
+        start = start or date.today()
+        return start + timedelta(days=self.state(completed_steps, key).projection()["remaining_days"])
@@ -0,0 +1,224 @@
+"""Monte Carlo forecast of the relocation completion date.
+
+TimelineEngine projects one completion date from the `estimated_days` point
+estimates. The forecaster samples each step's duration as estimated_days x
+a random factor, and finds the completion day of every simulation. The
+factors come from distributions configured by default, per category and per
+step (most specific wins):
+
+- triangular: low / mode / high multipliers (default 0.8 / 1.0 / 1.5)
+- lognormal: mean-one, with shape `sigma`
+- uniform: low / high multipliers
+- fixed: always the estimate
+
+Simulations are run in batches of `batch_size` columns over a
+(steps, simulations) duration matrix whose rows are in topological order.
+The forward pass gives each step's earliest finish: the max of its parents'
+rows plus its own duration. The backward pass gives its latest finish: the
+min of its children's latest starts, capped at the completion day. Both
+passes are one vector operation per step across the whole batch.
+
+A step is critical in a simulation when it has no float there, i.e. delaying
+it would delay completion. Its criticality is the share of simulations in
+which it is critical.
+
+Completed steps take no time and do not hold up their children, as in
+ProgressState.projection(). A forecast depends only on the completed mask and
+the parameters (the seed included). Results are therefore cached per
+(mask, parameter hash), in days from the start. Callers turn days into dates,
+so a cached forecast stays valid from one day to the next.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Tuple
+
+import numpy as np
+
+from progress_mask import mask_to_steps
+
+DISTRIBUTIONS = ("triangular", "lognormal", "uniform", "fixed")
+DEFAULT_DISTRIBUTION = {"distribution": "triangular", "low": 0.8, "mode": 1.0, "high": 1.5, "sigma": 0.3}
+# Earliest and latest finish are summed in different orders, so zero float is compared with a tolerance
+FLOAT_TOLERANCE_DAYS = 1e-6
+
+
+class ForecastParameterError(ValueError):
+    pass
+
+
+def params_hash(params: Mapping[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def distribution_key(spec: Mapping[str, Any]) -> Tuple:
+    """A validated distribution as a hashable key, so steps that share one are sampled together."""
+    spec = {**DEFAULT_DISTRIBUTION, **spec}
+    name = spec["distribution"]
+    if name not in DISTRIBUTIONS:
+        raise ForecastParameterError(f"Unknown distribution {name!r} (expected one of {', '.join(DISTRIBUTIONS)})")
+    if name == "triangular":
+        if not 0 < spec["low"] <= spec["mode"] <= spec["high"]:
+            raise ForecastParameterError("A triangular distribution needs 0 < low <= mode <= high")
+        return (name, spec["low"], spec["mode"], spec["high"]) if spec["low"] < spec["high"] else ("fixed_at", spec["low"])
+    if name == "uniform":
+        if not 0 < spec["low"] <= spec["high"]:
+            raise ForecastParameterError("A uniform distribution needs 0 < low <= high")
+        return (name, spec["low"], spec["high"]) if spec["low"] < spec["high"] else ("fixed_at", spec["low"])
+    if name == "lognormal":
+        if spec["sigma"] < 0:
+            raise ForecastParameterError("A lognormal distribution needs sigma >= 0")
+        return (name, spec["sigma"]) if spec["sigma"] > 0 else ("fixed_at", 1.0)
+    return ("fixed_at", 1.0)
+
+
+def sample_factors(rng: np.random.Generator, key: Tuple, shape: Tuple[int, int]) -> np.ndarray:
+    name = key[0]
+    if name == "triangular":
+        return rng.triangular(key[1], key[2], key[3], size=shape)
+    if name == "uniform":
+        return rng.uniform(key[1], key[2], size=shape)
+    if name == "lognormal":
+        sigma = key[1]
+        return np.exp(sigma * rng.standard_normal(shape) - sigma ** 2 / 2)
+    return np.full(shape, key[1])
+
+
+class TimelineForecaster:
+    def __init__(self, engine, batch_size: int = 4096, max_entries: int = 256):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self.step_ids = list(engine.order)
+        row = {step_id: index for index, step_id in enumerate(self.step_ids)}
+        self.row = row
+        self.estimates = np.array([engine.steps[step_id]["estimated_days"] for step_id in self.step_ids], dtype=float)
+        self.parents = [[row[dep] for dep in engine.dependencies[step_id]] for step_id in self.step_ids]
+        self.children = [[row[child] for child in engine.children[step_id]] for step_id in self.step_ids]
+        self._entries: "OrderedDict[Tuple[int, str], Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def distributions(self, params: Mapping[str, Any]) -> Dict[Tuple, np.ndarray]:
+        """Rows grouped by the distribution that applies to them (step, then category, then default)."""
+        categories = params.get("categories") or {}
+        steps = params.get("steps") or {}
+        unknown_categories = sorted(set(categories) - set(self.engine.categories))
+        if unknown_categories:
+            raise ForecastParameterError(f"Unknown categories: {', '.join(unknown_categories)}")
+        unknown_steps = sorted(step_id for step_id in steps if int(step_id) not in self.row)
+        if unknown_steps:
+            raise ForecastParameterError(f"Unknown timeline steps: {', '.join(map(str, unknown_steps))}")
+        steps = {int(step_id): spec for step_id, spec in steps.items()}
+
+        default = params.get("default") or {}
+        groups: Dict[Tuple, list] = {}
+        for index, step_id in enumerate(self.step_ids):
+            spec = steps.get(step_id) or categories.get(self.engine.steps[step_id]["category"]) or default
+            groups.setdefault(distribution_key(spec), []).append(index)
+        return {key: np.array(rows) for key, rows in groups.items()}
+
+    def _passes(self, durations: np.ndarray, done: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Completion day per column, and which steps have zero float in each column."""
+        count, width = durations.shape
+        finish = np.zeros((count, width))
+        for index in range(count):
+            if done[index]:
+                continue
+            parents = [parent for parent in self.parents[index] if not done[parent]]
+            if not parents:
+                finish[index] = durations[index]
+            elif len(parents) == 1:
+                np.add(finish[parents[0]], durations[index], out=finish[index])
+            else:
+                np.maximum.reduce(finish[parents], axis=0, out=finish[index])
+                finish[index] += durations[index]
+        completion = finish.max(axis=0)
+
+        latest_start = np.empty((count, width))
+        critical = np.zeros((count, width), dtype=bool)
+        for index in reversed(range(count)):
+            if done[index]:
+                continue
+            latest_finish = completion.copy()
+            for child in self.children[index]:
+                if not done[child]:
+                    np.minimum(latest_finish, latest_start[child], out=latest_finish)
+            np.less_equal(latest_finish - finish[index], FLOAT_TOLERANCE_DAYS, out=critical[index])
+            np.subtract(latest_finish, durations[index], out=latest_start[index])
+        return completion, critical
+
+    def simulate(self, completed_steps, params: Mapping[str, Any]) -> Dict[str, Any]:
+        """Forecast in days from the start for a completed set (uncached)."""
+        started = time.perf_counter()
+        simulations = int(params.get("simulations", 10000))
+        percentiles = list(params.get("percentiles") or (50, 80, 95))
+        if simulations < 1:
+            raise ForecastParameterError("At least one simulation is needed")
+        if any(not 0 <= pct <= 100 for pct in percentiles):
+            raise ForecastParameterError("Percentiles must be between 0 and 100")
+        groups = self.distributions(params)
+        rng = np.random.default_rng(params.get("seed", 0))
+        count = len(self.step_ids)
+        done = np.zeros(count, dtype=bool)
+        for step_id in completed_steps:
+            if step_id in self.row:
+                done[self.row[step_id]] = True
+
+        deterministic, _ = self._passes(self.estimates[:, None], done)
+        completion = np.empty(simulations)
+        critical_counts = np.zeros(count)
+        for offset in range(0, simulations, self.batch_size):
+            width = min(self.batch_size, simulations - offset)
+            durations = np.empty((count, width))
+            for key, rows in groups.items():
+                durations[rows] = sample_factors(rng, key, (len(rows), width))
+            durations *= self.estimates[:, None]
+            durations[done] = 0.0
+            completion[offset:offset + width], critical = self._passes(durations, done)
+            critical_counts += critical.sum(axis=1)
+
+        points = np.percentile(completion, percentiles)
+        remaining = [index for index in range(count) if not done[index]]
+        criticality = sorted(
+            ({"id": self.step_ids[index], "criticality": round(float(critical_counts[index]) / simulations, 4)}
+             for index in remaining),
+            key=lambda step: -step["criticality"],  # stable: ties stay in timeline order
+        )
+        return {
+            "simulations": simulations,
+            "seed": params.get("seed", 0),
+            "params_hash": params_hash(params),
+            "deterministic_days": float(deterministic[0]),
+            "mean_days": round(float(completion.mean()), 2),
+            "std_days": round(float(completion.std()), 2),
+            # Whole days: a step that finishes part-way through a day is done that day
+            "percentiles": {f"p{pct:g}": math.ceil(point - FLOAT_TOLERANCE_DAYS) for pct, point in zip(percentiles, points)},
+            "probability_on_time": float((completion <= deterministic[0] + FLOAT_TOLERANCE_DAYS).mean()),
+            "criticality": criticality,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    async def forecast(self, mask: int, params: Mapping[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Cached forecast for a completed mask, and whether it came from the cache.
+
+        The simulation runs on a worker thread; the cache is only touched from the event loop.
+        """
+        key = (mask, params_hash(params))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry, True
+        result = await asyncio.to_thread(self.simulate, mask_to_steps(mask), params)
+        self.misses += 1
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
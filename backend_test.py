@@ -4,6 +4,33 @@ import sys
 import json
 from datetime import datetime
 
+# Endpoint catalog shared with benchmarks/load_test.py: key -> (name, method, endpoint, expected_status, needs_auth)
+ENDPOINTS = {
+    "login": ("Login", "POST", "auth/login", 200, False),
+    "auth_me": ("Get Current User", "GET", "auth/me", 200, True),
+    "timeline_full": ("Get Full Timeline", "GET", "timeline/full", 200, True),
+    "timeline_by_category": ("Get Timeline By Category", "GET", "timeline/by-category", 200, True),
+    "update_timeline_progress": ("Update Timeline Progress", "POST", "timeline/update-progress", 200, True),
+    "timeline_forecast": ("Get Timeline Forecast", "GET", "timeline/forecast", 200, True),
+    "jobs_listings": ("Get Job Listings", "GET", "jobs/listings", 200, False),
+    "jobs_featured": ("Get Featured Jobs", "GET", "jobs/featured", 200, False),
+    "jobs_categories": ("Get Job Categories", "GET", "jobs/categories", 200, False),
+    "visa_requirements": ("Get Visa Requirements", "GET", "visa/requirements", 200, False),
+    "visa_checklist": ("Get Visa Checklist", "GET", "visa/checklist", 200, False),
+    "visa_requirement_details": ("Get Visa Requirement Details", "GET", "visa/requirements/{visa_type}", 200, False),
+    "resources_all": ("Get All Resources", "GET", "resources/all", 200, False),
+    "logistics_providers": ("Get Logistics Providers", "GET", "logistics/providers", 200, False),
+    "dashboard_overview": ("Get Dashboard Overview", "GET", "dashboard/overview", 200, True),
+    "password_reset_request": ("Request Password Reset", "POST", "auth/reset-password", 200, False),
+    "analytics_budget": ("Get Budget Analytics", "GET", "analytics/budget", 200, True),
+    "analytics_overview": ("Get Analytics Overview", "GET", "analytics/overview", 200, True),
+    "analytics_budget_scenarios": ("Run Budget Scenarios", "POST", "analytics/budget/scenarios", 200, True),
+    "progress_items": ("Get Progress Items", "GET", "progress/items", 200, True),
+    "complete_password_reset": ("Complete Password Reset", "POST", "auth/complete-password-reset", 200, False),
+    "bootstrap": ("Get Bootstrap", "GET", "bootstrap", 200, True),
+}
+
+
 class RelocateMeAPITester:
     def __init__(self, base_url="https://76b0ec44-d34c-46b0-b824-302567b87a97.preview.emergentagent.com/api"):
         self.base_url = base_url
@@ -14,6 +41,11 @@ class RelocateMeAPITester:
         print(f"🚀 Testing RelocateMe API at: {self.base_url}")
         print("=" * 50)
 
+    def run_endpoint(self, key, data=None, params=None, **path_params):
+        """Run a test for an entry of the endpoint catalog"""
+        name, method, endpoint, expected_status, _ = ENDPOINTS[key]
+        return self.run_test(name, method, endpoint.format(**path_params), expected_status, data=data, params=params)
+
     def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
         """Run a single API test"""
         url = f"{self.base_url}/{endpoint}"
@@ -76,13 +108,7 @@ class RelocateMeAPITester:
     def test_login(self, username, password):
         """Test login and get token"""
         print(f"\n🔐 Attempting login with username: {username}")
-        success, response = self.run_test(
-            "Login",
-            "POST",
-            "auth/login",
-            200,
-            data={"username": username, "password": password}
-        )
+        success, response = self.run_endpoint("login", data={"username": username, "password": password})
         if success and 'access_token' in response:
             self.token = response['access_token']
             print(f"✅ Login successful, token received")
@@ -92,172 +118,87 @@ class RelocateMeAPITester:
 
     def test_auth_me(self):
         """Test getting current user info"""
-        return self.run_test(
-            "Get Current User",
-            "GET",
-            "auth/me",
-            200
-        )
+        return self.run_endpoint("auth_me")
 
     def test_timeline_full(self):
         """Test getting full timeline"""
-        return self.run_test(
-            "Get Full Timeline",
-            "GET",
-            "timeline/full",
-            200
-        )
+        return self.run_endpoint("timeline_full")
 
     def test_timeline_by_category(self):
         """Test getting timeline by category"""
-        return self.run_test(
-            "Get Timeline By Category",
-            "GET",
-            "timeline/by-category",
-            200
-        )
+        return self.run_endpoint("timeline_by_category")
 
     def test_update_timeline_progress(self, step_id, completed):
         """Test updating timeline progress"""
-        return self.run_test(
-            "Update Timeline Progress",
-            "POST",
-            "timeline/update-progress",
-            200,
-            data={"step_id": step_id, "completed": completed}
-        )
+        return self.run_endpoint("update_timeline_progress", data={"step_id": step_id, "completed": completed})
+
+    def test_timeline_forecast(self):
+        """Test getting the completion-date forecast"""
+        return self.run_endpoint("timeline_forecast")
 
     def test_jobs_listings(self):
         """Test getting job listings"""
-        return self.run_test(
-            "Get Job Listings",
-            "GET",
-            "jobs/listings",
-            200
-        )
+        return self.run_endpoint("jobs_listings")
 
     def test_jobs_featured(self):
         """Test getting featured jobs"""
-        return self.run_test(
-            "Get Featured Jobs",
-            "GET",
-            "jobs/featured",
-            200
-        )
+        return self.run_endpoint("jobs_featured")
 
     def test_jobs_categories(self):
         """Test getting job categories"""
-        return self.run_test(
-            "Get Job Categories",
-            "GET",
-            "jobs/categories",
-            200
-        )
+        return self.run_endpoint("jobs_categories")
 
     def test_visa_requirements(self):
         """Test getting visa requirements"""
-        return self.run_test(
-            "Get Visa Requirements",
-            "GET",
-            "visa/requirements",
-            200
-        )
+        return self.run_endpoint("visa_requirements")
 
     def test_visa_checklist(self):
         """Test getting visa checklist"""
-        return self.run_test(
-            "Get Visa Checklist",
-            "GET",
-            "visa/checklist",
-            200
-        )
+        return self.run_endpoint("visa_checklist")
         
     def test_visa_requirement_details(self, visa_type):
         """Test getting visa requirement details"""
-        return self.run_test(
-            "Get Visa Requirement Details",
-            "GET",
-            f"visa/requirements/{visa_type}",
-            200
-        )
+        return self.run_endpoint("visa_requirement_details", visa_type=visa_type)
 
     def test_resources_all(self):
         """Test getting all resources"""
-        return self.run_test(
-            "Get All Resources",
-            "GET",
-            "resources/all",
-            200
-        )
+        return self.run_endpoint("resources_all")
 
     def test_logistics_providers(self):
         """Test getting logistics providers"""
-        return self.run_test(
-            "Get Logistics Providers",
-            "GET",
-            "logistics/providers",
-            200
-        )
+        return self.run_endpoint("logistics_providers")
 
     def test_dashboard_overview(self):
         """Test getting dashboard overview"""
-        return self.run_test(
-            "Get Dashboard Overview",
-            "GET",
-            "dashboard/overview",
-            200
-        )
+        return self.run_endpoint("dashboard_overview")
 
     def test_password_reset_request(self, username):
         """Test requesting a password reset"""
-        return self.run_test(
-            "Request Password Reset",
-            "POST",
-            "auth/reset-password",
-            200,
-            data={"username": username}
-        )
+        return self.run_endpoint("password_reset_request", data={"username": username})
         
     def test_analytics_budget(self):
         """Test getting budget analytics"""
-        return self.run_test(
-            "Get Budget Analytics",
-            "GET",
-            "analytics/budget",
-            200
-        )
+        return self.run_endpoint("analytics_budget")
 
     def test_analytics_overview(self):
         """Test getting analytics overview"""
-        return self.run_test(
-            "Get Analytics Overview",
-            "GET",
-            "analytics/overview",
-            200
-        )
+        return self.run_endpoint("analytics_overview")
 
     def test_progress_items(self):
         """Test getting progress items"""
-        return self.run_test(
-            "Get Progress Items",
-            "GET",
-            "progress/items",
-            200
-        )
+        return self.run_endpoint("progress_items")
+
+    def test_analytics_budget_scenarios(self):
+        """Test running budget scenarios"""
+        return self.run_endpoint("analytics_budget_scenarios", data={"scenarios": 1000, "budget_levels": [350000, 400000]})
+
+    def test_bootstrap(self):
+        """Test getting the combined startup payload"""
+        return self.run_endpoint("bootstrap")
 
     def test_complete_password_reset(self, username, reset_code, new_password):
         """Test completing a password reset"""
-        return self.run_test(
-            "Complete Password Reset",
-            "POST",
-            "auth/complete-password-reset",
-            200,
-            data={
-                "username": username,
-                "reset_code": reset_code,
-                "new_password": new_password
-            }
-        )
+        return self.run_endpoint("complete_password_reset", data={"username": username, "reset_code": reset_code, "new_password": new_password})
         
     def print_summary(self):
         """Print test summary"""
@@ -310,10 +251,14 @@ def main():
     tester.test_dashboard_overview()
     tester.test_analytics_budget()
     tester.test_analytics_overview()
+    tester.test_analytics_budget_scenarios()
     
     # Test progress items
     tester.test_progress_items()
     
+    # Test the combined startup payload
+    tester.test_bootstrap()
+    
     # Try updating timeline progress
     success, timeline_data = tester.test_timeline_full()
     if success and timeline_data and "timeline" in timeline_data:
@@ -322,6 +267,7 @@ def main():
             if not step.get("is_completed", False):
                 tester.test_update_timeline_progress(step["id"], True)
                 break
+        tester.test_timeline_forecast()
     
     # Test password reset functionality
     success, reset_response = tester.test_password_reset_request("relocate_user")
@@ -0,0 +1,77 @@
+"""SPA start-up cost: the per-component fan-out vs one /api/bootstrap request.
+
+The fan-out fires the five requests App.js sends on load, concurrently as the
+components do: dashboard overview, public timeline, progress items, job
+listings and visa requirements. The bootstrap run fetches the same sections
+(with the user's own timeline) in one request. Both are timed end to end,
+in-process:
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/bootstrap_benchmark.py --iterations 300
+    python benchmarks/bootstrap_benchmark.py --mongo memory
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from load_test import CREDENTIALS, percentile, use_in_memory_mongo  # noqa: E402
+
+FAN_OUT = ["/dashboard/overview", "/timeline/public", "/progress/items", "/jobs/listings", "/visa/requirements"]
+BOOTSTRAP = "/bootstrap?sections=dashboard,timeline,progress,jobs,visa"
+
+
+async def fan_out(client, headers):
+    responses = await asyncio.gather(*(client.get(path, headers=headers) for path in FAN_OUT))
+    return sum(len(response.content) for response in responses)
+
+
+async def bootstrap(client, headers):
+    response = await client.get(BOOTSTRAP, headers=headers)
+    response.raise_for_status()
+    return len(response.content)
+
+
+async def measure(run, client, headers, iterations):
+    samples, size = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = await run(client, headers)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, size
+
+
+async def main(args):
+    import server
+
+    if args.mongo == "memory":
+        use_in_memory_mongo(server)
+    await server.startup_event()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench/api", timeout=30)
+    try:
+        token = (await client.post("/auth/login", json=CREDENTIALS)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        results = {}
+        for name, run, requests in (("fan-out", fan_out, len(FAN_OUT)), ("bootstrap", bootstrap, 1)):
+            await measure(run, client, headers, 5)
+            samples, size = await measure(run, client, headers, args.iterations)
+            results[name] = (requests, size, samples)
+    finally:
+        await client.aclose()
+        await server.shutdown_event()
+
+    print(f"\n{'':<11}{'requests':>9}{'bytes':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, (requests, size, samples) in results.items():
+        print(f"{name:<11}{requests:>9}{size:>9}{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start-up fan-out vs /api/bootstrap")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url")
+    asyncio.run(main(parser.parse_args()))
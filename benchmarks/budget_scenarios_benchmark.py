@@ -0,0 +1,63 @@
+"""Budget scenario engine latency per scenario count, against the 50ms target for 10k.
+
+Runs the engine behind POST /api/analytics/budget/scenarios directly, on the
+RELOCATION_TIMELINE with no progress and with half the steps complete. Nothing
+touches MongoDB, so no database is needed. Exits non-zero if the median for
+--target-scenarios is over --target-ms:
+
+    python benchmarks/budget_scenarios_benchmark.py
+    python benchmarks/budget_scenarios_benchmark.py --scenarios 1000 10000 50000 --levels 3 --iterations 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import percentile  # noqa: E402
+
+
+def measure(engine, state, scenarios, levels, iterations):
+    finish_days = state.projection()["finish_days"]
+    samples = []
+    for seed in range(iterations):
+        started = time.perf_counter()
+        engine.run(finish_days, state.completed, budget_levels=levels, scenarios=scenarios, seed=seed)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(args):
+    import server
+
+    levels = [400000.0 * (1 + index / 10) for index in range(args.levels)]
+    step_ids = [step["id"] for step in server.RELOCATION_TIMELINE]
+    states = {
+        "no progress": server.timeline_engine.state([]),
+        "half done": server.timeline_engine.state(step_ids[:len(step_ids) // 2]),
+    }
+    measure(server.budget_scenarios, states["no progress"], 1000, levels, 5)
+
+    print(f"\n{'progress':<13}{'scenarios':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    target_median = None
+    for name, state in states.items():
+        for scenarios in args.scenarios:
+            samples = measure(server.budget_scenarios, state, scenarios, levels, args.iterations)
+            print(f"{name:<13}{scenarios:>10}{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}")
+            if scenarios == args.target_scenarios:
+                target_median = max(target_median or 0, percentile(samples, 50))
+
+    if target_median is not None and target_median > args.target_ms:
+        raise SystemExit(f"{args.target_scenarios} scenarios: p50 {target_median:.1f}ms is over {args.target_ms}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budget scenario engine latency")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--levels", type=int, default=1, help="number of budget levels per run")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--target-scenarios", type=int, default=10000)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""Job import throughput in rows/sec.
+
+Writes a synthetic NDJSON and CSV feed, then streams each through the import
+pipeline (backend/job_import.py). Two modes are timed:
+
+- parse + validate + dedupe only (--dry-run)
+- the full import with bulk upserts into a throwaway database
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/job_import_benchmark.py --rows 50000
+
+--memory reports the tracemalloc peak of dry runs at 1x and 4x the row count.
+The peaks should match, because only one batch is held at a time.
+`--mongo memory` swaps in mongomock-motor for a quick smoke test.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from job_import import JobImporter, parse_records, aiter_file  # noqa: E402
+from server import JobListing  # noqa: E402
+
+FIELDS = ["id", "title", "company", "location", "salary_range", "job_type", "category", "description",
+          "requirements", "benefits", "posted_date", "application_url", "visa_support"]
+
+
+def synthetic_row(index: int, rng: random.Random) -> dict:
+    low = rng.randrange(16, 60)
+    return {
+        "id": f"feed{index:08d}",
+        "title": f"Hospitality role {index}",
+        "company": f"Employer {index % 2000}",
+        "location": f"{rng.choice(['Bakewell', 'Buxton', 'Castleton', 'Matlock'])}, Peak District",
+        "salary_range": f"£{low},000 - £{low + rng.randrange(2, 10)},000 + tips",
+        "job_type": rng.choice(["full-time", "part-time"]),
+        "category": rng.choice(["Hospitality Service", "Hospitality Management", "Retail"]),
+        "description": "Serve guests in a busy Peak District venue. " * 3,
+        "requirements": ["Customer service", "Right to work"],
+        "benefits": ["Tips", "Staff meals"],
+        "posted_date": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        "application_url": f"https://example.com/jobs/{index}",
+        "visa_support": rng.random() < 0.3,
+    }
+
+
+def write_feeds(directory: str, rows: int):
+    rng = random.Random(11)
+    ndjson_path, csv_path = os.path.join(directory, "feed.ndjson"), os.path.join(directory, "feed.csv")
+    with open(ndjson_path, "w") as ndjson_file, open(csv_path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(FIELDS)
+        for index in range(rows):
+            row = synthetic_row(index, rng)
+            ndjson_file.write(json.dumps(row) + "\n")
+            writer.writerow([
+                "|".join(row[field]) if isinstance(row[field], list) else row[field] for field in FIELDS
+            ])
+    return {"ndjson": ndjson_path, "csv": csv_path}
+
+
+async def run_import(path: str, file_format: str, collection, batch_size: int, dry_run: bool):
+    importer = JobImporter(collection, JobListing, batch_size=batch_size, dry_run=dry_run)
+    started = time.perf_counter()
+    progress = await importer.run(parse_records(aiter_file(path), file_format))
+    elapsed = time.perf_counter() - started
+    return progress.rows / elapsed, progress
+
+
+async def dry_run_peak(directory: str, rows: int, batch_size: int) -> int:
+    path = write_feeds(directory, rows)["ndjson"]
+    tracemalloc.start()
+    await run_import(path, "ndjson", None, batch_size, dry_run=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def main(args):
+    if args.mongo == "memory":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from db_indexes import INDEXES
+        client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    collection = client[args.database].jobs
+
+    with tempfile.TemporaryDirectory() as directory:
+        feeds = write_feeds(directory, args.rows)
+        print(f"{args.rows} rows, batch size {args.batch_size}\n")
+        for file_format, path in feeds.items():
+            rate, _ = await run_import(path, file_format, collection, args.batch_size, dry_run=True)
+            print(f"{file_format:<7} parse + validate       {rate:>10.0f} rows/s")
+        for file_format, path in feeds.items():
+            await collection.drop()
+            if args.mongo != "memory":
+                await collection.create_indexes(INDEXES["jobs"])
+            rate, progress = await run_import(path, file_format, collection, args.batch_size, dry_run=False)
+            print(f"{file_format:<7} full import            {rate:>10.0f} rows/s  (inserted {progress.inserted})")
+            rate, progress = await run_import(path, file_format, collection, args.batch_size, dry_run=False)
+            print(f"{file_format:<7} re-import (unchanged)  {rate:>10.0f} rows/s  (unchanged {progress.unchanged})")
+
+        if args.memory:
+            small = await dry_run_peak(directory, args.rows, args.batch_size)
+            large = await dry_run_peak(directory, args.rows * 4, args.batch_size)
+            print(f"\npeak traced memory: {small / 1e6:.1f} MB at {args.rows} rows, "
+                  f"{large / 1e6:.1f} MB at {args.rows * 4} rows")
+
+    await client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Job import benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url")
+    parser.add_argument("--database", default="relocateme_job_import_bench")
+    parser.add_argument("--memory", action="store_true", help="compare peak memory at 1x and 4x rows")
+    asyncio.run(main(parser.parse_args()))
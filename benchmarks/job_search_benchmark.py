@@ -0,0 +1,113 @@
+"""Job search latency at scale.
+
+Seeds a throwaway database with synthetic listings (100k by default) and
+times the queries behind /api/jobs/listings: first pages, filtered pages, deep
+cursor pagination, and facet aggregation cold and cached:
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/job_search_benchmark.py --jobs 100000
+
+`--mongo memory` runs against mongomock-motor instead. It has no indexes,
+so use it only to smoke-test the script with a small --jobs.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db_indexes import INDEXES  # noqa: E402
+from job_search import FacetCache, build_job_filter, find_page, upsert_jobs  # noqa: E402
+
+CATEGORIES = ["Hospitality Management", "Hospitality Service", "Hospitality Events", "Retail", "Technology", "Healthcare"]
+JOB_TYPES = ["full-time", "part-time", "contract", "remote"]
+TOWNS = ["Bakewell", "Buxton", "Castleton", "Edale", "Hathersage", "Matlock", "Sheffield", "Manchester"]
+
+
+def synthetic_listing(index: int, rng: random.Random) -> dict:
+    low = rng.randrange(16, 60) * 1000
+    return {
+        "id": f"bench{index:07d}",
+        "title": f"Role {index}",
+        "company": f"Employer {index % 5000}",
+        "location": f"{rng.choice(TOWNS)}, Peak District",
+        "salary_range": f"£{low:,} - £{low + rng.randrange(2, 12) * 1000:,}",
+        "job_type": rng.choice(JOB_TYPES),
+        "category": rng.choice(CATEGORIES),
+        "description": "Synthetic listing",
+        "requirements": [],
+        "benefits": [],
+        "posted_date": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        "application_url": "https://example.com/apply",
+        "visa_support": rng.random() < 0.2,
+    }
+
+
+async def seed(collection, count: int, batch_size: int = 5000):
+    rng = random.Random(7)
+    await collection.drop()
+    await collection.create_indexes(INDEXES["jobs"])
+    for start in range(0, count, batch_size):
+        await upsert_jobs(collection, (synthetic_listing(index, rng) for index in range(start, min(count, start + batch_size))))
+
+
+async def timed(label: str, repeat: int, make_call):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await make_call()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<40} median {statistics.median(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+async def main(args):
+    if args.mongo == "memory":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    collection = client[args.database].jobs
+
+    started = time.perf_counter()
+    await seed(collection, args.jobs)
+    print(f"seeded {args.jobs} listings in {time.perf_counter() - started:.1f} s\n")
+
+    filters = {
+        "first page": build_job_filter(),
+        "category": build_job_filter(category="Hospitality Service"),
+        "location + job_type": build_job_filter(location="buxton", job_type="part-time"),
+        "visa_support": build_job_filter(visa_support=True),
+        "salary 30k-40k": build_job_filter(min_salary=30000, max_salary=40000),
+    }
+    for label, query in filters.items():
+        await timed(f"page of 50: {label}", args.repeat, lambda query=query: find_page(collection, query, 50))
+
+    async def deep_pagination():
+        cursor = None
+        for _ in range(args.pages):
+            _, cursor = await find_page(collection, {}, 50, cursor)
+    await timed(f"{args.pages} consecutive pages via cursor", max(1, args.repeat // 5), deep_pagination)
+
+    for label, query in filters.items():
+        await timed(f"facets (cold): {label}", 1, lambda query=query: FacetCache().get(collection, query))
+    cache = FacetCache()
+    await cache.get(collection, filters["first page"])
+    await timed("facets (cached): first page", args.repeat, lambda: cache.get(collection, filters["first page"]))
+
+    if not args.keep:
+        await client.drop_database(args.database)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Job search benchmark")
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=100, help="pages walked in the deep pagination run")
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url")
+    parser.add_argument("--database", default="relocateme_job_search_bench")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""Per-endpoint JSON encode time: jsonable_encoder + json.dumps vs orjson.
+
+Calls each GET endpoint of the catalog in backend_test.py once, in-process,
+and captures the value its handler returned. It then times both encode paths
+over that value:
+
+- before: FastAPI's default path, jsonable_encoder followed by stdlib json.dumps
+- after: fast_json.dumps (orjson), which the app now uses
+
+Both outputs are decoded and compared, so any encoding difference fails the
+run. Catalog endpoints return pre-encoded bytes and are listed as such.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/json_encode_benchmark.py
+    python benchmarks/json_encode_benchmark.py --mongo memory --repeat 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import fast_json  # noqa: E402
+from backend_test import ENDPOINTS  # noqa: E402
+from load_test import CREDENTIALS, use_in_memory_mongo  # noqa: E402
+
+PATH_PARAMS = {"visa_type": "skilled-worker-visa"}
+
+
+def stdlib_encode(content) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def time_per_call(encode, content, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(content)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def capture_payloads(client: httpx.AsyncClient, headers: dict):
+    """The raw handler return value per endpoint key (None for pre-encoded responses)."""
+    captured = []
+    render = fast_json.FastJSONResponse.render
+
+    def capturing_render(self, content):
+        captured.append(content)
+        return render(self, content)
+
+    fast_json.FastJSONResponse.render = capturing_render
+    payloads = {}
+    try:
+        for key, (_, method, path, expected_status, _) in ENDPOINTS.items():
+            if method != "GET":
+                continue
+            captured.clear()
+            response = await client.get(path.format(**PATH_PARAMS), headers=headers)
+            assert response.status_code == expected_status, (key, response.status_code, response.text)
+            payloads[key] = captured[-1] if captured else None
+    finally:
+        fast_json.FastJSONResponse.render = render
+    return payloads
+
+
+async def main(args):
+    import server
+
+    if args.mongo == "memory":
+        use_in_memory_mongo(server)
+    await server.startup_event()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench/api", timeout=30)
+    try:
+        token = (await client.post("auth/login", json=CREDENTIALS)).json()["access_token"]
+        payloads = await capture_payloads(client, {"Authorization": f"Bearer {token}"})
+    finally:
+        await client.aclose()
+        await server.shutdown_event()
+
+    print(f"\n{'endpoint':<26}{'bytes':>9}{'before us':>12}{'after us':>11}{'speedup':>9}")
+    for key, content in payloads.items():
+        if content is None:
+            print(f"{key:<26}{'pre-encoded':>9}")
+            continue
+        before, after = stdlib_encode(content), fast_json.dumps(content)
+        if json.loads(before) != json.loads(after):
+            raise SystemExit(f"{key}: orjson output differs from the stdlib encoder")
+        before_us = time_per_call(stdlib_encode, content, args.repeat)
+        after_us = time_per_call(fast_json.dumps, content, args.repeat)
+        print(f"{key:<26}{len(before):>9}{before_us:>12.1f}{after_us:>11.1f}{before_us / after_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON encode microbenchmark")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,305 @@
+"""Async load generator for the RelocateMe API.
+
+Reuses the endpoint catalog from backend_test.py and drives it with a pool of
+virtual users, either in-process against the ASGI app or against a running
+server:
+
+    # in-process, against MONGO_URL
+    python benchmarks/load_test.py --users 20 --duration 30 --mix dashboard
+
+    # in-process with an in-memory Mongo stand-in (needs mongomock-motor)
+    python benchmarks/load_test.py --mongo memory
+
+    # a local uvicorn/nginx
+    python benchmarks/load_test.py --base-url http://localhost:8001/api
+
+Throughput and p50/p95/p99 per endpoint are written as JSON (--output), along
+with the app's import and startup time for in-process runs.
+
+The run fails (exit code 1) when it regresses against a baseline:
+
+- the overall throughput drops by more than --tolerance, or
+- an endpoint's p95/p99 grows by more than --tolerance and by more than
+  --min-delta-ms, so scheduler jitter on millisecond endpoints does not count.
+
+The baseline is --baseline, or by default the committed
+benchmarks/baselines/load_test_memory.json. The default baseline only applies
+to runs with the configuration it was recorded with (mix, users, duration,
+target), i.e. the in-memory command above. --write-baseline records the run
+as the baseline instead. With --runs N, the report keeps the worst figures of
+N runs, which makes a steadier baseline:
+
+    python benchmarks/load_test.py --mongo memory --runs 3 --write-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import httpx  # noqa: E402
+
+from backend_test import ENDPOINTS  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test_memory.json")
+BASELINE_CONFIG = ("mix", "users", "duration", "target")
+
+CREDENTIALS = {"username": "relocate_user", "password": "SecurePass2025!"}
+VISA_TYPES = ["skilled-worker-visa", "family-visa", "visitor-visa", "student-visa"]
+STEP_IDS = list(range(1, 40))
+
+# Relative request weights per catalog key
+USER_MIXES: Dict[str, Dict[str, int]] = {
+    "browse": {
+        "resources_all": 4, "jobs_listings": 3, "jobs_featured": 2, "jobs_categories": 1,
+        "visa_requirements": 3, "visa_checklist": 1, "visa_requirement_details": 2, "logistics_providers": 1,
+    },
+    "dashboard": {
+        "dashboard_overview": 5, "timeline_full": 3, "timeline_by_category": 2, "progress_items": 3,
+        "analytics_overview": 2, "analytics_budget": 1, "auth_me": 1,
+    },
+    "progress": {
+        "update_timeline_progress": 4, "timeline_full": 2, "progress_items": 2, "dashboard_overview": 2,
+    },
+}
+USER_MIXES["mixed"] = {
+    key: weight for mix in USER_MIXES.values() for key, weight in mix.items()
+}
+# SPA start-up through the combined endpoint; not part of "mixed"
+USER_MIXES["startup"] = {"bootstrap": 1}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def request_for(key: str, rng: random.Random):
+    _, method, endpoint, _, _ = ENDPOINTS[key]
+    kwargs = {}
+    if key == "visa_requirement_details":
+        endpoint = endpoint.format(visa_type=rng.choice(VISA_TYPES))
+    elif key == "update_timeline_progress":
+        kwargs["json"] = {"step_id": rng.choice(STEP_IDS), "completed": rng.random() < 0.5}
+    return method, f"/{endpoint}", kwargs
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, key: str, elapsed_ms: float, ok: bool):
+        self.latencies.setdefault(key, []).append(elapsed_ms)
+        if not ok:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        total = 0
+        for key, samples in sorted(self.latencies.items()):
+            total += len(samples)
+            endpoints[key] = {
+                "requests": len(samples),
+                "errors": self.errors.get(key, 0),
+                "throughput_rps": len(samples) / duration,
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+            }
+        return {
+            "duration_s": duration,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": total / duration if duration else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def virtual_user(client: httpx.AsyncClient, mix: Dict[str, int], deadline: float, recorder: Recorder, seed: int):
+    rng = random.Random(seed)
+    keys, weights = list(mix), list(mix.values())
+    headers = {}
+    if any(ENDPOINTS[key][4] for key in keys):
+        response = await client.post("/auth/login", json=CREDENTIALS)
+        response.raise_for_status()
+        headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    while time.perf_counter() < deadline:
+        key = rng.choices(keys, weights)[0]
+        method, path, kwargs = request_for(key, rng)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            ok = response.status_code == ENDPOINTS[key][3]
+        except httpx.HTTPError:
+            ok = False
+        recorder.record(key, (time.perf_counter() - started) * 1000, ok)
+
+
+def use_in_memory_mongo(server):
+    """Swap the app's Motor client for mongomock-motor (test-only dependency).
+
+    mongomock has no $bit operator, so a minimal one is registered for the
+    progress-update path.
+    """
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    def bit_updater(doc, field_name, spec):
+        container, key = (doc, int(field_name)) if isinstance(doc, list) else (doc, field_name)
+        value = (container[key] if isinstance(doc, list) else doc.get(field_name)) or 0
+        for operation, operand in spec.items():
+            value = {"and": value & operand, "or": value | operand, "xor": value ^ operand}[operation]
+        container[key] = value
+
+    mongomock.collection._updaters.setdefault("$bit", bit_updater)
+    server.client = AsyncMongoMockClient()
+    server.db = server.client.relocateme
+    server.progress_log_writer.collection = server.db.progress_logs
+
+
+async def run(args) -> dict:
+    mix = USER_MIXES[args.mix]
+    recorder = Recorder()
+    server = None
+
+    cold_start = None
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        import_started = time.perf_counter()
+        import server
+        imported = time.perf_counter()
+
+        if args.mongo == "memory":
+            use_in_memory_mongo(server)
+        await server.startup_event()
+        cold_start = {
+            "import_ms": (imported - import_started) * 1000,
+            "startup_ms": (time.perf_counter() - imported) * 1000,
+        }
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://load-test/api", timeout=30)
+
+    try:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, mix, deadline, recorder, seed=args.seed + index)
+            for index in range(args.users)
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+        if server is not None:
+            await server.shutdown_event()
+
+    report = recorder.report(elapsed)
+    report.update({
+        "users": args.users, "mix": args.mix, "duration": args.duration,
+        "target": args.base_url or f"in-process ({args.mongo} mongo)",
+    })
+    if cold_start is not None:
+        report["cold_start"] = cold_start
+    return report
+
+
+def worst(reports: List[dict]) -> dict:
+    """One report with the lowest throughput and the highest tail latencies and errors of several runs."""
+    combined = json.loads(json.dumps(reports[0]))
+    combined["runs"] = len(reports)
+    combined["throughput_rps"] = min(report["throughput_rps"] for report in reports)
+    for report in reports[1:]:
+        for key, stats in report["endpoints"].items():
+            current = combined["endpoints"].setdefault(key, stats)
+            for metric in ("p95_ms", "p99_ms", "errors"):
+                current[metric] = max(current[metric], stats[metric])
+    return combined
+
+
+def config_mismatch(report: dict, baseline: dict) -> List[str]:
+    return [
+        f"{name} {report.get(name)!r} (baseline: {baseline.get(name)!r})"
+        for name in BASELINE_CONFIG if report.get(name) != baseline.get(name)
+    ]
+
+
+def regressions(report: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.0) -> List[str]:
+    problems = []
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        problems.append(f"throughput {report['throughput_rps']:.1f} rps < baseline {baseline['throughput_rps']:.1f} rps")
+    for key, expected in baseline["endpoints"].items():
+        actual = report["endpoints"].get(key)
+        if actual is None:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if actual[metric] > max(expected[metric] * (1 + tolerance), expected[metric] + min_delta_ms):
+                problems.append(f"{key} {metric} {actual[metric]:.2f} > baseline {expected[metric]:.2f}")
+        if actual["errors"] > expected["errors"]:
+            problems.append(f"{key} errors {actual['errors']} > baseline {expected['errors']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RelocateMe API load test")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--mix", choices=sorted(USER_MIXES), default="mixed")
+    parser.add_argument("--base-url", help="run against a server, e.g. http://localhost:8001/api")
+    parser.add_argument("--mongo", choices=["url", "memory"], default="url",
+                        help="in-process only: MONGO_URL or an in-memory stand-in")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--runs", type=int, default=1, help="repeat the run and report the worst figures")
+    parser.add_argument("--baseline", help=f"baseline report to compare against (default: {DEFAULT_BASELINE} "
+                                           "when the run's configuration matches it)")
+    parser.add_argument("--no-baseline", action="store_true", help="do not compare against any baseline")
+    parser.add_argument("--write-baseline", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0,
+                        help="latency growth below this many ms never counts as a regression")
+    args = parser.parse_args()
+
+    report = worst([asyncio.run(run(args)) for _ in range(args.runs)])
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.write_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w") as handle:
+            handle.write(rendered + "\n")
+        return
+    if args.no_baseline:
+        return
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+    mismatch = config_mismatch(report, baseline)
+    if mismatch and not args.baseline:
+        print(f"No baseline for this configuration ({'; '.join(mismatch)}); not compared", file=sys.stderr)
+        return
+    problems = [f"configuration differs from the baseline: {item}" for item in mismatch]
+    problems += regressions(report, baseline, args.tolerance, args.min_delta_ms)
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
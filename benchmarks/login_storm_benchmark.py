@@ -0,0 +1,80 @@
+"""Latency of unrelated endpoints while a burst of logins is in flight.
+
+Run from the repository root against a reachable MongoDB (MONGO_URL):
+
+    python benchmarks/login_storm_benchmark.py --logins 40
+
+Requests go in-process through the ASGI app. With bcrypt on the password
+hashing pool, p99 of the probe endpoint should stay close to its idle value
+instead of growing by ~250ms per queued login.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import httpx  # noqa: E402
+import server  # noqa: E402
+
+PROBE_ENDPOINT = "/api/visa/requirements"
+CREDENTIALS = {"username": "relocate_user", "password": "SecurePass2025!"}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe(client, stop, samples, interval):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(PROBE_ENDPOINT)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def measure(client, logins, duration, interval):
+    samples = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(client, stop, samples, interval))
+    started = time.perf_counter()
+    if logins:
+        responses = await asyncio.gather(*(client.post("/api/auth/login", json=CREDENTIALS) for _ in range(logins)))
+        assert all(r.status_code == 200 for r in responses), "login failed"
+    remaining = duration - (time.perf_counter() - started)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+    stop.set()
+    await prober
+    return samples, time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=2.0, help="minimum seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between probe requests")
+    args = parser.parse_args()
+
+    await server.startup_event()
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"password hashing workers: {server.password_hasher.max_workers}")
+        for label, logins in (("idle", 0), (f"{args.logins} logins", args.logins)):
+            samples, elapsed = await measure(client, logins, args.duration, args.interval)
+            print(
+                f"{label:>12}: {len(samples):5d} probes in {elapsed:5.2f}s  "
+                f"p50={statistics.median(samples):7.2f}ms  p99={percentile(samples, 99):7.2f}ms  "
+                f"max={max(samples):7.2f}ms"
+            )
+        print(f"hash pool: {server.password_hasher.stats()}")
+    await server.shutdown_event()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
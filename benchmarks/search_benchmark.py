@@ -0,0 +1,83 @@
+"""Query latency of the resource search index as the corpus grows.
+
+Run from the repository root:
+
+    python benchmarks/search_benchmark.py
+
+The real resource catalog (~200 entries) is padded with synthetic resources
+up to 100k entries. Latency per query should stay roughly flat, while the
+old linear substring scan grows with the corpus.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from search_index import ResourceSearchIndex  # noqa: E402
+from server import build_all_resources  # noqa: E402
+
+CORPUS_SIZES = [200, 1_000, 10_000, 100_000]
+QUERIES = ["visa", "peak district", "bank account", "uk sch", "moving", "nhs gp"]
+REPEATS = 200
+
+
+def synthetic_corpus(base, size, seed=42):
+    rng = random.Random(seed)
+    corpus = {category: list(resources) for category, resources in base.items()}
+    categories = list(corpus)
+    count = sum(len(resources) for resources in corpus.values())
+    syllables = ["ka", "lo", "mi", "ren", "dor", "vex", "sul", "tam", "qui", "zo", "bra", "nel"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+    while count < size:
+        name = " ".join(word() for _ in range(3))
+        slug = name.replace(" ", "-")
+        corpus[rng.choice(categories)].append({
+            "name": name.title(),
+            "url": f"https://www.{slug}.example.com",
+            "description": " ".join(word() for _ in range(8)),
+        })
+        count += 1
+    return corpus
+
+
+def linear_scan(corpus, query):
+    query = query.lower()
+    return [
+        resource for resources in corpus.values() for resource in resources
+        if query in resource["name"].lower()
+        or query in resource["description"].lower()
+        or query in resource["url"].lower()
+    ]
+
+
+def time_per_query(fn):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    base = build_all_resources()
+    print(f"{'docs':>8} {'build (s)':>10} {'index p50 (us)':>15} {'scan p50 (us)':>14}")
+    for size in CORPUS_SIZES:
+        corpus = synthetic_corpus(base, size)
+        start = time.perf_counter()
+        index = ResourceSearchIndex(corpus)
+        build_seconds = time.perf_counter() - start
+
+        index_us = statistics.mean(time_per_query(lambda q=q: index.search(q, limit=20)) for q in QUERIES)
+        scan_us = statistics.mean(time_per_query(lambda q=q: linear_scan(corpus, q)) for q in QUERIES[:2])
+        print(f"{len(index):>8} {build_seconds:>10.2f} {index_us:>15.1f} {scan_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Timeline forecast cost: a cold simulation per size and batch size, vs a cache hit.
+
+Runs the forecaster behind /api/timeline/forecast directly on the
+RELOCATION_TIMELINE, with the default duration distributions. Cold runs
+call simulate() with a new seed each time. Hits repeat one forecast(), as a
+dashboard re-opened with unchanged progress does. Nothing touches MongoDB:
+
+    python benchmarks/timeline_forecast_benchmark.py
+    python benchmarks/timeline_forecast_benchmark.py --simulations 10000 100000 --batch-sizes 1024 4096 16384
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import percentile  # noqa: E402
+
+
+def params(simulations, seed=0):
+    import server
+
+    return server.TimelineForecastRequest(simulations=simulations, seed=seed).dict()
+
+
+def cold(forecaster, simulations, iterations):
+    samples = []
+    for seed in range(iterations):
+        started = time.perf_counter()
+        forecaster.simulate([], params(simulations, seed))
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def hits(forecaster, simulations, iterations):
+    request = params(simulations)
+    await forecaster.forecast(0, request)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await forecaster.forecast(0, request)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(args):
+    import server
+    from timeline_forecast import TimelineForecaster
+
+    print(f"\n{'run':<12}{'simulations':>12}{'batch':>7}{'p50 ms':>9}{'p95 ms':>9}")
+    for simulations in args.simulations:
+        for batch_size in args.batch_sizes:
+            forecaster = TimelineForecaster(server.timeline_engine, batch_size=batch_size)
+            cold(forecaster, simulations, 2)
+            samples = cold(forecaster, simulations, args.iterations)
+            print(f"{'cold':<12}{simulations:>12}{batch_size:>7}"
+                  f"{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}")
+        samples = asyncio.run(hits(TimelineForecaster(server.timeline_engine), simulations, args.iterations * 10))
+        print(f"{'cache hit':<12}{simulations:>12}{'':>7}{percentile(samples, 50):>9.3f}{percentile(samples, 95):>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Timeline forecast latency")
+    parser.add_argument("--simulations", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4096])
+    parser.add_argument("--iterations", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""Throughput vs. gunicorn worker count.
+
+Starts the backend under gunicorn (backend/gunicorn.conf.py) with 1, 2, 4, ...
+workers and drives it with several load_test.py processes, so the load
+generator is not the single-core bottleneck:
+
+    python benchmarks/worker_scaling_benchmark.py --workers 1,2,4 --duration 15
+
+Cold start (process launch until /api/health/ready answers 200) is reported
+per run. The backend needs a reachable MongoDB at MONGO_URL: workers load the
+salary index from the jobs collection at startup, and the default `browse`
+mix reads listings from it (`jobs_listings`). Set RELOCATEME_DB_BOOTSTRAPPED=1
+to skip the one-time database setup on a database that already has it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BACKEND = os.path.join(ROOT, "backend")
+LOAD_TEST = os.path.join(ROOT, "benchmarks", "load_test.py")
+
+
+def wait_until_serving(base_url: str, probe: str, timeout: float = 60.0) -> float:
+    """Poll the health probe; returns seconds from now until it answered 200."""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            if httpx.get(f"{base_url}/health/{probe}", timeout=1).status_code == 200:
+                return time.monotonic() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"backend at {base_url} was not {probe} within {timeout}s")
+
+
+def run_load(base_url: str, args) -> dict:
+    users_per_client = max(1, args.users // args.clients)
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = [os.path.join(tmp, f"client-{index}.json") for index in range(args.clients)]
+        procs = [
+            subprocess.Popen([
+                sys.executable, LOAD_TEST, "--base-url", base_url, "--mix", args.mix,
+                "--users", str(users_per_client), "--duration", str(args.duration),
+                "--seed", str(index * 1000), "--output", output,
+            ])
+            for index, output in enumerate(outputs)
+        ]
+        for proc in procs:
+            proc.wait()
+        reports = []
+        for output in outputs:
+            with open(output) as handle:
+                reports.append(json.load(handle))
+
+    endpoints = {}
+    for report in reports:
+        for key, stats in report["endpoints"].items():
+            endpoints[key] = max(endpoints.get(key, 0.0), stats["p95_ms"])
+    return {
+        "throughput_rps": sum(report["throughput_rps"] for report in reports),
+        "requests": sum(report["requests"] for report in reports),
+        "errors": sum(report["errors"] for report in reports),
+        "worst_p95_ms": max(endpoints.values()) if endpoints else 0.0,
+    }
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(1 << power) for power in range(cpus.bit_length()))
+    parser = argparse.ArgumentParser(description="gunicorn worker scaling benchmark")
+    parser.add_argument("--workers", default=default_workers, help="comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=64, help="virtual users across all load clients")
+    parser.add_argument("--clients", type=int, default=max(2, cpus // 2), help="load generator processes")
+    parser.add_argument("--mix", default="browse")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--probe", choices=["ready", "live"], default="ready",
+                        help="health probe that marks the backend as started (live: before the readiness checks pass)")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}/api"
+    results = []
+    for workers in [int(value) for value in args.workers.split(",")]:
+        env = {**os.environ, "WEB_CONCURRENCY": str(workers), "BACKEND_BIND": f"127.0.0.1:{args.port}"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"],
+            cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            cold_start = wait_until_serving(base_url, args.probe)
+            result = run_load(base_url, args)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        result["workers"] = workers
+        result["cold_start_s"] = cold_start
+        results.append(result)
+        print(f"workers={workers:<3} {args.probe} in {cold_start:5.2f} s  {result['throughput_rps']:>9.1f} req/s  "
+              f"worst p95 {result['worst_p95_ms']:7.2f} ms  errors {result['errors']}")
+
+    baseline = results[0]["throughput_rps"] or 1.0
+    print("\nworkers  req/s      speedup")
+    for result in results:
+        print(f"{result['workers']:<8} {result['throughput_rps']:<10.1f} {result['throughput_rps'] / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
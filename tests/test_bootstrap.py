@@ -0,0 +1,94 @@
+"""/api/bootstrap picks its sections from the caller, rejects what it cannot serve and reports failing sections."""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import server  # noqa: E402
+
+USER = server.User(username="relocate_user", email="relocate@example.com", hashed_password="$2b$12$secret", completed_steps=[1])
+
+
+def section_stub(name):
+    async def build(**kwargs):
+        return {"section": name}
+    return build
+
+
+@pytest.fixture(autouse=True)
+def sections(monkeypatch):
+    """Section builders that need no database"""
+    for name in ("get_dashboard_overview", "get_full_timeline", "get_public_timeline", "get_progress_items", "get_job_listings"):
+        monkeypatch.setattr(server, name, section_stub(name))
+
+
+@pytest.fixture
+def signed_in(monkeypatch):
+    async def current_user():
+        return USER
+    monkeypatch.setitem(server.app.dependency_overrides, server.get_optional_user, current_user)
+
+
+def bootstrap(query=""):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            return await client.get(f"/api/bootstrap{query}")
+    return asyncio.run(go())
+
+
+def test_anonymous_callers_get_the_public_sections():
+    response = bootstrap()
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body) == ["jobs", "timeline", "visa"]
+    assert body["timeline"] == {"section": "get_public_timeline"}
+    assert body["visa"] == server.catalog_cache.get("visa_requirements").data
+
+
+def test_signed_in_callers_get_every_section(signed_in):
+    body = bootstrap().json()
+    assert sorted(body) == sorted(server.BOOTSTRAP_SECTIONS)
+    assert body["timeline"] == {"section": "get_full_timeline"}
+
+
+def test_user_sections_need_a_token():
+    response = bootstrap("?sections=jobs,progress")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_unknown_sections_are_rejected(signed_in):
+    response = bootstrap("?sections=jobs,weather")
+    assert response.status_code == 400
+    assert "weather" in response.json()["detail"]
+
+
+def test_failing_sections_are_reported_without_failing_the_others(signed_in, monkeypatch):
+    async def unavailable(**kwargs):
+        raise HTTPException(status_code=503, detail="Job listings unavailable")
+
+    async def broken(**kwargs):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(server, "get_job_listings", unavailable)
+    monkeypatch.setattr(server, "get_dashboard_overview", broken)
+
+    response = bootstrap("?sections=jobs,dashboard,timeline")
+    assert response.status_code == 200
+    assert response.json() == {
+        "timeline": {"section": "get_full_timeline"},
+        "errors": {
+            "jobs": {"status_code": 503, "detail": "Job listings unavailable"},
+            "dashboard": {"status_code": 500, "detail": "Internal server error"},
+        },
+    }
+
+
+def test_user_section_leaves_out_the_password_hash(signed_in):
+    user = bootstrap("?sections=user").json()["user"]
+    assert user["username"] == "relocate_user"
+    assert "hashed_password" not in user
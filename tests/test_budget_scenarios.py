@@ -0,0 +1,122 @@
+"""Budget scenario runs: planned costs, FX, completed steps and cash-flow curves."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from budget_scenarios import BudgetScenarioEngine, BudgetScenarioError, bands  # noqa: E402
+from timeline_engine import TimelineEngine  # noqa: E402
+
+STEPS = [
+    {"id": 1, "category": "Planning", "estimated_days": 10, "dependencies": []},
+    {"id": 2, "category": "Logistics", "estimated_days": 20, "dependencies": [1]},
+    {"id": 3, "category": "Housing", "estimated_days": 40, "dependencies": [1]},
+    {"id": 4, "category": "Housing", "estimated_days": 30, "dependencies": [2, 3]},
+    {"id": 5, "category": "Celebration", "estimated_days": 5, "dependencies": [4]},
+]
+WEIGHTS = {"moving": 0.1, "housing": 0.4, "living": 0.2, "emergency": 0.1}
+CURRENCY = {"moving": "USD", "housing": "GBP", "living": "GBP", "emergency": "GBP"}
+
+
+def engine():
+    lines = {"Planning": "living", "Logistics": "moving", "Housing": "housing"}
+    return BudgetScenarioEngine(STEPS, lines, CURRENCY, WEIGHTS, reference_fx=1.25)
+
+
+def run(completed=(), **options):
+    state = TimelineEngine(STEPS).state(list(completed))
+    options = {"budget_levels": [1000.0], "scenarios": 2000, "seed": 7, "interval_days": 10, **options}
+    return engine().run(state.projection()["finish_days"], state.completed, **options)
+
+
+def test_bands_match_numpy_percentile():
+    values = np.random.default_rng(0).random((3, 501))
+    percentiles = [0, 5, 37.5, 50, 95, 100]
+    expected = np.percentile(values, percentiles, axis=1)
+    result = bands(values, percentiles)
+    for pct, row in zip(percentiles, expected):
+        assert result[f"p{pct:g}"] == pytest.approx(np.round(row, 2).tolist())
+
+
+def test_without_uncertainty_costs_are_the_plan():
+    result = run(fx_volatility=0, cost_uncertainty=0)
+    assert result["total_cost"]["p5"] == result["total_cost"]["p95"] == pytest.approx(700.0)
+    assert result["by_line"] == {
+        "moving": {f"p{pct}": pytest.approx(100.0) for pct in (5, 25, 50, 75, 95)},
+        "housing": {f"p{pct}": pytest.approx(400.0) for pct in (5, 25, 50, 75, 95)},
+        "living": {f"p{pct}": pytest.approx(200.0) for pct in (5, 25, 50, 75, 95)},
+    }
+    level = result["budget_levels"][0]
+    assert level["planned_spend"] == 700.0 and level["reserve"] == 100.0
+
+
+def test_cash_flow_follows_projected_finish_dates():
+    result = run(fx_volatility=0, cost_uncertainty=0)
+    flow = result["cash_flow"]
+    # Finish days: 1 at 10, 2 at 30, 3 at 50, 4 at 80; step 5 carries no cost
+    assert len(flow["dates"]) == 10
+    assert flow["cumulative_spend"]["p50"] == pytest.approx([0, 200, 200, 300, 300, 500, 500, 500, 700, 700])
+    assert flow["remaining_budget"]["p50"][-1] == pytest.approx(300.0)
+
+
+def test_completed_steps_are_paid_on_day_zero_at_plan():
+    result = run(completed=[1, 3], cost_uncertainty=0.5)
+    assert result["cash_flow"]["cumulative_spend"]["p5"][0] == pytest.approx(400.0)
+    assert result["cash_flow"]["cumulative_spend"]["p95"][0] == pytest.approx(400.0)
+
+
+def test_fx_rescales_only_gbp_lines():
+    result = run(fx_rates=[2.5], cost_uncertainty=0)
+    assert result["by_line"]["moving"]["p50"] == pytest.approx(100.0)
+    assert result["by_line"]["housing"]["p50"] == pytest.approx(800.0)
+    assert result["budget_levels"][0]["probability_over_plan"] == 1.0
+    assert result["budget_levels"][0]["probability_over_budget"] == 1.0
+
+
+def test_step_costs_and_budget_levels():
+    result = run(budget_levels=[1000.0, 2000.0], step_costs={3: 40.0}, fx_volatility=0, cost_uncertainty=0)
+    first, second = result["budget_levels"]
+    assert first["scenarios"] == second["scenarios"] == 1000
+    # Step 3 costs 40 GBP (50 USD at the reference rate) at every level instead of its 200/400 share
+    assert first["total_cost"]["p50"] == pytest.approx(550.0)
+    assert second["total_cost"]["p50"] == pytest.approx(1050.0)
+
+
+def test_one_scenario_per_level_is_enough():
+    result = run(budget_levels=[1000.0, 2000.0], scenarios=2)
+    assert [level["scenarios"] for level in result["budget_levels"]] == [1, 1]
+
+
+def test_same_seed_same_result():
+    first, second = run(), run()
+    first.pop("elapsed_ms"), second.pop("elapsed_ms")
+    assert first == second
+
+
+@pytest.mark.parametrize("options", [
+    {"budget_levels": [0]},
+    {"category_weights": {"travel": 0.1}},
+    {"category_weights": {"housing": 0.9}},
+    {"step_costs": {42: 10.0}},
+    {"fx_rates": []},
+    {"percentiles": [101]},
+    {"budget_levels": [1000.0, 2000.0], "scenarios": 1},
+])
+def test_invalid_options(options):
+    with pytest.raises(BudgetScenarioError):
+        run(**options)
+
+
+def test_cash_flow_size_is_capped():
+    capped = BudgetScenarioEngine(STEPS, {"Housing": "housing"}, CURRENCY, WEIGHTS, reference_fx=1.25,
+                                  max_cash_flow_cells=1000)
+    state = TimelineEngine(STEPS).state([])
+    finish_days = state.projection()["finish_days"]
+    # The last step finishes on day 85: 10 dates at 10-day intervals, 86 at daily ones
+    assert len(capped.run(finish_days, (), budget_levels=[1000.0], scenarios=100, seed=1,
+                          interval_days=10)["cash_flow"]["dates"]) == 10
+    with pytest.raises(BudgetScenarioError, match="86 cash-flow dates"):
+        capped.run(finish_days, (), budget_levels=[1000.0], scenarios=100, seed=1, interval_days=1)
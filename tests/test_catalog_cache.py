@@ -0,0 +1,81 @@
+"""Catalog responses: JSON by default, NDJSON when negotiated, ETags per representation."""
+import hashlib
+import json
+import os
+import sys
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from catalog_cache import CatalogCache, chunk_lines  # noqa: E402
+
+CATALOG = {"housing": [{"name": "Rightmove"}, {"name": "Zoopla"}], "empty": [], "total": 2}
+
+cache = CatalogCache()
+cache.register("catalog", lambda: CATALOG)
+app = FastAPI()
+
+
+@app.get("/catalog")
+async def catalog(request: Request):
+    return cache.respond("catalog", request)
+
+
+client = TestClient(app)
+
+
+def test_default_shape_is_unchanged():
+    response = client.get("/catalog")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == CATALOG
+
+
+def test_ndjson_streams_one_line_per_item():
+    response = client.get("/catalog", headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"section": "housing", "item": {"name": "Rightmove"}},
+        {"section": "housing", "item": {"name": "Zoopla"}},
+        {"section": "empty", "value": []},
+        {"section": "total", "value": 2},
+    ]
+    assert client.get("/catalog?format=ndjson").content == response.content
+
+
+def test_etag_is_a_strong_tag_of_the_encoded_body():
+    response = client.get("/catalog")
+    assert response.headers["etag"] == f'"{hashlib.sha256(response.content).hexdigest()[:32]}"'
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert client.get("/catalog").headers["etag"] == response.headers["etag"]
+
+
+def test_if_none_match_returns_304_without_a_body():
+    etag = client.get("/catalog").headers["etag"]
+    response = client.get("/catalog", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert client.get("/catalog", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_if_none_match_uses_the_weak_comparison():
+    etag = client.get("/catalog").headers["etag"]
+    for if_none_match in (f"W/{etag}", f'"stale", W/{etag}', "*"):
+        assert client.get("/catalog", headers={"If-None-Match": if_none_match}).status_code == 304
+    # Without quotes it is a different tag
+    assert client.get("/catalog", headers={"If-None-Match": etag.strip('"')}).status_code == 200
+
+
+def test_etags_differ_per_representation():
+    json_etag = client.get("/catalog").headers["etag"]
+    ndjson_etag = client.get("/catalog?format=ndjson").headers["etag"]
+    assert json_etag != ndjson_etag
+    assert client.get("/catalog?format=ndjson", headers={"If-None-Match": ndjson_etag}).status_code == 304
+    assert client.get("/catalog?format=ndjson", headers={"If-None-Match": json_etag}).status_code == 200
+
+
+def test_chunks_are_bounded():
+    lines = [b"x" * 10 + b"\n"] * 5 + [b"y" * 40 + b"\n"]
+    assert [len(chunk) for chunk in chunk_lines(lines, chunk_size=25)] == [22, 22, 11, 41]
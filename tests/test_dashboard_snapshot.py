@@ -0,0 +1,71 @@
+"""Incrementally advanced dashboard snapshots agree with fresh builds."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from dashboard_snapshot import DashboardSnapshots, progress_fields, snapshot_delta  # noqa: E402
+from progress_mask import category_masks  # noqa: E402
+from timeline_engine import TimelineEngine  # noqa: E402
+
+STEPS = [
+    {"id": 1, "category": "Planning", "estimated_days": 7, "dependencies": []},
+    {"id": 2, "category": "Visa & Legal", "estimated_days": 30, "dependencies": [1]},
+    {"id": 3, "category": "Employment", "estimated_days": 14, "dependencies": [1]},
+    {"id": 4, "category": "Housing", "estimated_days": 10, "dependencies": [2, 3]},
+    {"id": 5, "category": "Visa & Legal", "estimated_days": 5, "dependencies": [4]},
+]
+MASKS = category_masks(STEPS)
+
+
+def snapshots():
+    urgent = MASKS["Visa & Legal"] | MASKS["Employment"]
+    return DashboardSnapshots(TimelineEngine(STEPS), MASKS, urgent, mask_words=1, total_budget=1000.0)
+
+
+def test_empty_progress():
+    snapshot = snapshots().build(0)
+    assert snapshot["completed_steps"] == 0 and snapshot["remaining_urgent"] == 3
+    assert snapshot["current_phase"] == "Planning" and snapshot["next_steps"] == [1]
+    assert snapshot["categories"]["Visa & Legal"] == {"total": 2, "completed": 0, "percentage": 0}
+
+
+def test_advance_matches_build_through_random_toggles():
+    engine = snapshots()
+    rng = random.Random(3)
+    mask, snapshot = 0, engine.build(0, key="user")
+    for _ in range(200):
+        for step_id in rng.sample(range(1, 6), rng.randint(1, 3)):
+            mask ^= 1 << step_id
+        snapshot = engine.advance(snapshot, mask, key="user")
+        assert progress_fields(snapshot) == progress_fields(engine.build(mask))
+    assert engine.is_current(snapshot, mask) and not engine.is_current(snapshot, mask ^ 2)
+
+
+def test_spend_follows_completion():
+    snapshot = snapshots().build(0b111110)
+    assert snapshot["completion_percentage"] == 100
+    assert snapshot["estimated_spent"] == 600.0 and snapshot["remaining_budget"] == 400.0
+    assert snapshot["current_phase"] == "Settlement"
+
+
+def test_delta_lists_changed_steps_and_categories():
+    engine = snapshots()
+    before = engine.build(0b10)
+    after = engine.advance(before, 0b1110)
+    delta = snapshot_delta(before, after)
+    assert delta["type"] == "progress" and delta["steps"] == {"2": True, "3": True}
+    assert set(delta["categories"]) == {"Visa & Legal", "Employment"}
+    assert delta["phase_changed"] is True and delta["current_phase"] == "Housing"
+    assert snapshot_delta(None, after)["type"] == "snapshot"
+
+
+def test_document_snapshot_is_rebuilt_when_its_mask_is_stale():
+    engine = snapshots()
+    current = engine.build(0b110, key="user")
+    user = {"id": "user", "completed_mask": [0b110], "dashboard": current}
+    assert engine.for_document(user) is current
+    # A write that landed after the snapshot was stored
+    user["completed_mask"] = [0b1110]
+    assert progress_fields(engine.for_document(user)) == progress_fields(engine.build(0b1110))
@@ -0,0 +1,72 @@
+"""orjson responses match FastAPI's default encoding and keep route semantics."""
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fast_json import FastJSONResponse, FastJSONRoute, dumps  # noqa: E402
+
+
+class Item(BaseModel):
+    id: str
+    due_date: Optional[datetime] = None
+    created_at: datetime
+
+
+ITEM = Item(id="1", created_at=datetime(2025, 3, 1, 9, 30, 15, 123000))
+
+
+def test_output_matches_jsonable_encoder():
+    content = {
+        "item": ITEM,
+        "items": [ITEM.model_dump()],
+        "at": datetime(2025, 1, 1),
+        "by_step": {1: "done"},
+        "tags": {"a"},
+    }
+    assert json.loads(dumps(content)) == json.loads(json.dumps(jsonable_encoder(content)))
+    assert json.loads(dumps(ITEM)) == {"id": "1", "due_date": None, "created_at": "2025-03-01T09:30:15.123000"}
+    assert dumps({"p50": np.float64(1.5), "curve": np.array([1, 2])}) == b'{"p50":1.5,"curve":[1,2]}'
+
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/item")
+async def get_item():
+    return {"item": ITEM}
+
+
+@router.post("/items", status_code=201)
+def create_item():
+    return ITEM
+
+
+@router.get("/model", response_model=Item)
+async def get_model():
+    return {"id": "2", "created_at": datetime(2025, 1, 1), "extra": "dropped"}
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_routes_encode_directly_and_keep_status_codes():
+    response = client.get("/item")
+    assert response.json()["item"]["created_at"] == "2025-03-01T09:30:15.123000"
+    created = client.post("/items")
+    assert created.status_code == 201 and created.json()["id"] == "1"
+
+
+def test_response_model_still_filters():
+    assert client.get("/model").json() == {"id": "2", "due_date": None, "created_at": "2025-01-01T00:00:00"}
@@ -0,0 +1,72 @@
+"""Readiness reports index failures without gating on them, in one process or passed on to workers."""
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import server  # noqa: E402
+
+
+class PingableDb:
+    async def command(self, name):
+        return {"ok": 1}
+
+
+async def nothing(*args, **kwargs):
+    return None
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """A process whose other readiness checks pass, with the one-time setup steps stubbed out."""
+    monkeypatch.setattr(server, "db", PingableDb())
+    monkeypatch.setattr(server, "catalog_cache", SimpleNamespace(ready=True))
+    monkeypatch.setattr(server, "salary_index", SimpleNamespace(loaded=True))
+    monkeypatch.setattr(server, "progress_log_writer", SimpleNamespace(running=True))
+    for step in ("create_default_user", "migrate_progress_masks", "rebuild_dashboard_snapshots", "seed_sample_jobs"):
+        monkeypatch.setattr(server, step, nothing)
+    monkeypatch.setattr(server, "index_failures", [])
+    for name in (server.DB_BOOTSTRAPPED_ENV, server.INDEX_FAILURES_ENV):
+        # setenv first, so what export_bootstrap_result() writes is undone after the test
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+
+
+def readiness():
+    response = asyncio.run(server.health_ready())
+    return response.status_code, json.loads(response.body)
+
+
+def bootstrap_with(monkeypatch, created):
+    async def ensure_indexes(db):
+        return created
+    monkeypatch.setattr(server, "ensure_indexes", ensure_indexes)
+    asyncio.run(server.bootstrap_database())
+
+
+def test_index_failure_is_reported_but_does_not_fail_readiness(started, monkeypatch):
+    bootstrap_with(monkeypatch, {"users": [], "jobs": ["id_unique"]})
+    status_code, body = readiness()
+    assert status_code == 200
+    assert body["status"] == "ready" and body["index_failures"] == ["users"]
+
+
+def test_workers_report_the_masters_index_result(started, monkeypatch):
+    bootstrap_with(monkeypatch, {"users": ["username_unique"], "jobs": [], "job_imports": []})
+    server.export_bootstrap_result()
+    # A worker forked afterwards starts with nothing but the environment
+    monkeypatch.setattr(server, "index_failures", [])
+    server.inherit_bootstrap_result()
+    assert readiness()[1]["index_failures"] == ["job_imports", "jobs"]
+
+    bootstrap_with(monkeypatch, {"users": ["username_unique"]})
+    server.export_bootstrap_result()
+    server.inherit_bootstrap_result()
+    assert readiness() == (200, {"status": "ready", "checks": {
+        "mongo": True, "catalog_cache": True, "salary_index": True, "progress_log_writer": True,
+    }, "index_failures": []})
@@ -0,0 +1,112 @@
+"""Streaming job import: line splitting, CSV/NDJSON parsing and in-batch dedupe."""
+import asyncio
+import os
+import sys
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from job_import import ImportFormatError, JobImporter, aiter_lines, csv_records, parse_records  # noqa: E402
+
+
+class Listing(BaseModel):
+    id: str
+    title: str
+    company: str
+    location: str = ""
+    salary_range: str = ""
+    category: str = ""
+    benefits: List[str] = []
+    visa_support: bool = False
+
+
+class FailingJobs:
+    """A jobs collection whose bulk writes fail for one document and apply the rest."""
+
+    def find(self, query, projection=None):
+        async def nothing():
+            return
+            yield
+        return nothing()
+
+    async def bulk_write(self, operations, ordered=True):
+        raise BulkWriteError({
+            "nInserted": 0, "nUpserted": len(operations) - 1, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+            "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+        })
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def records(data: bytes, file_format: str):
+    async def collect():
+        return [record async for record in parse_records(chunked(data), file_format)]
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_fields_may_span_chunks_and_lines():
+    data = ('﻿id,title,company,benefits,visa_support\r\n'
+            'a1,"Barista\nweekends","Café ""Edale""",Tips|Meals,yes\r\n'
+            'a2,Chef,Inn,,no\r\n').encode()
+    (line_one, first), (line_two, second) = records(data, "csv")
+    assert (line_one, line_two) == (2, 4)
+    assert first == {"id": "a1", "title": "Barista\nweekends", "company": 'Café "Edale"',
+                     "benefits": ["Tips", "Meals"], "visa_support": True}
+    assert second["benefits"] == [] and second["visa_support"] is False
+
+
+def collect_csv(data: bytes, **limits):
+    async def collect():
+        return [record async for record in csv_records(aiter_lines(chunked(data), 64), **limits)]
+    return asyncio.run(collect())
+
+
+def test_oversized_lines_and_unbalanced_quotes_fail_the_import():
+    with pytest.raises(ImportFormatError, match="line longer than 64"):
+        collect_csv(b"id,title\n" + b"x" * 100)
+    unbalanced = b"id,title\n" + b'a1,"Barista\n' + b"more\n" * 20
+    with pytest.raises(ImportFormatError, match="record starting at line 2"):
+        collect_csv(unbalanced, max_record_lines=10)
+    with pytest.raises(ImportFormatError, match="record starting at line 2"):
+        collect_csv(unbalanced, max_record_chars=50)
+    # Within the limits, a quote closed a few lines later is still one record
+    assert len(collect_csv(b'id,title\na1,"one\ntwo\nthree"\n', max_record_lines=3)) == 1
+
+
+def test_ndjson_reports_unreadable_lines():
+    parsed = records(b'{"id": "a"}\n\nnot json\n[1]\n', "ndjson")
+    assert parsed[0] == (1, {"id": "a"})
+    assert [line for line, row in parsed[1:] if isinstance(row, Exception)] == [3, 4]
+
+
+def test_dry_run_counts_invalid_rows_and_duplicates():
+    data = b"\n".join([
+        b'{"id": "j1", "title": "Chef", "company": "Inn"}',
+        b'{"id": "j2", "title": "Chef", "company": "Inn"}',
+        b'{"id": "j1", "title": "Head chef", "company": "Inn"}',
+        b'{"title": "Porter", "company": "Inn"}',
+        b'{"id": "j4", "company": "Inn"}',
+    ])
+    importer = JobImporter(None, Listing, batch_size=10, dry_run=True)
+    progress = asyncio.run(importer.run(parse_records(chunked(data), "ndjson")))
+    assert (progress.rows, progress.invalid, progress.duplicates) == (5, 1, 2)
+    assert progress.errors[0]["line"] == 5 and "title" in progress.errors[0]["error"]
+
+
+def test_failed_bulk_write_is_recorded_with_partial_counts():
+    data = b"\n".join(b'{"id": "j%d", "title": "Chef %d", "company": "Inn"}' % (n, n) for n in range(3))
+    reported = []
+    importer = JobImporter(FailingJobs(), Listing, batch_size=10, on_progress=reported.append)
+    with pytest.raises(BulkWriteError):
+        asyncio.run(importer.run(parse_records(chunked(data), "ndjson")))
+    summary = importer.progress.to_dict()
+    assert summary["inserted"] == 2 and summary["rows"] == 3
+    assert summary["failure"].startswith("bulk write failed for 1 documents: E11000")
+    assert reported == []
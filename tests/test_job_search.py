@@ -0,0 +1,54 @@
+"""Job search filters, cursors and derived fields."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from job_search import (  # noqa: E402
+    FACET_BUCKET_LIMIT, InvalidCursor, build_job_filter, decode_cursor, encode_cursor, facet_pipeline, job_document,
+    location_keys,
+)
+
+
+def test_location_keys_cover_each_part():
+    assert location_keys("Rowsley, Peak District") == ["rowsley, peak district", "rowsley", "peak district"]
+
+
+def test_job_document_adds_derived_fields():
+    document = job_document({"id": "x", "category": "Hospitality Service", "location": "Edale", "salary_range": "£20,000"})
+    assert document["is_hospitality"] is True
+    assert document["salary_min"] == document["salary_max"] == 20000
+    assert document["location_keys"] == ["edale"]
+
+
+def test_salary_filter_matches_overlapping_ranges():
+    query = build_job_filter(min_salary=25000, max_salary=30000, location="Peak District", visa_support=False)
+    assert query == {
+        "salary_max": {"$gte": 25000},
+        "salary_min": {"$lte": 30000},
+        "location_keys": "peak district",
+        "visa_support": False,
+    }
+
+
+def test_cursor_round_trip_selects_later_listings():
+    cursor = encode_cursor({"posted_date": "2025-01-20", "id": "pd003"})
+    assert decode_cursor(cursor) == {"$or": [
+        {"posted_date": {"$lt": "2025-01-20"}},
+        {"posted_date": "2025-01-20", "id": {"$lt": "pd003"}},
+    ]}
+
+
+@pytest.mark.parametrize("cursor", ["zzz", encode_cursor({"posted_date": 1, "id": "a"})[:-2], "WzEsMl0"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_every_facet_is_capped_to_its_largest_buckets():
+    facets = facet_pipeline({"category": "Hospitality Management"})[1]["$facet"]
+    for name, stages in facets.items():
+        if name != "total":
+            assert stages[-2:] == [{"$sort": {"count": -1, "_id": 1}}, {"$limit": FACET_BUCKET_LIMIT}]
@@ -0,0 +1,69 @@
+"""Buffered log writer: failed flushes are retried, and what still fails is counted as dropped."""
+import asyncio
+import os
+import sys
+
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from log_writer import BufferedLogWriter  # noqa: E402
+
+
+class FlakyLogs:
+    """Fails the first `failures` insert_many calls after storing the first `partial` documents of each."""
+
+    def __init__(self, failures: int, partial: int = 0):
+        self.failures = failures
+        self.partial = partial
+        self.stored = {}
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+        errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in self.stored:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+            elif self.failures and index >= self.partial:
+                errors.append({"index": index, "code": 91, "errmsg": "shutdown in progress"})
+            else:
+                self.stored[document["_id"]] = document
+        failing = self.failures > 0
+        self.failures -= 1
+        if failing and not self.partial:
+            raise AutoReconnect("connection reset")
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+def run(collection, events=5, **options):
+    async def scenario():
+        writer = BufferedLogWriter(collection, batch_size=10, flush_interval=0.01, retry_backoff=0.001, **options)
+        writer.start()
+        await writer.enqueue_many([{"event": number} for number in range(events)])
+        await writer.stop()
+        return writer.stats()
+    return asyncio.run(scenario())
+
+
+def test_transient_failures_are_retried():
+    collection = FlakyLogs(failures=2)
+    stats = run(collection)
+    assert len(collection.stored) == 5
+    assert (stats["written"], stats["retries"], stats["dropped"]) == (5, 2, 0)
+
+
+def test_partial_writes_are_not_duplicated_on_retry():
+    collection = FlakyLogs(failures=1, partial=3)
+    stats = run(collection)
+    assert sorted(document["event"] for document in collection.stored.values()) == [0, 1, 2, 3, 4]
+    assert (stats["written"], stats["retries"], stats["dropped"]) == (5, 1, 0)
+
+
+def test_events_are_dropped_and_counted_after_the_last_retry():
+    collection = FlakyLogs(failures=10)
+    stats = run(collection, max_retries=2)
+    assert collection.stored == {}
+    assert (stats["written"], stats["retries"], stats["dropped"], stats["failed_flushes"]) == (0, 2, 5, 1)
@@ -0,0 +1,141 @@
+"""Request metrics are labelled by route template and rendered as Prometheus text."""
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from metrics import CommandMetrics, HttpMetrics, MetricsMiddleware, MetricsRegistry, SharedMetrics  # noqa: E402
+
+
+def make_app(streaming_routes=()):
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=HttpMetrics(registry), streaming_routes=streaming_routes)
+
+    @app.get("/api/visa/requirements/{visa_type}")
+    async def visa(visa_type: str):
+        return {"visa_type": visa_type}
+
+    @app.get("/api/resources/all")
+    async def resources():
+        return {"resources": ["x" * 100]}
+
+    @app.get("/api/progress/events")
+    async def events():
+        async def body():
+            yield b"event: snapshot\ndata: {}\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app, registry
+
+
+def get_all(app, paths):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for path in paths]
+    return asyncio.run(go())
+
+
+def test_routes_are_labelled_by_template():
+    app, registry = make_app()
+    get_all(app, [
+        "/api/visa/requirements/skilled-worker-visa",
+        "/api/visa/requirements/family-visa",
+        "/api/resources/all",
+        "/api/resources/all",
+        "/no/such/path",
+    ])
+    text = registry.render()
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/visa/requirements/{visa_type}"} 2' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/resources/all"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert "skilled-worker-visa" not in text
+    assert 'http_requests_in_flight{method="GET",route="/api/resources/all"} 0' in text
+
+
+def test_response_sizes_are_recorded():
+    app, registry = make_app()
+    (response,) = get_all(app, ["/api/resources/all"])
+    text = registry.render()
+
+    assert f'http_response_size_bytes_sum{{method="GET",route="/api/resources/all"}} {len(response.content)}' in text
+    assert '# TYPE http_response_size_bytes histogram' in text
+
+
+def test_mongo_commands_are_timed_by_collection_and_operation():
+    registry = MetricsRegistry()
+    listener = CommandMetrics(registry)
+
+    def event(name, command, **extra):
+        return SimpleNamespace(command_name=name, command=command, connection_id=("localhost", 27017),
+                               request_id=extra.pop("request_id", 1), duration_micros=1500, **extra)
+
+    listener.started(event("find", {"find": "users", "filter": {}}))
+    listener.succeeded(event("find", None))
+    listener.started(event("getMore", {"getMore": 42, "collection": "progress_logs"}, request_id=2))
+    listener.failed(event("getMore", None, request_id=2))
+
+    assert listener.duration.count("users", "find") == 1
+    assert listener.duration.count("progress_logs", "getMore") == 1
+    assert 'mongo_command_failures_total{collection="progress_logs",operation="getMore"} 1' in registry.render()
+
+
+def test_streaming_routes_are_only_counted():
+    app, registry = make_app(streaming_routes=("/api/progress/events",))
+    get_all(app, ["/api/progress/events", "/api/resources/all"])
+    text = registry.render()
+
+    stream_lines = [line for line in text.splitlines() if "/api/progress/events" in line]
+    assert stream_lines == ['http_requests_total{method="GET",route="/api/progress/events",status="200"} 1']
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/resources/all"} 1' in text
+
+
+def worker_registry(requests):
+    registry = MetricsRegistry()
+    metrics = HttpMetrics(registry)
+    for _ in range(requests):
+        metrics.requests.inc("GET", "/api/resources/all", "200")
+        metrics.latency.observe(0.003, "GET", "/api/resources/all")
+    metrics.in_flight.inc("GET", "/api/resources/all")
+    return registry
+
+
+def test_workers_are_summed_through_the_shared_directory(tmp_path):
+    # Another worker's snapshot, as its periodic write leaves it
+    other = SharedMetrics(worker_registry(3), str(tmp_path))
+    (tmp_path / "99999.json").write_text(json.dumps(other.registry.snapshot()))
+    shared = SharedMetrics(worker_registry(2), str(tmp_path))
+    text = shared.render()
+
+    assert 'http_requests_total{method="GET",route="/api/resources/all",status="200"} 5' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/resources/all",le="0.005"} 5' in text
+    assert 'http_requests_in_flight{method="GET",route="/api/resources/all"} 2' in text
+
+    SharedMetrics.mark_process_dead(str(tmp_path), 99999)
+    text = shared.render()
+    assert 'http_requests_total{method="GET",route="/api/resources/all",status="200"} 5' in text
+    assert 'http_requests_in_flight{method="GET",route="/api/resources/all"} 1' in text
+
+
+def test_periodic_snapshot_is_written_and_ignored_by_its_own_process(tmp_path):
+    shared = SharedMetrics(worker_registry(1), str(tmp_path), interval=0.01)
+
+    async def scenario():
+        shared.start()
+        shared.registry.counter("extra_total", "Counted after start.").inc()
+        await asyncio.sleep(0.05)
+        await shared.stop()
+
+    asyncio.run(scenario())
+    snapshot = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+    assert snapshot["extra_total"] == {"kind": "counter", "series": [[[], 1.0]]}
+    assert 'http_requests_total{method="GET",route="/api/resources/all",status="200"} 1' in shared.render()
@@ -0,0 +1,42 @@
+"""Stats and metrics are served outside /api and require the ops token when one is configured; job imports always do."""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import server  # noqa: E402
+
+
+def get(path, token=None, method="GET"):
+    async def go():
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+            return await client.request(method, path, headers=headers)
+    return asyncio.run(go())
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/stats/password-hashing", "/stats/timeline-forecast"])
+def test_ops_token_is_required_when_configured(monkeypatch, path):
+    monkeypatch.setattr(server, "OPS_TOKEN", "s3cret")
+    assert get(path).status_code == 401
+    assert get(path, token="wrong").status_code == 401
+    assert get(path, token="s3cret").status_code == 200
+
+
+def test_stats_are_not_on_the_public_api():
+    assert get("/api/stats/password-hashing").status_code == 404
+    assert get("/api/cache/stats").status_code == 404
+
+
+def test_job_imports_need_the_ops_token(monkeypatch):
+    monkeypatch.setattr(server, "OPS_TOKEN", None)
+    assert get("/api/jobs/import", method="POST").status_code == 403
+    assert get("/api/jobs/imports/x").status_code == 403
+    monkeypatch.setattr(server, "OPS_TOKEN", "s3cret")
+    # A user's JWT is not the ops token
+    assert get("/api/jobs/import", token="a.user.jwt", method="POST").status_code == 401
+    assert get("/api/jobs/imports/x").status_code == 401
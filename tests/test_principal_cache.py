@@ -0,0 +1,47 @@
+"""A principal read before its user was invalidated is never put back into the cache."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from principal_cache import PrincipalCache  # noqa: E402
+
+
+def test_read_that_raced_an_invalidation_is_not_cached():
+    cache = PrincipalCache()
+    version = cache.version()  # a GET reads the user...
+    cache.invalidate("alice")  # ...a progress write lands...
+    cache.put("alice", 1, "old alice", version)  # ...and the GET finishes with the old document
+    assert cache.get("alice", 1) is None
+    assert cache.stats()["stale_puts"] == 1
+
+    cache.put("alice", 1, "new alice", cache.version())
+    assert cache.get("alice", 1) == "new alice"
+
+
+def test_invalidating_another_user_does_not_block_puts():
+    cache = PrincipalCache()
+    version = cache.version()
+    cache.invalidate("bob")
+    cache.put("alice", 1, "alice", version)
+    assert cache.get("alice", 1) == "alice"
+
+
+def test_forgotten_invalidations_fail_safe():
+    cache = PrincipalCache(max_entries=2)
+    version = cache.version()
+    for username in ("alice", "bob", "carol"):
+        cache.invalidate(username)
+    # alice's stamp is no longer kept, so a read from before it cannot be trusted
+    cache.put("alice", 1, "old alice", version)
+    assert cache.get("alice", 1) is None
+    cache.put("dave", 1, "dave", cache.version())
+    assert cache.get("dave", 1) == "dave"
+
+
+def test_clear_blocks_reads_in_flight():
+    cache = PrincipalCache()
+    version = cache.version()
+    cache.clear()
+    cache.put("alice", 1, "old alice", version)
+    assert cache.get("alice", 1) is None
@@ -0,0 +1,122 @@
+"""Parallel progress toggles must not lose writes.
+
+Needs a reachable MongoDB at MONGO_URL; the test is skipped otherwise. It
+works on a throwaway user, so the default account's progress is untouched.
+"""
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import httpx  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+import server  # noqa: E402
+from progress_mask import steps_to_mask, words_to_mask  # noqa: E402
+
+
+def mongo_available():
+    try:
+        MongoClient(server.MONGO_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not mongo_available(), reason="MongoDB is not reachable")
+
+ALL_STEP_IDS = [step["id"] for step in server.RELOCATION_TIMELINE]
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def api(loop):
+    username = f"concurrency_{uuid.uuid4().hex[:8]}"
+    password = "Concurrency2025!"
+
+    async def setup():
+        await server.startup_event()
+        user = server.User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password=server.get_password_hash(password),
+            completed_mask=server.mask_to_words(0, server.MASK_WORDS),
+        )
+        await server.db.users.insert_one(user.dict())
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+        response = await client.post("/api/auth/login", json={"username": username, "password": password})
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        return client, user
+
+    client, user = loop.run_until_complete(setup())
+    yield client, username
+    loop.run_until_complete(client.aclose())
+    loop.run_until_complete(server.db.users.delete_one({"username": username}))
+    loop.run_until_complete(server.db.progress_logs.delete_many({"user_id": user.id}))
+    loop.run_until_complete(server.shutdown_event())
+
+
+def stored_progress(loop, username):
+    user = loop.run_until_complete(server.db.users.find_one({"username": username}))
+    return sorted(user["completed_steps"]), words_to_mask(user["completed_mask"])
+
+
+def toggle_all(loop, client, step_ids, completed):
+    async def fire():
+        return await asyncio.gather(*(
+            client.post("/api/timeline/update-progress", json={"step_id": step_id, "completed": completed})
+            for step_id in step_ids
+        ))
+
+    responses = loop.run_until_complete(fire())
+    assert all(response.status_code == 200 for response in responses)
+
+
+def test_parallel_toggles_are_not_lost(loop, api):
+    client, username = api
+
+    toggle_all(loop, client, ALL_STEP_IDS, True)
+    steps, mask = stored_progress(loop, username)
+    assert steps == ALL_STEP_IDS
+    assert mask == steps_to_mask(ALL_STEP_IDS)
+
+    odd_steps = [step_id for step_id in ALL_STEP_IDS if step_id % 2]
+    toggle_all(loop, client, odd_steps, False)
+    steps, mask = stored_progress(loop, username)
+    expected = [step_id for step_id in ALL_STEP_IDS if step_id % 2 == 0]
+    assert steps == expected
+    assert mask == steps_to_mask(expected)
+
+
+def test_parallel_batches_are_not_lost(loop, api):
+    client, username = api
+
+    async def fire():
+        reset = await client.post("/api/timeline/update-progress/batch", json={
+            "updates": [{"step_id": step_id, "completed": False} for step_id in ALL_STEP_IDS]
+        })
+        assert reset.status_code == 200
+        chunks = [ALL_STEP_IDS[i:i + 5] for i in range(0, len(ALL_STEP_IDS), 5)]
+        return await asyncio.gather(*(
+            client.post("/api/timeline/update-progress/batch", json={
+                "updates": [{"step_id": step_id, "completed": True} for step_id in chunk]
+            })
+            for chunk in chunks
+        ))
+
+    responses = loop.run_until_complete(fire())
+    assert all(response.status_code == 200 for response in responses)
+    steps, mask = stored_progress(loop, username)
+    assert steps == ALL_STEP_IDS
+    assert mask == steps_to_mask(ALL_STEP_IDS)
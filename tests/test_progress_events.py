@@ -0,0 +1,162 @@
+"""Progress event fan-out and the SSE stream framing."""
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from principal_cache import PrincipalCache  # noqa: E402
+from progress_events import MongoBackend, ProgressBroker  # noqa: E402
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+
+
+def events(body: bytes):
+    parsed = []
+    for block in body.decode().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith((":", "retry")))
+        parsed.append((lines["event"], json.loads(lines["data"])) if lines else "keepalive")
+    return parsed
+
+
+async def collect(broker, subscription, initial):
+    return b"".join([chunk async for chunk in broker.stream(subscription, initial)])
+
+
+def test_stream_delivers_own_events_then_ends():
+    async def scenario():
+        broker = ProgressBroker(heartbeat_seconds=0.05, max_stream_seconds=0.2)
+        subscription = broker.subscribe("u1")
+        stream = asyncio.create_task(collect(broker, subscription, {"type": "snapshot", "completed_steps": 0}))
+        await asyncio.sleep(0.01)
+        await broker.publish("u1", {"type": "progress", "completed_steps": 1})
+        await broker.publish("u2", {"type": "progress", "completed_steps": 7})
+        body = await stream
+        return broker, body
+
+    broker, body = asyncio.run(scenario())
+    parsed = events(body.rstrip(b"\n"))
+    assert parsed[:2] == [("snapshot", {"type": "snapshot", "completed_steps": 0}),
+                          ("progress", {"type": "progress", "completed_steps": 1})]
+    assert "keepalive" in parsed[2:]
+    assert broker.stats()["subscriptions"] == 0 and broker.stats()["delivered"] == 1
+
+
+def test_lagging_subscriber_is_told_to_resync():
+    async def scenario():
+        broker = ProgressBroker(max_queue=2, heartbeat_seconds=0.05, max_stream_seconds=0.1)
+        subscription = broker.subscribe("u1")
+        for count in range(5):
+            await broker.publish("u1", {"type": "progress", "completed_steps": count})
+        body = await collect(broker, subscription, {"type": "snapshot"})
+        return broker, body
+
+    broker, body = asyncio.run(scenario())
+    assert [event[0] for event in events(body.rstrip(b"\n")) if event != "keepalive"] == ["snapshot", "resync"]
+    assert broker.dropped == 3
+
+
+class Relay:
+    """Stands in for the capped collection: one ordered channel that every other worker reads."""
+
+    def __init__(self):
+        self.workers = []
+
+
+class RelayBackend:
+    name = "relay"
+
+    def __init__(self, relay):
+        self.relay = relay
+        relay.workers.append(self)
+
+    async def start(self, deliver, invalidate):
+        self.deliver, self.invalidate_here = deliver, invalidate
+
+    async def publish(self, user_id, event):
+        for worker in self.relay.workers:
+            if worker is not self:
+                worker.deliver(user_id, event)
+
+    async def invalidate(self, cache, key):
+        for worker in self.relay.workers:
+            if worker is not self:
+                worker.invalidate_here(cache, key)
+
+    async def stop(self):
+        pass
+
+
+def worker(backend):
+    broker = ProgressBroker(heartbeat_seconds=0.05, max_stream_seconds=0.1)
+    cache = PrincipalCache()
+    broker.on_invalidate("principal", cache.invalidate)
+    return broker, cache, backend
+
+
+def test_a_write_in_one_worker_invalidates_the_others_before_their_events():
+    async def scenario():
+        relay = Relay()
+        (writer, _, _), (reader, reader_cache, _) = workers = [worker(RelayBackend(relay)) for _ in range(2)]
+        for broker, _, backend in workers:
+            await broker.start(backend)
+        reader_cache.put("alice", 1, "alice before", reader_cache.version())
+        in_flight = reader_cache.version()  # a GET on the reader that has not finished yet
+        subscription = reader.subscribe("alice-id")
+
+        # What store_progress_snapshot does on the writer
+        await writer.invalidate("principal", "alice")
+        assert reader_cache.get("alice", 1) is None
+        await writer.publish("alice-id", {"type": "progress", "completed_steps": 1})
+
+        reader_cache.put("alice", 1, "alice before", in_flight)
+        assert reader_cache.get("alice", 1) is None
+        assert (await subscription.next(0.1))["completed_steps"] == 1
+        return writer.stats(), reader.stats()
+
+    writer_stats, reader_stats = asyncio.run(scenario())
+    assert (writer_stats["invalidations"], reader_stats["relayed_invalidations"]) == (1, 1)
+
+
+def mongo_available():
+    try:
+        MongoClient(MONGO_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+@pytest.mark.skipif(not mongo_available(), reason="MongoDB is not reachable")
+def test_mongo_relay_between_two_workers():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def scenario():
+        client = AsyncIOMotorClient(MONGO_URL)
+        database = client[f"progress_events_{uuid.uuid4().hex[:8]}"]
+        workers = [worker(MongoBackend(database, retry_seconds=0.05)) for _ in range(2)]
+        try:
+            for broker, _, backend in workers:
+                await broker.start(backend)
+            (writer, _, _), (reader, reader_cache, _) = workers
+            reader_cache.put("alice", 1, "alice before", reader_cache.version())
+            subscription = reader.subscribe("alice-id")
+
+            await writer.invalidate("principal", "alice")
+            await writer.publish("alice-id", {"type": "progress", "completed_steps": 1})
+            event = await subscription.next(5)
+            # Relayed in order: the principal was dropped before the event arrived
+            assert reader_cache.get("alice", 1) is None
+            assert event["completed_steps"] == 1
+        finally:
+            for broker, _, _ in workers:
+                await broker.stop()
+            await client.drop_database(database.name)
+            client.close()
+
+    asyncio.run(scenario())
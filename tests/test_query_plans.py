@@ -0,0 +1,66 @@
+"""Hot queries must be served from an index, never a collection scan.
+
+Needs a reachable MongoDB at MONGO_URL; the test is skipped otherwise.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from db_indexes import INDEXES, ensure_indexes, find_collection_scans  # noqa: E402
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+TEST_DB = "relocateme_query_plans"
+
+
+def mongo_available():
+    try:
+        MongoClient(MONGO_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not mongo_available(), reason="MongoDB is not reachable")
+
+
+@pytest.fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def db(run):
+    client = AsyncIOMotorClient(MONGO_URL)
+    yield client[TEST_DB]
+    run(client.drop_database(TEST_DB))
+    client.close()
+
+
+def test_ensure_indexes_is_idempotent(run, db):
+    async def scenario():
+        await ensure_indexes(db)
+        await ensure_indexes(db)
+        return {name: await db[name].index_information() for name in INDEXES}
+
+    info = run(scenario())
+    assert info["users"]["username_unique"]["unique"] is True
+    assert info["password_resets"]["expires_at_ttl"]["expireAfterSeconds"] == 0
+    assert "user_id_timestamp" in info["progress_logs"]
+
+
+def test_hot_queries_do_not_collscan(run, db):
+    async def scenario():
+        await ensure_indexes(db)
+        return await find_collection_scans(db)
+
+    assert run(scenario()) == []
@@ -0,0 +1,63 @@
+"""Requests are profiled only when asked to, and profiles land as folded stacks."""
+import asyncio
+import os
+import sys
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from request_profiler import ProfilingMiddleware, RequestProfiler  # noqa: E402
+
+
+def make_app(profiler):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/api/progress/items")
+    async def items():
+        await asyncio.sleep(0.02)
+        return {"total": sum(range(200000))}
+
+    return app
+
+
+def get(app, headers=None):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/progress/items", headers=headers)
+    return asyncio.run(go())
+
+
+def test_disabled_by_default(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    response = get(make_app(profiler), headers={"X-Profile-Token": "anything"})
+
+    assert not profiler.enabled
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_admin_header_writes_folded_profile(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), admin_token="secret")
+    app = make_app(profiler)
+
+    assert "x-profile-id" not in get(app, headers={"X-Profile-Token": "wrong"}).headers
+    response = get(app, headers={"X-Profile-Token": "secret"})
+
+    profile_id = response.headers["x-profile-id"]
+    with open(tmp_path / f"{profile_id}.folded") as handle:
+        lines = handle.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    # The awaited sleep is attributed to the handler, not lost in the event loop
+    assert any("items (" in line and "[await]" in line for line in lines)
+
+
+def test_sample_rate_profiles_without_header(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1.0)
+    response = get(make_app(profiler))
+
+    assert "x-profile-id" in response.headers
+    assert profiler.profiles_written == 1
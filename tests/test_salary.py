@@ -0,0 +1,91 @@
+"""Salary parsing and the sorted salary index."""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from salary_index import SalaryIndex  # noqa: E402
+from salary_parser import parse_salary  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("£22,000 - £26,000 + tips", (22000, 26000, "GBP", "year", ["tips"])),
+    ("£25k - £30k", (25000, 30000, "GBP", "year", [])),
+    ("£11.50/hour + £200-400 weekly tips", (22425, 22425, "GBP", "hour", ["£200-400 weekly tips"])),
+    ("$500 per week", (26000, 26000, "USD", "week", [])),
+    ("Competitive + benefits", (None, None, None, "year", ["benefits"])),
+])
+def test_parse_salary(text, expected):
+    parsed = parse_salary(text)
+    assert (parsed["salary_min"], parsed["salary_max"], parsed["salary_currency"],
+            parsed["salary_period"], parsed["salary_extras"]) == expected
+
+
+def listing(listing_id, low, high, currency="GBP"):
+    return {"id": listing_id, "salary_min": low, "salary_max": high, "salary_currency": currency}
+
+
+def test_stats_follow_upserts_and_removals():
+    index = SalaryIndex()
+    index.load([listing("a", 20000, 24000), listing("b", 30000, 30000), listing("c", 1000, 2000, "USD")])
+    assert len(index) == 2
+    assert index.average() == 26000
+
+    index.upsert(listing("c", 40000, 40000))
+    index.upsert(listing("a", 18000, 18000))
+    assert index.stats()["count"] == 3
+    assert index.average() == pytest.approx(29333.33, abs=0.01)
+    assert index.percentile(50) == 30000
+
+    index.remove("b")
+    assert (index.average(), index.percentile(50)) == (29000, 18000)
+
+
+def test_histogram_and_range_counts():
+    index = SalaryIndex()
+    index.load([listing(str(n), amount, amount) for n, amount in enumerate([19000, 21000, 22000, 25000, 31000])])
+
+    assert index.count_between(20000, 25000) == 3
+    assert [(bucket["min"], bucket["count"]) for bucket in index.histogram(5000)] == [
+        (15000, 1), (20000, 2), (25000, 1), (30000, 1),
+    ]
+    assert [bucket["count"] for bucket in index.histogram(5000, 20000, 25000)] == [2, 1]
+    with pytest.raises(ValueError):
+        index.histogram(1, 0, 1000)
+
+
+class SlowJobs:
+    """A jobs collection whose find() answers with the listings as they were when it was called."""
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.finds = 0
+
+    def find(self, query, projection):
+        self.finds += 1
+        snapshot = list(self.listings)
+
+        async def results():
+            await asyncio.sleep(0.01)
+            for document in snapshot:
+                yield document
+        return results()
+
+
+def test_forced_refresh_during_a_reload_reloads_again():
+    async def scenario():
+        index = SalaryIndex(refresh_seconds=60)
+        jobs = SlowJobs([listing("a", 20000, 20000)])
+        index.refresh_if_stale(jobs)
+        await asyncio.sleep(0)
+        # Another worker writes a listing while the first reload is reading
+        jobs.listings.append(listing("b", 30000, 30000))
+        index.refresh_if_stale(jobs, force=True)
+        await index._refresh_task
+        return index, jobs
+
+    index, jobs = asyncio.run(scenario())
+    assert (jobs.finds, index.average()) == (2, 25000)
@@ -0,0 +1,41 @@
+"""Resource search: prefix expansion is capped by document frequency and reports truncation."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import search_index  # noqa: E402
+from search_index import ResourceSearchIndex  # noqa: E402
+
+
+def catalog(terms):
+    """One resource per (term, copies): the term appears in `copies` resources."""
+    resources = [
+        {"name": f"{term} service", "url": "https://example.org", "description": "relocation help"}
+        for term, copies in terms for _ in range(copies)
+    ]
+    return {"services": resources}
+
+
+def test_short_prefix_within_the_cap_is_complete():
+    index = ResourceSearchIndex(catalog([("movers", 2), ("moving", 1)]))
+    results, total, truncated = index.search("mov")
+    assert (total, truncated) == (3, False)
+    assert len(results) == 3
+
+
+def test_capped_prefix_keeps_the_most_frequent_terms_and_says_so(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_PREFIX_EXPANSIONS", 2)
+    # Alphabetically "paa" and "pab" come first, but "pay" and "paz" are in more resources
+    index = ResourceSearchIndex(catalog([("paa", 1), ("pab", 1), ("pay", 3), ("paz", 4)]))
+    results, total, truncated = index.search("pa")
+    assert (total, truncated) == (7, True)
+    assert {result["name"].split()[0] for result in results} == {"pay", "paz"}
+    # A longer prefix fits under the cap again
+    assert index.search("paa")[1:] == (1, False)
+
+
+def test_truncation_is_reported_even_when_another_token_matches_nothing(monkeypatch):
+    monkeypatch.setattr(search_index, "MAX_PREFIX_EXPANSIONS", 1)
+    index = ResourceSearchIndex(catalog([("abc", 1), ("abd", 1)]))
+    assert index.search("ab zzz") == ([], 0, True)
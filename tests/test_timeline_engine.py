@@ -0,0 +1,55 @@
+"""Keyed progress states follow a user's mask by applying only the steps that flipped."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from progress_mask import mask_to_steps, steps_to_mask  # noqa: E402
+from timeline_engine import ProgressState, TimelineEngine  # noqa: E402
+
+STEPS = [
+    {"id": 1, "category": "Planning", "estimated_days": 7, "dependencies": []},
+    {"id": 2, "category": "Visa & Legal", "estimated_days": 30, "dependencies": [1]},
+    {"id": 3, "category": "Employment", "estimated_days": 14, "dependencies": [1]},
+    {"id": 4, "category": "Housing", "estimated_days": 10, "dependencies": [2, 3]},
+    {"id": 5, "category": "Travel", "estimated_days": 5, "dependencies": [4]},
+]
+
+
+def summary(state):
+    return (sorted(state.completed), state.unmet, sorted(state.unblocked), state.projection())
+
+
+def test_keyed_state_matches_a_fresh_one_through_random_toggles():
+    engine = TimelineEngine(STEPS)
+    rng = random.Random(11)
+    mask = 0
+    for _ in range(200):
+        for step_id in rng.sample(range(1, 6), rng.randint(1, 3)):
+            mask ^= 1 << step_id
+        keyed = engine.state_for_mask(mask, key="user")
+        assert summary(keyed) == summary(engine.state(mask_to_steps(mask)))
+        assert keyed.mask == mask
+
+
+def test_only_flipped_steps_are_marked(monkeypatch):
+    engine = TimelineEngine(STEPS)
+    state = engine.state_for_mask(steps_to_mask([1, 2, 3]), key="user")
+    projection = state.projection()
+    marked = []
+    original = ProgressState.mark
+    monkeypatch.setattr(ProgressState, "mark", lambda self, step_id, completed: (
+        marked.append((step_id, completed)), original(self, step_id, completed)))
+
+    assert engine.state_for_mask(steps_to_mask([1, 2, 3]), key="user").projection() is projection
+    assert marked == []
+    engine.state_for_mask(steps_to_mask([1, 3, 4]), key="user")
+    assert marked == [(2, False), (4, True)]
+
+
+def test_steps_outside_the_timeline_are_ignored():
+    engine = TimelineEngine(STEPS)
+    state = engine.state_for_mask(steps_to_mask([1, 42]), key="user")
+    assert sorted(state.completed) == [1]
+    assert engine.state([1, 42], key="user") is state and sorted(state.completed) == [1]
@@ -0,0 +1,110 @@
+"""Monte Carlo timeline forecasts agree with the critical path and are cached per mask and parameters."""
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from progress_mask import steps_to_mask  # noqa: E402
+from timeline_engine import TimelineEngine  # noqa: E402
+from timeline_forecast import ForecastParameterError, TimelineForecaster  # noqa: E402
+
+# 1 -> (2, 3) -> 4 -> 5, with 6 hanging off 1; the branch through 2 is the longer one
+STEPS = [
+    {"id": 1, "category": "Planning", "estimated_days": 10, "dependencies": []},
+    {"id": 2, "category": "Visa & Legal", "estimated_days": 40, "dependencies": [1]},
+    {"id": 3, "category": "Housing", "estimated_days": 20, "dependencies": [1]},
+    {"id": 4, "category": "Travel", "estimated_days": 5, "dependencies": [2, 3]},
+    {"id": 5, "category": "Housing", "estimated_days": 15, "dependencies": [4]},
+    {"id": 6, "category": "Planning", "estimated_days": 3, "dependencies": [1]},
+]
+FIXED = {"simulations": 500, "default": {"distribution": "fixed"}}
+
+
+def forecaster(**options):
+    return TimelineForecaster(TimelineEngine(STEPS), **options)
+
+
+def criticality(forecast):
+    return {step["id"]: step["criticality"] for step in forecast["criticality"]}
+
+
+def test_fixed_durations_reproduce_the_critical_path():
+    forecast = forecaster().simulate([], FIXED)
+    assert forecast["deterministic_days"] == 70
+    assert forecast["percentiles"] == {"p50": 70, "p80": 70, "p95": 70}
+    assert forecast["probability_on_time"] == 1.0
+    assert criticality(forecast) == {1: 1.0, 2: 1.0, 4: 1.0, 5: 1.0, 3: 0.0, 6: 0.0}
+
+
+def test_deterministic_days_match_the_projection_for_any_progress():
+    engine = TimelineEngine(STEPS)
+    rng = random.Random(5)
+    for _ in range(30):
+        completed = [step["id"] for step in STEPS if rng.random() < 0.4]
+        forecast = TimelineForecaster(engine).simulate(completed, FIXED)
+        projection = engine.state(completed).projection()
+        assert forecast["deterministic_days"] == projection["remaining_days"]
+        assert {step["id"] for step in forecast["criticality"]} == set(projection["finish_days"])
+        if projection["finish_days"]:
+            assert forecast["percentiles"]["p50"] == projection["remaining_days"]
+
+
+def test_uncertainty_spreads_completion_and_criticality():
+    params = {"simulations": 4000, "seed": 3, "default": {"distribution": "uniform", "low": 0.5, "high": 1.5},
+              "steps": {"2": {"distribution": "uniform", "low": 0.25, "high": 0.75}}}
+    forecast = forecaster(batch_size=1000).simulate([], params)
+    # Step 2 now takes 10-30 days against step 3's 10-30: either branch can be the critical one
+    assert 0.3 < criticality(forecast)[2] < 0.7
+    assert criticality(forecast)[2] + criticality(forecast)[3] == pytest.approx(1.0, abs=0.01)
+    assert criticality(forecast)[1] == criticality(forecast)[5] == 1.0
+    assert forecast["percentiles"]["p50"] < forecast["percentiles"]["p80"] < forecast["percentiles"]["p95"]
+
+
+def test_step_overrides_category_overrides_default():
+    params = {"simulations": 200, "default": {"distribution": "fixed"},
+              "categories": {"Housing": {"distribution": "uniform", "low": 2, "high": 2}},
+              "steps": {"5": {"distribution": "fixed"}}}
+    forecast = forecaster().simulate([], params)
+    # Step 3 doubles to 40 days and ties with step 2; step 5 keeps its 15 days
+    assert forecast["percentiles"]["p50"] == 70
+    assert criticality(forecast)[3] == criticality(forecast)[2] == 1.0
+
+
+def test_same_seed_same_forecast():
+    params = {"simulations": 1000, "seed": 11}
+    first, second = forecaster().simulate([], params), forecaster().simulate([], params)
+    first.pop("elapsed_ms"), second.pop("elapsed_ms")
+    assert first == second
+
+
+def test_cache_per_mask_and_parameters():
+    cache = forecaster()
+
+    async def scenario():
+        first, cached = await cache.forecast(steps_to_mask([1]), FIXED)
+        assert not cached
+        again, cached = await cache.forecast(steps_to_mask([1]), FIXED)
+        assert cached and again is first
+        _, cached = await cache.forecast(steps_to_mask([1, 2]), FIXED)
+        assert not cached
+        _, cached = await cache.forecast(steps_to_mask([1]), {**FIXED, "seed": 1})
+        assert not cached
+
+    asyncio.run(scenario())
+    assert cache.stats() == {"size": 3, "hits": 1, "misses": 3}
+
+
+@pytest.mark.parametrize("params", [
+    {"categories": {"Employment": {}}},
+    {"steps": {"42": {}}},
+    {"default": {"distribution": "beta"}},
+    {"default": {"distribution": "triangular", "low": 1.2, "mode": 1.0, "high": 1.5}},
+    {"percentiles": [120]},
+])
+def test_invalid_parameters(params):
+    with pytest.raises(ForecastParameterError):
+        forecaster().simulate([], params)